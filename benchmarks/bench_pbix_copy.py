@@ -0,0 +1,162 @@
+"""
+Round trip check and benchmark of copying entries between Power BI files with PbixWriter.copy_raw_entry.
+
+Entries are copied as compressed bytes with local headers written by PbixWriter itself, so copied archive is checked
+to be valid zip archive whose every entry has same content and same compressed bytes as in source archive. Sources
+cover entries written with data descriptor after their data, as ZipFile does when writing to stream which can not be
+seeked, and entries flagged as ZIP64 in their local header, stored and deflated. Then copying DataModel raw is compared
+with decompressing and compressing it again. Run from repository root:
+
+    python benchmarks/bench_pbix_copy.py
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import timeit
+from zipfile import ZipFile, ZIP_DEFLATED, ZIP_STORED
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src', 'main', 'python'))
+
+from PbixArchive import PbixArchive, PbixWriter, _DATA_DESCRIPTOR_FLAG, _LOCAL_FILE_HEADER, \
+    _ZIP64_EXTRA_ID  # noqa: E402
+
+
+class _UnseekableStream:
+    # Only writes, so ZipFile writes data descriptor after data of every entry instead of seeking back to its header
+
+    def __init__(self, file):
+        self._file = file
+
+    def write(self, data):
+        return self._file.write(data)
+
+    def flush(self):
+        self._file.flush()
+
+    def close(self):
+        self._file.close()
+
+
+def _generate_content(size, seed):
+    # Half random, half repeated text, so deflated entries are neither incompressible nor trivial
+    generator = random.Random(seed)
+    random_part = generator.randbytes(size // 2)
+    return random_part + (b'{"visualType":"card","objects":{}}' * size)[:size - len(random_part)]
+
+
+def write_source_archives(directory):
+    entries = [
+        ('Report/Layout', ZIP_DEFLATED, False, _generate_content(200000, 1)),
+        ('DataModel', ZIP_STORED, False, _generate_content(300000, 2)),
+        ('Zip64/Deflated', ZIP_DEFLATED, True, _generate_content(100000, 3)),
+        ('Zip64/Stored', ZIP_STORED, True, _generate_content(100000, 4)),
+        ('Empty', ZIP_DEFLATED, False, b''),
+    ]
+    source_file_paths = []
+    for data_descriptor in (False, True):
+        source_file_path = os.path.join(directory, 'source_{}.pbix'.format(
+            'data_descriptor' if data_descriptor else 'seekable'))
+        with open(source_file_path, 'wb') as source_file:
+            stream = _UnseekableStream(source_file) if data_descriptor else source_file
+            with ZipFile(stream, 'w') as zip_file:
+                for name, compress_type, force_zip64, content in entries:
+                    # ZIP64 extra field is written to local header of entry when force_zip64 is set
+                    zip_file.compression = compress_type
+                    with zip_file.open(name, 'w', force_zip64=force_zip64) as entry_file:
+                        entry_file.write(content)
+        source_file_paths.append(source_file_path)
+    return source_file_paths
+
+
+def _read_local_header(file_path, info):
+    # Flags and extra field of local header of entry, which can differ from those in central directory
+    with open(file_path, 'rb') as archive_file:
+        archive_file.seek(info.header_offset)
+        header = _LOCAL_FILE_HEADER.unpack(archive_file.read(_LOCAL_FILE_HEADER.size))
+        archive_file.seek(header[-2], os.SEEK_CUR)
+        return header[3], archive_file.read(header[-1])
+
+
+def _has_zip64_extra(extra):
+    position = 0
+    while position + 4 <= len(extra):
+        if int.from_bytes(extra[position:position + 2], 'little') == _ZIP64_EXTRA_ID:
+            return True
+        position += 4 + int.from_bytes(extra[position + 2:position + 4], 'little')
+    return False
+
+
+def check_round_trip(source_file_path, copy_file_path):
+    """
+    Copies every entry of source archive raw and checks the copy, returns number of source entries having data
+    descriptor and number of them flagged as ZIP64.
+    """
+    with PbixArchive(source_file_path) as source_archive:
+        source_headers = [_read_local_header(source_file_path, source_archive.getinfo(name))
+                          for name in source_archive.namelist()]
+        with PbixWriter(copy_file_path) as pbix_writer:
+            for name in source_archive.namelist():
+                pbix_writer.copy_raw_entry(source_archive, name)
+
+        with ZipFile(copy_file_path) as copy_zip_file:
+            bad_entry_name = copy_zip_file.testzip()
+            if bad_entry_name is not None:
+                raise AssertionError('Entry {} of copy of {} is corrupt'.format(bad_entry_name, source_file_path))
+            if copy_zip_file.namelist() != source_archive.namelist():
+                raise AssertionError('Copy of {} has different entries'.format(source_file_path))
+            for info in copy_zip_file.infolist():
+                if _read_local_header(copy_file_path, info)[0] & _DATA_DESCRIPTOR_FLAG:
+                    raise AssertionError('Entry {} of copy is still followed by data descriptor'.format(info.filename))
+
+        with PbixArchive(copy_file_path) as copy_archive:
+            for name in source_archive.namelist():
+                if copy_archive.read(name) != source_archive.read(name):
+                    raise AssertionError('Content of {} differs in copy of {}'.format(name, source_file_path))
+                if b''.join(copy_archive.iter_raw_data(name)) != b''.join(source_archive.iter_raw_data(name)):
+                    raise AssertionError('Compressed bytes of {} differ in copy of {}'.format(name, source_file_path))
+    return sum(flag_bits & _DATA_DESCRIPTOR_FLAG != 0 for flag_bits, _ in source_headers), \
+        sum(_has_zip64_extra(extra) for _, extra in source_headers)
+
+
+def _copy_recompressed(source_file_path, copy_file_path):
+    with PbixArchive(source_file_path) as source_archive, ZipFile(copy_file_path, 'w', ZIP_DEFLATED) as zip_file:
+        for name in source_archive.namelist():
+            zip_file.writestr(source_archive.getinfo(name), source_archive.read(name))
+
+
+def _copy_raw(source_file_path, copy_file_path):
+    with PbixArchive(source_file_path) as source_archive, PbixWriter(copy_file_path) as pbix_writer:
+        for name in source_archive.namelist():
+            pbix_writer.copy_raw_entry(source_archive, name)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Check and benchmark raw copy of Power BI file entries.')
+    parser.add_argument('--data-model-mb', type=int, default=64, help='size of deflated DataModel to copy')
+    arguments = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        for source_file_path in write_source_archives(directory):
+            data_descriptor_count, zip64_count = check_round_trip(source_file_path,
+                                                                  os.path.join(directory, 'copy.pbix'))
+            print('Round trip OK  {:<28} {} entries with data descriptor, {} ZIP64'.format(
+                os.path.basename(source_file_path), data_descriptor_count, zip64_count))
+
+        data_model_file_path = os.path.join(directory, 'data_model.pbix')
+        with ZipFile(data_model_file_path, 'w', ZIP_DEFLATED) as zip_file:
+            zip_file.writestr('DataModel', _generate_content(arguments.data_model_mb << 20, 5))
+        copy_file_path = os.path.join(directory, 'copy.pbix')
+        raw_seconds = min(timeit.repeat(lambda: _copy_raw(data_model_file_path, copy_file_path),
+                                        number=1, repeat=3))
+        recompressed_seconds = min(timeit.repeat(lambda: _copy_recompressed(data_model_file_path, copy_file_path),
+                                                 number=1, repeat=3))
+    print('Copying {} MB DataModel'.format(arguments.data_model_mb))
+    print('recompressed     {:8.2f} ms'.format(recompressed_seconds * 1000))
+    print('raw              {:8.2f} ms  ({:.1f}x faster)'.format(raw_seconds * 1000,
+                                                                 recompressed_seconds / raw_seconds))
+
+
+if __name__ == '__main__':
+    main()
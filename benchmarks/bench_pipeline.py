@@ -0,0 +1,172 @@
+"""
+Benchmark of every stage of theme generation on synthetic Power BI files.
+
+Each scenario writes a synthetic Power BI file and measures time (best of repeats) and peak memory traced by
+tracemalloc of these stages:
+
+    read_layout      opening Power BI file and reading Report/Layout entry, which should not depend on size of
+                     DataModel as data_model scenario shows
+    extract          PowerBIThemeGenerator.modifiedDataStructure
+    reextract        modifiedDataStructure of same file again, reusing visuals already extracted in the process
+    index_properties building PropertyIndex of all report pages as report loader does, and searching it once
+    assemble_theme   selecting one visual per visual type and building theme data as generateTheme does
+    save_theme       writing theme file as _saveThemeFile does
+    apply_theme      writing copy of Power BI file with theme applied to its visuals, which copies DataModel without
+                     decompressing it
+
+Results are written as JSON so runs of different versions can be compared:
+
+    python benchmarks/bench_pipeline.py --output before.json
+    python benchmarks/bench_pipeline.py --output after.json --compare before.json
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+import timeit
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src', 'main', 'python'))
+
+import AppInfo  # noqa: E402
+from PbixArchive import PbixArchive, LAYOUT_ENTRY_NAME  # noqa: E402
+from PowerBIThemeGenerator import PowerBIThemeGenerator  # noqa: E402
+from PowerBIThemeGeneratorCLI import _apply_selection_rules  # noqa: E402
+from PropertyIndex import PropertyIndex  # noqa: E402
+from ThemeApplier import apply_theme  # noqa: E402
+from ThemeEngine import build_theme  # noqa: E402
+from ThemeWriter import write_theme  # noqa: E402
+from synthetic_pbix import write_synthetic_pbix  # noqa: E402
+
+# pages, visuals per page, objects per visual, ThemeDataColor density, DataModel MB
+SCENARIOS = {
+    'small': (5, 10, 6, 0.5, 0),
+    'medium': (30, 30, 8, 0.5, 0),
+    'large': (100, 50, 10, 0.5, 0),
+    'colors': (30, 30, 8, 1.0, 0),
+    'data_model': (5, 10, 6, 0.5, 1024),
+}
+
+
+def _measure(stage, repeat):
+    seconds = min(timeit.repeat(stage, number=1, repeat=repeat))
+    tracemalloc.start()
+    try:
+        stage()
+        peak_memory_bytes = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return {
+        'seconds': seconds,
+        'peakMemoryBytes': peak_memory_bytes,
+    }
+
+
+def run_scenario(pbi_file_path, theme_file_path, repeat):
+    def read_layout():
+        with PbixArchive(pbi_file_path) as pbi_file:
+            pbi_file.read(LAYOUT_ENTRY_NAME)
+
+    def extract():
+        # Measuring extraction from scratch, not reuse of visuals extracted by earlier repeat
+        PowerBIThemeGenerator.clear_extraction_memo()
+        return PowerBIThemeGenerator(pbi_file_path).modifiedDataStructure()
+
+    def reextract():
+        return PowerBIThemeGenerator(pbi_file_path).modifiedDataStructure()
+
+    report_visual_data = extract()
+
+    def index_properties():
+        PropertyIndex.build(report_visual_data).search('title.show=true fontSize=12')
+
+    def assemble_theme():
+        return build_theme(_apply_selection_rules(report_visual_data), 'Benchmark').theme
+
+    theme_data = assemble_theme()
+
+    def save_theme():
+        with open(theme_file_path, 'w') as theme_file:
+            write_theme(theme_data, theme_file)
+
+    def apply_theme_to_copy():
+        apply_theme(pbi_file_path, theme_data, os.path.splitext(theme_file_path)[0] + '_themed.pbix')
+
+    return {
+        'read_layout': _measure(read_layout, repeat),
+        'extract': _measure(extract, repeat),
+        'reextract': _measure(reextract, repeat),
+        'index_properties': _measure(index_properties, repeat),
+        'assemble_theme': _measure(assemble_theme, repeat),
+        'save_theme': _measure(save_theme, repeat),
+        'apply_theme': _measure(apply_theme_to_copy, repeat),
+    }
+
+
+def _print_results(results, previous_results=None):
+    previous_scenarios = {} if previous_results is None else {
+        scenario['name']: scenario for scenario in previous_results['scenarios']
+    }
+    for scenario in results['scenarios']:
+        print('{name}: {pages} pages, {visualsPerPage} visuals per page, {objectsPerVisual} objects per visual, '
+              '{layoutBytes} bytes of Report/Layout, {dataModelBytes} bytes of DataModel'.format(**scenario))
+        for stage_name, stage in scenario['stages'].items():
+            line = '    {:<16}{:10.2f} ms {:10.2f} MB'.format(stage_name, stage['seconds'] * 1000,
+                                                             stage['peakMemoryBytes'] / (1024 * 1024))
+            previous_stage = previous_scenarios.get(scenario['name'], {}).get('stages', {}).get(stage_name)
+            if previous_stage is not None and previous_stage['seconds'] > 0:
+                line += '   {:6.2f}x time of previous run'.format(stage['seconds'] / previous_stage['seconds'])
+            print(line)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark theme generation stages on synthetic Power BI files.')
+    parser.add_argument('--scenarios', nargs='+', choices=sorted(SCENARIOS), default=['small', 'medium', 'large'])
+    parser.add_argument('--repeat', type=int, default=3, help='Timing repeats, best time is reported')
+    parser.add_argument('--output', default='bench_output.json', help='JSON file to write results to')
+    parser.add_argument('--compare', help='Results JSON of previous run to compare with')
+    arguments = parser.parse_args()
+
+    results = {
+        'version': AppInfo.Version,
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'scenarios': [],
+    }
+    with tempfile.TemporaryDirectory() as temporary_directory:
+        for scenario_name in arguments.scenarios:
+            pages, visuals_per_page, objects_per_visual, theme_data_color_density, data_model_mb = \
+                SCENARIOS[scenario_name]
+            pbi_file_path = write_synthetic_pbix(os.path.join(temporary_directory, scenario_name + '.pbix'), pages,
+                                                 visuals_per_page, objects_per_visual, theme_data_color_density,
+                                                 data_model_mb * 1024 * 1024)
+            with PbixArchive(pbi_file_path) as pbi_file:
+                layout_bytes = pbi_file.getinfo(LAYOUT_ENTRY_NAME).file_size
+            results['scenarios'].append({
+                'name': scenario_name,
+                'pages': pages,
+                'visualsPerPage': visuals_per_page,
+                'objectsPerVisual': objects_per_visual,
+                'themeDataColorDensity': theme_data_color_density,
+                'dataModelBytes': data_model_mb * 1024 * 1024,
+                'layoutBytes': layout_bytes,
+                'stages': run_scenario(pbi_file_path, os.path.join(temporary_directory, scenario_name + '.json'),
+                                       arguments.repeat),
+            })
+
+    with open(arguments.output, 'w') as output_file:
+        json.dump(results, output_file, indent=4)
+
+    previous_results = None
+    if arguments.compare is not None:
+        with open(arguments.compare, 'r') as previous_results_file:
+            previous_results = json.load(previous_results_file)
+    _print_results(results, previous_results)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,142 @@
+"""
+Micro-benchmark of visual object property decoding.
+
+Compares PropertyDecoder with the decoder PowerBIThemeGenerator used before it, kept below as reference, on
+generated visual objects and checks both give the same output. Run from repository root:
+
+    python benchmarks/bench_property_decoder.py
+"""
+import os
+import random
+import sys
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src', 'main', 'python'))
+
+from ExtractedRecords import PropertyMap  # noqa: E402
+from PropertyDecoder import PropertyDecoder  # noqa: E402
+from PowerBIThemeGenerator import PowerBIThemeGenerator  # noqa: E402
+from Util import _ShadeHexColor  # noqa: E402
+
+THEME_COLORS = PowerBIThemeGenerator._default_theme_accent_colors
+
+
+def _legacy_fix_property_value(value):
+    if type(value) is str:
+        if "'" in value:
+            value = value.strip("'")
+            value = value.replace("''", "")
+        if value[-1] in ['L', 'D'] and value[0] != '#':
+            value = int(float(value[0:-1]))
+            return value
+        if value.isdigit():
+            value = int(float(value))
+            return value
+        if value in ['true', 'false']:
+            if value == 'true':
+                value = True
+            else:
+                value = False
+            return value
+    return value
+
+
+def _legacy_fetch_object_properties_value(objects):
+    visual_objects = {}
+    for objectName, object_properties in objects.items():
+        visual_objects[objectName] = {}
+        for object_property_name, object_property_value in object_properties[0]['properties'].items():
+            if type(object_property_value) is dict:
+                if any(key in object_property_value for key in ['expr', 'solid']):
+                    property_value = ''
+                    if object_property_value.get('expr') is not None:
+                        try:
+                            property_value = object_property_value.get('expr').get('Literal').get('Value')
+                            property_value = _legacy_fix_property_value(property_value)
+                        except AttributeError:
+                            pass
+                    elif object_property_value.get('solid') is not None:
+                        try:
+                            color_value = object_property_value.get('solid').get('color').get('expr')
+                            if color_value.get('Literal') is not None:
+                                property_value = color_value.get('Literal').get('Value')
+                                property_value = _legacy_fix_property_value(property_value)
+                            elif color_value.get('ThemeDataColor') is not None:
+                                color = THEME_COLORS[color_value.get('ThemeDataColor').get('ColorId')]
+                                shade_percent = color_value.get('ThemeDataColor').get('Percent')
+                                _ShadeHexColor.__wrapped__(color, shade_percent)
+                                property_value = _ShadeHexColor.__wrapped__(color, shade_percent)
+                            property_value = {
+                                'solid': {
+                                    'color': property_value
+                                }
+                            }
+                        except AttributeError:
+                            pass
+                    visual_objects[objectName][object_property_name] = property_value
+            else:
+                visual_objects[objectName][object_property_name] = object_property_value[0]
+    return visual_objects
+
+
+def _literal(value):
+    return {'expr': {'Literal': {'Value': value}}}
+
+
+def generate_visual_objects(visual_count, seed=0):
+    generator = random.Random(seed)
+    literal_values = ['12D', '3L', '0D', 'true', 'false', "'Segoe UI'", "'''Segoe UI'', wf_segoe-ui_normal'",
+                      "'Top'", "'#FF0000'", '100L', '45.5D']
+    visuals_objects = []
+    for _ in range(visual_count):
+        visual_objects = {}
+        for object_index in range(8):
+            properties = {}
+            for property_index in range(6):
+                shape = generator.random()
+                if shape < 0.5:
+                    value = _literal(generator.choice(literal_values))
+                elif shape < 0.7:
+                    value = {'solid': {'color': {'expr': {'ThemeDataColor': {
+                        'ColorId': generator.randrange(len(THEME_COLORS)),
+                        'Percent': generator.choice([0, 0.2, 0.4, -0.25, -0.5])}}}}}
+                elif shape < 0.85:
+                    value = {'solid': {'color': _literal("'#{:06X}'".format(generator.randrange(1 << 24)))}}
+                elif shape < 0.95:
+                    value = {'expr': {'Measure': {'Property': 'Sales'}}}
+                else:
+                    value = [generator.randrange(10)]
+                properties['property{}'.format(property_index)] = value
+            visual_objects['object{}'.format(object_index)] = [{'properties': properties}]
+        visuals_objects.append(visual_objects)
+    return visuals_objects
+
+
+def main():
+    visuals_objects = generate_visual_objects(2000)
+    property_decoder = PropertyDecoder(THEME_COLORS)
+
+    legacy_output = [_legacy_fetch_object_properties_value(objects) for objects in visuals_objects]
+    # Colors are decoded to SolidColor, which legacy decoder gave as {'solid': {'color': color}}
+    decoder_output = [
+        {object_name: PropertyMap(object_properties).to_dict()
+         for object_name, object_properties in property_decoder.decode_objects(objects).items()}
+        for objects in visuals_objects
+    ]
+    if legacy_output != decoder_output:
+        raise AssertionError('PropertyDecoder output differs from legacy decoder output')
+
+    legacy_seconds = min(timeit.repeat(
+        lambda: [_legacy_fetch_object_properties_value(objects) for objects in visuals_objects], number=1, repeat=5))
+    decoder_seconds = min(timeit.repeat(
+        lambda: [property_decoder.decode_objects(objects) for objects in visuals_objects], number=1, repeat=5))
+
+    property_count = len(visuals_objects) * 8 * 6
+    print('Decoded {} properties of {} visuals'.format(property_count, len(visuals_objects)))
+    print('legacy decoder   {:8.2f} ms'.format(legacy_seconds * 1000))
+    print('PropertyDecoder  {:8.2f} ms  ({:.1f}x faster)'.format(decoder_seconds * 1000,
+                                                                 legacy_seconds / decoder_seconds))
+
+
+if __name__ == '__main__':
+    main()
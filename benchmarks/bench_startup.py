@@ -0,0 +1,121 @@
+"""
+Benchmark of cold start of Power BI Theme Generator window.
+
+Every repeat starts new Python process so modules are imported from scratch, same as when user starts the program.
+These stages are measured (best of repeats) from start of the process:
+
+    import_gui       importing PyQt5 and window module
+    create_window    creating QApplication and PowerBIThemeGeneratorWindow, which shows window
+    first_paint      processing events queued at start, after which window is drawn
+    idle             running event loop until work deferred to it is done
+    process          whole process including interpreter start and exit, timed by this script
+
+Results are written as JSON so runs of different versions can be compared:
+
+    python benchmarks/bench_startup.py --output before.json
+    python benchmarks/bench_startup.py --output after.json --compare before.json
+
+Set QT_QPA_PLATFORM=offscreen to run it without display.
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+
+SOURCE_DIRECTORY = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src', 'main', 'python')
+sys.path.insert(0, SOURCE_DIRECTORY)
+
+import AppInfo  # noqa: E402
+
+_STARTUP_SCRIPT = '''
+import json
+import sys
+import time
+start = time.perf_counter()
+sys.path.insert(0, sys.argv[1])
+from PyQt5.QtCore import QTimer
+from PyQt5.QtWidgets import QApplication
+from PowerBIThemeGeneratorGUI import PowerBIThemeGeneratorWindow
+imported = time.perf_counter()
+app = QApplication(sys.argv[:1])
+window = PowerBIThemeGeneratorWindow()
+created = time.perf_counter()
+app.processEvents()
+painted = time.perf_counter()
+QTimer.singleShot(0, app.quit)
+app.exec_()
+idle = time.perf_counter()
+print(json.dumps({
+    'import_gui': imported - start,
+    'create_window': created - imported,
+    'first_paint': painted - created,
+    'idle': idle - painted,
+    'importedModules': sorted(sys.modules),
+}))
+'''
+
+
+def _measure_startup(environment):
+    start = time.perf_counter()
+    completed_process = subprocess.run([sys.executable, '-c', _STARTUP_SCRIPT, SOURCE_DIRECTORY], env=environment,
+                                       stdout=subprocess.PIPE, stderr=subprocess.PIPE, universal_newlines=True)
+    process_seconds = time.perf_counter() - start
+    if completed_process.returncode != 0:
+        raise RuntimeError('Starting window failed:\n' + completed_process.stderr)
+    stages = json.loads(completed_process.stdout.strip().splitlines()[-1])
+    stages['process'] = process_seconds
+    return stages
+
+
+def _print_results(results, previous_results=None):
+    print('{} modules imported at start'.format(len(results['importedModules'])))
+    for stage_name, seconds in results['stages'].items():
+        line = '    {:<16}{:10.2f} ms'.format(stage_name, seconds * 1000)
+        previous_seconds = (previous_results or {}).get('stages', {}).get(stage_name)
+        if previous_seconds:
+            line += '   {:6.2f}x time of previous run'.format(seconds / previous_seconds)
+        print(line)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark cold start of Power BI Theme Generator window.')
+    parser.add_argument('--repeat', type=int, default=5, help='Timing repeats, best time is reported')
+    parser.add_argument('--output', default='bench_startup.json', help='JSON file to write results to')
+    parser.add_argument('--compare', help='Results JSON of previous run to compare with')
+    arguments = parser.parse_args()
+
+    stages = {}
+    imported_modules = []
+    with tempfile.TemporaryDirectory() as temporary_directory:
+        # Start should not depend on log and cache files of earlier runs
+        environment = dict(os.environ, APPDATA=temporary_directory)
+        for _ in range(arguments.repeat):
+            run_stages = _measure_startup(environment)
+            imported_modules = run_stages.pop('importedModules')
+            for stage_name, seconds in run_stages.items():
+                stages[stage_name] = min(seconds, stages.get(stage_name, seconds))
+
+    results = {
+        'version': AppInfo.Version,
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'stages': stages,
+        'importedModules': imported_modules,
+    }
+    with open(arguments.output, 'w') as output_file:
+        json.dump(results, output_file, indent=4)
+
+    previous_results = None
+    if arguments.compare is not None:
+        with open(arguments.compare, 'r') as previous_results_file:
+            previous_results = json.load(previous_results_file)
+    _print_results(results, previous_results)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,156 @@
+"""
+Generates synthetic Power BI files for benchmarks.
+
+Only parts read by Power BI Theme Generator are realistic: Report/Layout holds sections with visual containers whose
+config is JSON string of visual objects, same as files saved by Power BI Desktop. Other entries are small placeholders
+apart from optional DataModel of requested size.
+
+    python benchmarks/synthetic_pbix.py report.pbix --pages 50 --visuals-per-page 40
+"""
+import argparse
+import json
+import os
+import random
+import zipfile
+
+VISUAL_TYPES = ['barChart', 'clusteredColumnChart', 'lineChart', 'pieChart', 'donutChart', 'card', 'multiRowCard',
+                'slicer', 'tableEx', 'pivotTable', 'map', 'gauge', 'kpi', 'textbox', 'shape', 'image']
+
+VISUAL_OBJECTS = ['title', 'background', 'border', 'visualHeader', 'dropShadow', 'legend', 'categoryAxis',
+                  'valueAxis', 'labels', 'dataPoint', 'general', 'lineStyles', 'plotArea', 'items', 'header',
+                  'values', 'columnHeaders', 'grid', 'total', 'wordWrap']
+
+LITERAL_VALUES = ['true', 'false', '12D', '10D', '9D', '3L', '0L', '50D', '100L', "'Top'", "'Bottom'", "'Center'",
+                  "'Segoe UI'", "'''Segoe UI Light'', wf_segoe-ui_light, helvetica, arial, sans-serif'",
+                  "'DIN'", "'Auto'", "'Title text'"]
+
+
+def _literal(value):
+    return {'expr': {'Literal': {'Value': value}}}
+
+
+def _property_value(generator, color_property, theme_data_color_density):
+    if not color_property:
+        return _literal(generator.choice(LITERAL_VALUES))
+    if generator.random() < theme_data_color_density:
+        color_expression = {'ThemeDataColor': {'ColorId': generator.randrange(42),
+                                               'Percent': generator.choice([0, 0.2, 0.4, 0.6, -0.25, -0.5])}}
+    else:
+        color_expression = {'Literal': {'Value': "'#{:06X}'".format(generator.randrange(1 << 24))}}
+    return {'solid': {'color': {'expr': color_expression}}}
+
+
+def _objects(generator, object_count, theme_data_color_density):
+    objects = {}
+    for object_name in generator.sample(VISUAL_OBJECTS, min(object_count, len(VISUAL_OBJECTS))):
+        properties = {}
+        for property_index in range(generator.randint(2, 6)):
+            color_property = generator.random() < 0.3
+            property_name = ('color{}' if color_property else 'property{}').format(property_index)
+            properties[property_name] = _property_value(generator, color_property, theme_data_color_density)
+        objects[object_name] = [{'properties': properties}]
+    return objects
+
+
+def _visual_container(generator, page_index, visual_index, object_count, theme_data_color_density):
+    objects = _objects(generator, object_count, theme_data_color_density)
+    # Power BI keeps title, background, border etc. in vcObjects and visual specific objects in objects
+    vc_objects = {name: objects.pop(name) for name in ['title', 'background', 'border'] if name in objects}
+    visual_name = '{:08x}{:012x}'.format(page_index, visual_index)
+    config = {
+        'name': visual_name,
+        'layouts': [{'id': 0, 'position': {'x': 10.0 * visual_index, 'y': 20.0, 'z': visual_index, 'width': 300.0,
+                                           'height': 200.0}}],
+        'singleVisual': {
+            'visualType': generator.choice(VISUAL_TYPES),
+            'projections': {'Values': [{'queryRef': 'Sales.Amount'}], 'Category': [{'queryRef': 'Date.Month'}]},
+            'prototypeQuery': {
+                'Version': 2,
+                'From': [{'Name': 's', 'Entity': 'Sales', 'Type': 0}, {'Name': 'd', 'Entity': 'Date', 'Type': 0}],
+                'Select': [{'Column': {'Expression': {'SourceRef': {'Source': 's'}}, 'Property': 'Amount'},
+                            'Name': 'Sales.Amount'}],
+            },
+            'drillFilterOtherVisuals': True,
+            'objects': objects,
+            'vcObjects': vc_objects,
+        },
+    }
+    return {
+        'x': 10.0 * visual_index,
+        'y': 20.0,
+        'z': float(visual_index),
+        'width': 300.0,
+        'height': 200.0,
+        'config': json.dumps(config),
+        'filters': '[]',
+        'query': json.dumps({'Commands': [{'SemanticQueryDataShapeCommand': {'Binding': {'Primary': {}}}}]}),
+    }
+
+
+def generate_report_layout(page_count, visuals_per_page, objects_per_visual, theme_data_color_density, seed=0):
+    generator = random.Random(seed)
+    sections = []
+    for page_index in range(page_count):
+        section_config = {'objects': _objects(generator, 2, theme_data_color_density)}
+        sections.append({
+            'id': page_index,
+            'name': 'ReportSection{:04d}'.format(page_index),
+            'displayName': 'Page {}'.format(page_index + 1),
+            'filters': '[]',
+            'ordinal': page_index,
+            'visualContainers': [
+                _visual_container(generator, page_index, visual_index, objects_per_visual, theme_data_color_density)
+                for visual_index in range(visuals_per_page)
+            ],
+            'config': json.dumps(section_config),
+            'displayOption': 1,
+            'width': 1280.0,
+            'height': 720.0,
+        })
+    return {
+        'id': 0,
+        'resourcePackages': [{'resourcePackage': {'name': 'SharedResources', 'type': 2, 'items': [
+            {'type': 202, 'path': 'BaseThemes/CY19SU06.json', 'name': 'CY19SU06'}]}}],
+        'sections': sections,
+        'config': json.dumps({'version': '5.4', 'themeCollection': {'baseTheme': {'name': 'CY19SU06'}}}),
+        'layoutOptimization': 0,
+    }
+
+
+def write_synthetic_pbix(pbi_file_path, page_count=10, visuals_per_page=20, objects_per_visual=8,
+                         theme_data_color_density=0.5, data_model_bytes=0, seed=0):
+    report_layout = generate_report_layout(page_count, visuals_per_page, objects_per_visual,
+                                           theme_data_color_density, seed)
+    with zipfile.ZipFile(pbi_file_path, 'w', zipfile.ZIP_DEFLATED) as pbi_file:
+        pbi_file.writestr('Version', '1.18'.encode('utf-16-le'))
+        pbi_file.writestr('[Content_Types].xml',
+                          '<?xml version="1.0" encoding="utf-8"?><Types xmlns="http://schemas.openxmlformats.org/'
+                          'package/2006/content-types"><Default Extension="json" ContentType="" />'
+                          '<Override PartName="/Version" ContentType="" /><Override PartName="/DataModel" '
+                          'ContentType="" /><Override PartName="/Report/Layout" ContentType="" /><Override '
+                          'PartName="/SecurityBindings" ContentType="" /></Types>')
+        # Power BI compresses data model itself so it is stored without compression here as well
+        pbi_file.writestr(zipfile.ZipInfo('DataModel'), os.urandom(data_model_bytes), zipfile.ZIP_STORED)
+        pbi_file.writestr('Report/Layout', json.dumps(report_layout).encode('utf-16-le'))
+        pbi_file.writestr('SecurityBindings', os.urandom(64), zipfile.ZIP_STORED)
+    return pbi_file_path
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Generate synthetic Power BI file for benchmarks.')
+    parser.add_argument('output', help='Path of Power BI file to write')
+    parser.add_argument('--pages', type=int, default=10)
+    parser.add_argument('--visuals-per-page', type=int, default=20)
+    parser.add_argument('--objects-per-visual', type=int, default=8)
+    parser.add_argument('--theme-data-color-density', type=float, default=0.5,
+                        help='Share of color properties using ThemeDataColor instead of literal color')
+    parser.add_argument('--data-model-mb', type=float, default=0)
+    parser.add_argument('--seed', type=int, default=0)
+    arguments = parser.parse_args()
+    write_synthetic_pbix(arguments.output, arguments.pages, arguments.visuals_per_page, arguments.objects_per_visual,
+                         arguments.theme_data_color_density, int(arguments.data_model_mb * 1024 * 1024),
+                         arguments.seed)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,73 @@
+import logging
+
+
+class Diagnostic:
+    """
+    Failure to read one part of Power BI file. Report section is None for failures affecting whole file, container
+    index is None for failures of report page itself and property path is None when whole visual is affected.
+    """
+
+    def __init__(self, report_section, container_index, property_path, error):
+        self.report_section = report_section
+        self.container_index = container_index
+        self.property_path = property_path
+        self.error_type = type(error).__name__
+        self.error = str(error)
+
+    def get_location(self):
+        if self.report_section is None:
+            return 'Power BI file'
+        location = 'report page ' + str(self.report_section)
+        if self.container_index is not None:
+            location += ', visual container ' + str(self.container_index)
+        if self.property_path is not None:
+            location += ', ' + self.property_path
+        return location
+
+    def to_dict(self):
+        return {
+            'reportSection': self.report_section,
+            'containerIndex': self.container_index,
+            'propertyPath': self.property_path,
+            'errorType': self.error_type,
+            'error': self.error,
+        }
+
+    def __str__(self):
+        return '{}: {}: {}'.format(self.get_location(), self.error_type, self.error)
+
+
+class DiagnosticsCollector:
+    """
+    Collects failures found while extracting visual properties so extraction can skip broken visual or property and
+    carry on. Every failure is logged when it is recorded and all of them are reported once at the end, as summary
+    dialog in GUI or JSON report when running headless.
+    """
+
+    def __init__(self):
+        self._diagnostics = []
+
+    def record(self, error, report_section=None, container_index=None, property_path=None):
+        diagnostic = Diagnostic(report_section, container_index, property_path, error)
+        self._diagnostics.append(diagnostic)
+        logging.warning('Skipped ' + diagnostic.get_location(), exc_info=error)
+        return diagnostic
+
+    def __len__(self):
+        return len(self._diagnostics)
+
+    def __iter__(self):
+        return iter(self._diagnostics)
+
+    def get_summary(self, start=0, max_lines=50):
+        """
+        Returns text listing diagnostics recorded after first start diagnostics, at most max_lines of them.
+        """
+        diagnostics = self._diagnostics[start:]
+        lines = [str(diagnostic) for diagnostic in diagnostics[:max_lines]]
+        if len(diagnostics) > max_lines:
+            lines.append('... and {} more, see log file for all of them'.format(len(diagnostics) - max_lines))
+        return '\n'.join(lines)
+
+    def to_list(self):
+        return [diagnostic.to_dict() for diagnostic in self._diagnostics]
@@ -1,41 +1,143 @@
+import atexit
 import logging
 import os
+import queue
+import traceback
+from collections import deque
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
 import AppInfo
+from Util import PathUtil
 
-logFileDir = os.getenv('APPDATA') + '\\' + AppInfo.Name
-if not os.path.exists(logFileDir):
-    os.makedirs(logFileDir)
-logFilePath = logFileDir + '\\pbi_theme_generator.log'
+LogFileName = 'pbi_theme_generator.log'
+LogFileMaxBytes = 1024 * 1024
+LogFileBackupCount = 3
+RecentRecordsCapacity = 200
 
-logging.basicConfig(
-    filename=logFilePath,
-    filemode='w',
-    level=logging.DEBUG
-)
+_logFormatter = logging.Formatter('%(asctime)s %(levelname)s %(name)s: %(message)s')
+_logFilePath = None
+_recentRecordsHandler = None
+_queueHandler = None
+_queueListener = None
+_loggingProcessId = None
+
+
+class RecentRecordsHandler(logging.Handler):
+    """
+    Keeps formatted text of most recent log records in memory so error dialog can show them without reading log file.
+    """
+
+    def __init__(self, capacity=RecentRecordsCapacity):
+        super().__init__()
+        self._records = deque(maxlen=capacity)
+
+    def emit(self, record):
+        try:
+            self._records.append(self.format(record))
+        except Exception:
+            self.handleError(record)
+
+    def GetText(self):
+        return '\n'.join(self._records)
+
+
+def _removeHandlers():
+    global _recentRecordsHandler, _queueHandler, _queueListener
+    rootLogger = logging.getLogger()
+    if _recentRecordsHandler is not None:
+        rootLogger.removeHandler(_recentRecordsHandler)
+        _recentRecordsHandler = None
+    if _queueHandler is not None:
+        rootLogger.removeHandler(_queueHandler)
+        _queueHandler = None
+    if _queueListener is not None:
+        # Listener thread of parent process does not exist in forked worker process
+        if _loggingProcessId == os.getpid():
+            _queueListener.stop()
+            for handler in _queueListener.handlers:
+                handler.close()
+        _queueListener = None
+
+
+def InitializeLogging(logFilePath=None, writeLogFile=True, level=logging.DEBUG):
+    """
+    Configures logging of application and returns path of log file. Recent records are kept in memory for error
+    dialog and, unless writeLogFile is False, written to size rotated log file by background thread so logging never
+    waits for disk. Log of previous run is kept as first backup. Calling it again replaces earlier configuration, such
+    as in worker processes which should not write to log file of main process.
+    """
+    global _logFilePath, _recentRecordsHandler, _queueHandler, _queueListener, _loggingProcessId
+    _removeHandlers()
+    rootLogger = logging.getLogger()
+    rootLogger.setLevel(level)
+
+    _recentRecordsHandler = RecentRecordsHandler()
+    _recentRecordsHandler.setFormatter(_logFormatter)
+    rootLogger.addHandler(_recentRecordsHandler)
+
+    _logFilePath = None
+    if writeLogFile:
+        _logFilePath = logFilePath if logFilePath is not None else \
+            os.path.join(PathUtil.AppDataDirectory(), LogFileName)
+        fileHandler = RotatingFileHandler(_logFilePath, maxBytes=LogFileMaxBytes, backupCount=LogFileBackupCount,
+                                          encoding='utf-8', delay=True)
+        fileHandler.setFormatter(_logFormatter)
+        if os.path.isfile(_logFilePath) and os.path.getsize(_logFilePath) > 0:
+            try:
+                fileHandler.doRollover()
+            except OSError:
+                # Log file is open in another instance of application, keep appending to it
+                pass
+
+        logQueue = queue.SimpleQueue()
+        _queueHandler = QueueHandler(logQueue)
+        _queueListener = QueueListener(logQueue, fileHandler, respect_handler_level=True)
+        _queueListener.start()
+        rootLogger.addHandler(_queueHandler)
+        atexit.unregister(ShutdownLogging)
+        atexit.register(ShutdownLogging)
+    _loggingProcessId = os.getpid()
+    return _logFilePath
+
+
+def ShutdownLogging():
+    """
+    Writes records still waiting in queue to log file and removes handlers added by InitializeLogging.
+    """
+    _removeHandlers()
+
+
+def GetLogFilePath():
+    return _logFilePath
 
 
 def LogException(exception):
     logging.exception(exception)
-    return ReadException()
+    return ReadException(exception)
 
 
-def ReadException():
-    try:
-        if os.path.isfile(logFilePath):
-            with open(logFilePath, 'r') as logFile:
-                return logFile.read()
-        else:
-            print('No file')
-    except Exception as e:
-        logging.exception('Error reading log file')
+def ReadException(exception=None):
+    """
+    Returns recent log records, ending with given exception, as text for error dialog.
+    """
+    if _recentRecordsHandler is not None:
+        return _recentRecordsHandler.GetText()
+    # Logging is not initialized so there are no recent records to show
+    if exception is not None:
+        return ''.join(traceback.format_exception(type(exception), exception, exception.__traceback__))
+    return ''
 
 
 try:
-    from PyQt5.QtWidgets import QMessageBox
-    from PyQt5.QtCore import Qt
+    from PyQt5.QtWidgets import QMessageBox, QApplication
+    from PyQt5.QtCore import Qt, QThread
 
     def ShowErrorDialog(errorMessage):
 
+        # Headless use (command line, worker processes) has no application to show dialog in and widgets can not be
+        # created outside of GUI thread. Error is already logged by LogException so there is nothing more to do.
+        if QApplication.instance() is None or QThread.currentThread() is not QApplication.instance().thread():
+            return
+
         messageBoxError = QMessageBox()
         messageBoxError.setWindowTitle('Error in Application')
         messageBoxError.setIcon(QMessageBox.Critical)
@@ -43,7 +145,8 @@ try:
         messageBoxErrorText = 'Please click on show detail button and copy text from text box and create new ' \
                               'issue on below link.<br/>'
         messageBoxErrorText += '<a href="' + AppInfo.GitHubRepoIssuesURL + '/new">Click here to create issue</a><br/>'
-        messageBoxErrorText += 'Below error message is also stored in ' + logFilePath
+        if _logFilePath is not None:
+            messageBoxErrorText += 'Below error message is also stored in ' + _logFilePath
         messageBoxError.setText(messageBoxErrorText)
         messageBoxError.setStandardButtons(QMessageBox.Ok)
         messageBoxError.setDetailedText(errorMessage)
@@ -51,6 +154,5 @@ try:
         messageBoxError.exec_()
 
 except ImportError:
-    logging.exception('No PyQt installed.')
-except Exception as e:
-    logging.exception(e)
+    def ShowErrorDialog(errorMessage):
+        pass
@@ -0,0 +1,189 @@
+import sys
+from collections.abc import Mapping
+
+# Tuples of names shared by every PropertyMap having same names in same order and SolidColor of every color, once
+# there are this many of either new ones are no longer shared so they can not grow without bound
+_MAX_SHARED_ENTRIES = 1 << 16
+_name_tuples = {}
+_solid_colors = {}
+
+
+def intern_name(name):
+    """
+    Returns single shared copy of name such as visual type, object or property name, which repeat in every visual.
+    """
+    return sys.intern(name) if type(name) is str else name
+
+
+def _intern_names(names):
+    names = tuple(names)
+    interned_names = _name_tuples.get(names)
+    if interned_names is None:
+        interned_names = tuple(intern_name(name) for name in names)
+        if len(_name_tuples) < _MAX_SHARED_ENTRIES:
+            interned_names = _name_tuples.setdefault(interned_names, interned_names)
+    return interned_names
+
+
+def _value_to_dict(value):
+    return value.to_dict() if isinstance(value, (PropertyMap, SolidColor)) else value
+
+
+def _value_from_dict(value):
+    if type(value) is dict and len(value) == 1:
+        solid = value.get('solid')
+        if type(solid) is dict and len(solid) == 1 and 'color' in solid:
+            return SolidColor.of(solid['color'])
+    return value
+
+
+class SolidColor:
+    """
+    Color property value, {'solid': {'color': color}} in theme file. Instances are shared by every property having
+    same color, use SolidColor.of to get one.
+    """
+
+    __slots__ = ('color',)
+
+    def __init__(self, color):
+        self.color = color
+
+    @classmethod
+    def of(cls, color):
+        solid_color = _solid_colors.get(color)
+        if solid_color is None:
+            solid_color = cls(intern_name(color))
+            if len(_solid_colors) < _MAX_SHARED_ENTRIES:
+                solid_color = _solid_colors.setdefault(color, solid_color)
+        return solid_color
+
+    def to_dict(self):
+        return {
+            'solid': {
+                'color': self.color
+            }
+        }
+
+    def __eq__(self, other):
+        return type(other) is SolidColor and other.color == self.color
+
+    def __hash__(self):
+        return hash(self.color)
+
+    def __repr__(self):
+        return 'SolidColor({!r})'.format(self.color)
+
+
+class PropertyMap(Mapping):
+    """
+    Read only mapping of names to values, used for objects of visual and properties of object. Names are kept in
+    tuple shared by every PropertyMap with same names and values in tuple of same order, so no hash table is kept per
+    object. Lookup by name is linear which is faster than hashing for the few properties an object has.
+    """
+
+    __slots__ = ('_names', '_values')
+
+    def __init__(self, mapping=()):
+        if type(mapping) is dict:
+            names = mapping.keys()
+            values = mapping.values()
+        else:
+            if isinstance(mapping, Mapping):
+                mapping = mapping.items()
+            names = []
+            values = []
+            for name, value in mapping:
+                names.append(name)
+                values.append(value)
+        self._names = _intern_names(names)
+        self._values = tuple(values)
+
+    def __getitem__(self, name):
+        try:
+            return self._values[self._names.index(name)]
+        except ValueError:
+            raise KeyError(name) from None
+
+    def __iter__(self):
+        return iter(self._names)
+
+    def __len__(self):
+        return len(self._names)
+
+    def keys(self):
+        return self._names
+
+    def values(self):
+        return self._values
+
+    def items(self):
+        return zip(self._names, self._values)
+
+    def to_dict(self):
+        return {name: _value_to_dict(value) for name, value in zip(self._names, self._values)}
+
+    def __repr__(self):
+        return 'PropertyMap({!r})'.format(dict(self.items()))
+
+
+def _to_property_map(mapping):
+    return mapping if type(mapping) is PropertyMap else PropertyMap(mapping)
+
+
+class ExtractedVisual:
+    """
+    Visual type and objects extracted from one visual container. objects maps object name to PropertyMap of its
+    properties. Page visual, holding properties of report page itself, has no name.
+    """
+
+    __slots__ = ('name', 'visual_type', 'objects')
+
+    def __init__(self, name, visual_type, objects):
+        self.name = name
+        self.visual_type = intern_name(visual_type)
+        self.objects = PropertyMap((object_name, _to_property_map(object_properties))
+                                   for object_name, object_properties in objects.items())
+
+    @classmethod
+    def from_dict(cls, visual):
+        return cls(visual['name'], visual['visual_type'], {
+            object_name: PropertyMap((property_name, _value_from_dict(property_value))
+                                     for property_name, property_value in object_properties.items())
+            for object_name, object_properties in visual['objects'].items()
+        })
+
+    def to_dict(self):
+        return {
+            'name': self.name,
+            'visual_type': self.visual_type,
+            'objects': self.objects.to_dict(),
+        }
+
+    def __repr__(self):
+        return 'ExtractedVisual({!r}, {!r})'.format(self.name, self.visual_type)
+
+
+class ExtractedPage:
+    """
+    Visuals extracted from one report page, page visual being the last of them.
+    """
+
+    __slots__ = ('display_name', 'visuals')
+
+    def __init__(self, display_name, visuals):
+        self.display_name = display_name
+        self.visuals = tuple(visuals)
+
+    @classmethod
+    def from_dict(cls, report_page):
+        return cls(report_page['reportPageDisplayName'],
+                   [ExtractedVisual.from_dict(visual) for visual in report_page['visuals']])
+
+    def to_dict(self):
+        return {
+            'reportPageDisplayName': self.display_name,
+            'visuals': [visual.to_dict() for visual in self.visuals],
+        }
+
+    def __repr__(self):
+        return 'ExtractedPage({!r}, {} visuals)'.format(self.display_name, len(self.visuals))
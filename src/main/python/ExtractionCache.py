@@ -0,0 +1,89 @@
+import hashlib
+import json
+import logging
+import os
+from Util import PathUtil
+
+
+class ExtractionCache:
+    """
+    Persistent cache of visual properties extracted from Power BI files.
+
+    Every Power BI file is stored as one JSON file in the cache directory, named after a hash of the file path, size,
+    modification time and CRC of its Report/Layout entry, so any change to the file makes a new entry. Total size of
+    the cache directory is kept under max_size_bytes by removing least recently used entries.
+    """
+
+    # Increase whenever shape of extracted data changes so entries written by older versions are not used
+    FORMAT_VERSION = 2
+
+    def __init__(self, cache_directory=None, max_size_bytes=64 * 1024 * 1024):
+        self._cache_directory = cache_directory if cache_directory is not None else \
+            PathUtil.AppDataDirectory('cache')
+        self._max_size_bytes = max_size_bytes
+
+    @classmethod
+    def get_cache_key(cls, pbi_file_path, layout_crc):
+        file_stat = os.stat(pbi_file_path)
+        file_identity = json.dumps([
+            cls.FORMAT_VERSION,
+            os.path.normcase(os.path.abspath(pbi_file_path)),
+            file_stat.st_size,
+            file_stat.st_mtime_ns,
+            layout_crc,
+        ])
+        return hashlib.sha1(file_identity.encode('utf-8')).hexdigest()
+
+    def _get_entry_path(self, cache_key):
+        return os.path.join(self._cache_directory, cache_key + '.json')
+
+    def load(self, cache_key):
+        entry_path = self._get_entry_path(cache_key)
+        try:
+            with open(entry_path, 'r', encoding='utf-8') as entry_file:
+                cached_data = json.load(entry_file)
+            # Modification time of entry is used as its last access time for eviction
+            os.utime(entry_path)
+            return cached_data
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError):
+            logging.warning('Ignoring unreadable extraction cache entry ' + entry_path, exc_info=True)
+            return None
+
+    def store(self, cache_key, cached_data):
+        entry_path = self._get_entry_path(cache_key)
+        # Writing to temporary file first so other processes never read half written entry
+        temporary_entry_path = '{}.{}.tmp'.format(entry_path, os.getpid())
+        try:
+            # Cache directory given by caller may not exist yet, default one is created by PathUtil
+            os.makedirs(self._cache_directory, exist_ok=True)
+            with open(temporary_entry_path, 'w', encoding='utf-8') as entry_file:
+                json.dump(cached_data, entry_file, separators=(',', ':'))
+            os.replace(temporary_entry_path, entry_path)
+            self._evict()
+        except OSError:
+            logging.warning('Unable to write extraction cache entry ' + entry_path, exc_info=True)
+
+    def _evict(self):
+        entries = []
+        cache_size = 0
+        with os.scandir(self._cache_directory) as directory_entries:
+            for directory_entry in directory_entries:
+                if directory_entry.name.endswith('.json'):
+                    try:
+                        entry_stat = directory_entry.stat()
+                    except FileNotFoundError:
+                        continue
+                    entries.append((entry_stat.st_mtime_ns, entry_stat.st_size, directory_entry.path))
+                    cache_size += entry_stat.st_size
+
+        entries.sort()
+        for _, entry_size, entry_path in entries:
+            if cache_size <= self._max_size_bytes:
+                break
+            try:
+                os.remove(entry_path)
+            except FileNotFoundError:
+                pass
+            cache_size -= entry_size
@@ -0,0 +1,86 @@
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+
+
+def get_fingerprint(text):
+    """
+    Returns 16 byte hash of text such as config string of visual container, used as key of ExtractionMemo.
+    """
+    return hashlib.blake2b(str(text).encode('utf-8', 'surrogatepass'), digest_size=16).digest()
+
+
+class ExtractionMemo:
+    """
+    In memory store of extraction results keyed by fingerprint of the content they were extracted from, so content
+    which is seen again, such as unchanged visual of reloaded report or visual of another report built from same
+    template, is not extracted again. Least recently used entries are dropped once max_entries is reached.
+
+    Stored results are shared by every report using them and must not be modified.
+    """
+
+    def __init__(self, max_entries):
+        self._max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, fingerprint):
+        with self._lock:
+            value = self._entries.get(fingerprint)
+            if value is not None:
+                self._entries.move_to_end(fingerprint)
+            return value
+
+    def put(self, fingerprint, value):
+        with self._lock:
+            self._entries[fingerprint] = value
+            self._entries.move_to_end(fingerprint)
+            while len(self._entries) > self._max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class ParsedConfigIndex:
+    """
+    Index of parsed config strings of visual containers and report sections keyed by their fingerprint, so config
+    string which is parsed again, such as by page extraction and then by ThemeApplier or for visual which could not
+    be kept in ExtractionMemo, is parsed only once. Only most recently used configs are kept, as parsed configs take
+    several times the memory of config strings.
+
+    Parsed configs are shared by every consumer and must not be modified.
+    """
+
+    def __init__(self, max_entries):
+        self._parsed_configs = ExtractionMemo(max_entries)
+
+    def get(self, config, fingerprint=None, keep=True):
+        """
+        Returns config string parsed, fingerprint is get_fingerprint of config when caller already has it. Config
+        which is not in index yet is only added to it when keep is True. Raises same errors as json.loads when config
+        can not be parsed.
+        """
+        if fingerprint is None:
+            fingerprint = get_fingerprint(config)
+        parsed_config = self._parsed_configs.get(fingerprint)
+        if parsed_config is None:
+            parsed_config = json.loads(config)
+            if keep:
+                self._parsed_configs.put(fingerprint, parsed_config)
+        return parsed_config
+
+    def clear(self):
+        self._parsed_configs.clear()
+
+    def __len__(self):
+        return len(self._parsed_configs)
+
+
+# Shared by page extraction of every theme generator and by ThemeApplier
+PARSED_CONFIG_INDEX = ParsedConfigIndex(200)
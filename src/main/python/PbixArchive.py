@@ -0,0 +1,205 @@
+import copy
+import io
+import mmap
+import os
+import struct
+from zipfile import ZipFile, ZipInfo, BadZipFile, ZIP_DEFLATED, ZIP64_LIMIT
+
+LAYOUT_ENTRY_NAME = 'Report/Layout'
+CONTENT_TYPES_ENTRY_NAME = '[Content_Types].xml'
+SECURITY_BINDINGS_ENTRY_NAME = 'SecurityBindings'
+
+# Local file header of zip entry, name and extra field lengths are its last two fields
+_LOCAL_FILE_HEADER = struct.Struct('<4s2B4HL2L2H')
+_LOCAL_FILE_HEADER_SIGNATURE = b'PK\x03\x04'
+_DATA_DESCRIPTOR_FLAG = 0x08
+_ZIP64_EXTRA_ID = 1
+_COPY_CHUNK_SIZE = 1 << 20
+
+
+class _MappedFileStream(io.RawIOBase):
+    # File object interface needed by ZipFile over memory mapped file, reads are served from mapping without system
+    # calls. mmap itself is not seekable file object before Python 3.13.
+
+    def __init__(self, mapped_file):
+        super().__init__()
+        self._mapped_file = mapped_file
+        self._position = 0
+
+    def readable(self):
+        return True
+
+    def seekable(self):
+        return True
+
+    def seek(self, offset, whence=io.SEEK_SET):
+        if whence == io.SEEK_CUR:
+            offset += self._position
+        elif whence == io.SEEK_END:
+            offset += len(self._mapped_file)
+        if offset < 0:
+            # Same as seeking file, ZipFile relies on it to detect files too small to be zip archive
+            raise OSError('Invalid seek position')
+        self._position = offset
+        return self._position
+
+    def tell(self):
+        return self._position
+
+    def read(self, size=-1):
+        end = len(self._mapped_file) if size is None or size < 0 else self._position + size
+        data = self._mapped_file[self._position:end]
+        self._position += len(data)
+        return data
+
+    def readinto(self, buffer):
+        data = self.read(len(buffer))
+        buffer[:len(data)] = data
+        return len(data)
+
+
+class PbixArchive:
+    """
+    Read only access to entries of Power BI file given as path, bytes like object or seekable binary file object.
+
+    Power BI file is a zip archive whose DataModel entry can be hundreds of MB, while theme generation only needs
+    Report/Layout. File given by path is memory mapped, so opening archive reads nothing but its central directory and
+    reading an entry touches only pages of that entry, whatever size the rest of the file has. ZIP64 archives are
+    supported. Archive should be closed as soon as it is read, as mapped file can not be replaced on Windows.
+    """
+
+    def __init__(self, source):
+        self._file = None
+        self._mapped_file = None
+        try:
+            if isinstance(source, (str, os.PathLike)):
+                self._file = open(source, 'rb')
+                try:
+                    self._mapped_file = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+                except ValueError:
+                    # Empty file can not be mapped
+                    raise BadZipFile('File is not a zip file') from None
+                archive_stream = _MappedFileStream(self._mapped_file)
+            elif isinstance(source, (bytes, bytearray, memoryview)):
+                archive_stream = io.BytesIO(source)
+            else:
+                # File object is left open on close, it belongs to caller
+                archive_stream = source
+            self._archive_stream = archive_stream
+            self._zip_file = ZipFile(archive_stream, 'r')
+        except BaseException:
+            self._close_file()
+            raise
+
+    def getinfo(self, name):
+        return self._zip_file.getinfo(name)
+
+    def namelist(self):
+        return self._zip_file.namelist()
+
+    def open(self, name):
+        """
+        Returns binary stream of uncompressed content of entry, read from archive only as stream is read.
+        """
+        return self._zip_file.open(name, 'r')
+
+    def read(self, name):
+        return self._zip_file.read(name)
+
+    def iter_raw_data(self, name, chunk_size=_COPY_CHUNK_SIZE):
+        """
+        Yields compressed content of entry as it is stored in archive, in chunks of at most chunk_size bytes, so entry
+        can be copied to other archive without being decompressed and compressed again.
+        """
+        info = self.getinfo(name)
+        archive_stream = self._archive_stream
+        archive_stream.seek(info.header_offset)
+        header = archive_stream.read(_LOCAL_FILE_HEADER.size)
+        if len(header) != _LOCAL_FILE_HEADER.size or header[:4] != _LOCAL_FILE_HEADER_SIGNATURE:
+            raise BadZipFile('Bad magic number for file header of ' + name)
+        name_length, extra_length = _LOCAL_FILE_HEADER.unpack(header)[-2:]
+        position = info.header_offset + _LOCAL_FILE_HEADER.size + name_length + extra_length
+        end = position + info.compress_size
+        while position < end:
+            # ZipFile reads same stream, so position is set again before every read
+            archive_stream.seek(position)
+            chunk = archive_stream.read(min(chunk_size, end - position))
+            if len(chunk) == 0:
+                raise BadZipFile('Truncated file data of ' + name)
+            position += len(chunk)
+            yield chunk
+
+    def _close_file(self):
+        if self._mapped_file is not None:
+            self._mapped_file.close()
+            self._mapped_file = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def close(self):
+        self._zip_file.close()
+        self._close_file()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+def _strip_zip64_extra(extra):
+    # ZIP64 sizes of copied entry are written again by ZipInfo.FileHeader when needed, so old ones are left out
+    stripped_extra = b''
+    position = 0
+    while position + 4 <= len(extra):
+        extra_id, extra_length = struct.unpack('<HH', extra[position:position + 4])
+        if extra_id != _ZIP64_EXTRA_ID:
+            stripped_extra += extra[position:position + 4 + extra_length]
+        position += 4 + extra_length
+    return stripped_extra
+
+
+class PbixWriter:
+    """
+    Writes new Power BI file entry by entry. Entries which are not changed are copied from PbixArchive as compressed
+    bytes, so copying even DataModel of hundreds of MB only takes as long as reading and writing it.
+    """
+
+    def __init__(self, file_path):
+        self._zip_file = ZipFile(file_path, 'w', ZIP_DEFLATED, allowZip64=True)
+
+    def write_entry(self, source_info, data):
+        """
+        Writes entry with new content, keeping name, time and compression of source_info which is ZipInfo of
+        entry in source archive.
+        """
+        info = ZipInfo(source_info.filename, source_info.date_time)
+        info.compress_type = source_info.compress_type
+        info.external_attr = source_info.external_attr
+        info.create_system = source_info.create_system
+        self._zip_file.writestr(info, data)
+
+    def copy_raw_entry(self, source_archive, name):
+        zip_file = self._zip_file
+        info = copy.copy(source_archive.getinfo(name))
+        # CRC and sizes are known up front, so they are written in local header instead of data descriptor after data
+        info.flag_bits &= ~_DATA_DESCRIPTOR_FLAG
+        info.extra = _strip_zip64_extra(info.extra)
+        info.header_offset = zip_file.fp.tell()
+        zip_file.fp.write(info.FileHeader(info.file_size > ZIP64_LIMIT or info.compress_size > ZIP64_LIMIT))
+        for chunk in source_archive.iter_raw_data(name):
+            zip_file.fp.write(chunk)
+        # Same bookkeeping ZipFile does for entries it writes itself, central directory is written from it on close
+        zip_file.filelist.append(info)
+        zip_file.NameToInfo[info.filename] = info
+        zip_file.start_dir = zip_file.fp.tell()
+
+    def close(self):
+        self._zip_file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
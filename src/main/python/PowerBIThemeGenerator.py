@@ -1,192 +1,391 @@
-from zipfile import ZipFile, BadZipFile, LargeZipFile
-from Util import ColorUtil
-import json
-import io
-from ErrorLoggingService import LogException, ShowErrorDialog
+from zipfile import BadZipFile
+import hashlib
+import os
+import threading
+from ReportLayoutParser import ReportLayoutParser
+from PropertyDecoder import PropertyDecoder
+from Diagnostics import DiagnosticsCollector
+from ExtractionMemo import ExtractionMemo, PARSED_CONFIG_INDEX, get_fingerprint
+from ExtractedRecords import ExtractedPage, ExtractedVisual
+from PbixArchive import PbixArchive, LAYOUT_ENTRY_NAME
+from Profiling import profile_span
 
 
 class PowerBIThemeGenerator:
-    _default_theme_accent_colors = ["#FFFFFF", "#000000", "#01B8AA", "#374649", "#FD625E", "#F2C80F", "#5F6B6D",
+    # Shared by all theme generators so unchanged visuals and report pages are not extracted again when report is
+    # reloaded or another report built from same template is loaded
+    _extracted_visuals_memo = ExtractionMemo(50000)
+    _extracted_pages_memo = ExtractionMemo(1000)
+
+    _default_theme_accent_colors = ("#FFFFFF", "#000000", "#01B8AA", "#374649", "#FD625E", "#F2C80F", "#5F6B6D",
                                     "#8AD4EB", "#FE9666", "#A66999", "#3599B8", "#DFBFBF", "#4AC5BB", "#5F6B6D",
                                     "#FB8281", "#F4D25A", "#7F898A", "#A4DDEE", "#FDAB89", "#B687AC", "#28738A",
                                     "#A78F8F", "#168980", "#293537", "#BB4A4A", "#B59525", "#475052", "#6A9FB0",
                                     "#BD7150", "#7B4F71", "#1B4D5C", "#706060", "#0F5C55", "#1C2325", "#7D3231",
                                     "#796419", "#303637", "#476A75", "#7E4B36", "#52354C", "#0D262E", "#544848",
-                                    ]
+                                    )
+
+    @classmethod
+    def clear_extraction_memo(cls):
+        cls._extracted_visuals_memo.clear()
+        cls._extracted_pages_memo.clear()
+        PARSED_CONFIG_INDEX.clear()
 
-    def __init__(self, pbi_file_path=None):
-        if pbi_file_path is None:
+    def __init__(self, pbi_file=None, extraction_cache=None, diagnostics=None):
+        """
+        pbi_file is path of Power BI file, its content as bytes like object or seekable binary file object. Extraction
+        cache is only used for Power BI file given by path.
+        """
+        if pbi_file is None:
             raise ValueError('No power bi file provided')
-        else:
-            if pbi_file_path.endswith('.pbix'):
-                self._pbi_file_path = pbi_file_path
+        self._pbi_file = pbi_file
+        self._pbi_file_path = None
+        if isinstance(pbi_file, (str, os.PathLike)):
+            if os.fspath(pbi_file).endswith('.pbix'):
+                self._pbi_file_path = os.fspath(pbi_file)
             else:
                 raise ValueError(".pbix file not provided")
-        self._get_report_layout_data()
+        self._layout_data = None
+        self._visual_container_fingerprints = {}
+        self._report_pages = None
+        self._extracted_pages = {}
+        self._extraction_cache = extraction_cache
+        self._extraction_cache_key = None
+        self._extracted_pages_changed = False
+        self._extraction_cacheable = True
+        # Report pages can be extracted by GUI thread while loader thread extracts the rest for PropertyIndex
+        self._extraction_lock = threading.Lock()
+        self._diagnostics = diagnostics if diagnostics is not None else DiagnosticsCollector()
+        self._property_decoder = PropertyDecoder(self._default_theme_accent_colors)
 
     def _get_report_layout_data(self):
         self._layout_data = None
-        layout_path_in_zip = 'Report/Layout'
         try:
-            with ZipFile(self._pbi_file_path, 'r') as power_bi_file:
-                self._layout_data = json.load(io.BytesIO(power_bi_file.read(layout_path_in_zip)))
-        except (BadZipFile, LargeZipFile) as e:
-            ShowErrorDialog(LogException(e))
+            self._layout_data = {
+                'sections': list(self.iter_report_sections())
+            }
+        except BadZipFile as e:
+            self._diagnostics.record(e)
+            self._layout_data = {
+                'sections': []
+            }
+
+    def get_diagnostics(self):
+        """
+        Returns DiagnosticsCollector holding every part of Power BI file which could not be read, such as visual with
+        malformed config. Those parts are skipped so rest of report is still extracted.
+        """
+        return self._diagnostics
+
+    def iter_report_sections(self, progress_callback=None):
+        """
+        Yields report sections one by one while Report/Layout is being read from Power BI file. Unlike
+        get_report_sections sections are not kept in memory once consumer is done with them. progress_callback is
+        called before every section is yielded with number of Report/Layout bytes read, total bytes and the section.
+        """
+        if self._layout_data is not None:
+            for report_section in self._layout_data['sections']:
+                if progress_callback is not None:
+                    progress_callback(1, 1, report_section)
+                yield report_section
+            return
+
+        with profile_span('open_pbix'):
+            power_bi_file = PbixArchive(self._pbi_file)
+        with power_bi_file:
+            layout_file_size = power_bi_file.getinfo(LAYOUT_ENTRY_NAME).file_size
+            with power_bi_file.open(LAYOUT_ENTRY_NAME) as layout_stream:
+                report_layout_parser = ReportLayoutParser(layout_stream, layout_file_size)
+                report_sections = report_layout_parser.iter_sections()
+                while True:
+                    # Only time spent reading section is part of span, not time consumer spends on it
+                    with profile_span('decode_layout_section') as span:
+                        report_section = next(report_sections, None)
+                        if report_section is None:
+                            break
+                        span.args['section'] = report_section['name']
+                    if progress_callback is not None:
+                        progress_callback(report_layout_parser.bytes_read, layout_file_size, report_section)
+                    yield report_section
+
+    def load(self, progress_callback=None):
+        """
+        Reads everything needed to list report pages and extract them lazily, i.e. cached extraction if there is one
+        or else summary of every report section. progress_callback is called same as in iter_report_sections and
+        loading is cancelled as soon as it returns False, in which case False is returned.
+        """
+        self._load_extraction_cache()
+        if self._report_pages is not None and len(self._extracted_pages) == len(self._report_pages):
+            return True
+
+        cancelled = False
+
+        def _section_read(bytes_read, total_bytes, report_section):
+            nonlocal cancelled
+            cancelled = progress_callback is not None and \
+                progress_callback(bytes_read, total_bytes, report_section) is False
+
+        report_pages = []
+        for report_section in self.iter_report_sections(_section_read):
+            if cancelled:
+                return False
+            # Report section itself is not kept, it is read again when its report page is extracted
+            report_pages.append(self._get_report_page_summary(report_section))
+        self._report_pages = report_pages
+        return True
 
     def get_report_sections(self):
+        if self._layout_data is None:
+            self._get_report_layout_data()
         return self._layout_data['sections']
 
-    def _get_all_visuals_type_in_report(self):
+    def _parse_visual_container_config(self, report_section_name, container_index, visual_container, fingerprint):
         try:
-            all_visual_types = []
-            for section in self._layout_data['sections']:
-                for visualContainer in section['visualContainers']:
-                    visual_type = json.loads(visualContainer['config'])['singleVisual']['visualType']
-                    if visual_type not in all_visual_types:
-                        all_visual_types.append(visual_type)
-            return all_visual_types
-        except Exception as e:
-            ShowErrorDialog(LogException(e))
+            return PARSED_CONFIG_INDEX.get(visual_container['config'], fingerprint)
+        except (KeyError, TypeError, ValueError) as e:
+            # Visual with malformed config is left out, None keeps index of other containers
+            self._diagnostics.record(e, report_section_name, container_index)
+            return None
+
+    def _get_visual_container_fingerprints(self, report_section):
+        visual_container_fingerprints = self._visual_container_fingerprints.get(report_section['name'])
+        if visual_container_fingerprints is None:
+            visual_container_fingerprints = self._visual_container_fingerprints[report_section['name']] = [
+                get_fingerprint(visual_container.get('config', ''))
+                for visual_container in report_section['visualContainers']
+            ]
+        return visual_container_fingerprints
 
     def _get_page_wise_visual_properties(self, report_page_section):
+        report_section_name = report_page_section['name']
+        visuals = []
+        # Only configs of visuals which are not in extracted visuals memo are parsed, through shared parsed config index
+        visual_container_fingerprints = self._get_visual_container_fingerprints(report_page_section)
+        for container_index, visual_container in enumerate(report_page_section['visualContainers']):
+            visual = self._extracted_visuals_memo.get(visual_container_fingerprints[container_index])
+            if visual is None:
+                diagnostic_count = len(self._diagnostics)
+                config = self._parse_visual_container_config(report_section_name, container_index, visual_container,
+                                                             visual_container_fingerprints[container_index])
+                visual = self._extract_visual(report_section_name, container_index, config)
+                if visual is None:
+                    continue
+                # Visuals with skipped properties are extracted again next time so their diagnostics are not lost
+                if len(self._diagnostics) == diagnostic_count:
+                    self._extracted_visuals_memo.put(visual_container_fingerprints[container_index], visual)
+            visuals.append(visual)
 
         try:
-            page_visuals_properties = {
-                'reportPageDisplayName': report_page_section['displayName'],
-                'visuals': [],
-            }
+            page_config = PARSED_CONFIG_INDEX.get(report_page_section['config'])
+            page_objects = self._fetch_object_properties_value(page_config.get('objects', {}), report_section_name)
+        except Exception as e:
+            self._diagnostics.record(e, report_section_name, property_path='objects')
+        else:
+            visuals.append(ExtractedVisual(None, 'page', page_objects))
+        return ExtractedPage(report_page_section['displayName'], visuals)
 
-            for visualContainer in report_page_section['visualContainers']:
-                config = json.loads(visualContainer['config'])
-                vcObjects = config['singleVisual'].get('vcObjects')
-                objects = config['singleVisual'].get('objects')
+    def _extract_visual(self, report_section_name, container_index, config):
+        if config is None:
+            return None
+        try:
+            # Objects and vcObjects are merged in new dict so config is left as it was
+            objects = dict(config['singleVisual'].get('objects') or {})
+            objects.update(config['singleVisual'].get('vcObjects') or {})
+            visual_type = config['singleVisual']['visualType']
+        except Exception as e:
+            self._diagnostics.record(e, report_section_name, container_index, 'singleVisual')
+            return None
+        return ExtractedVisual(config.get('name'), visual_type,
+                               self._fetch_object_properties_value(objects, report_section_name, container_index))
 
-                # print(objects)
+    def _fetch_object_properties_value(self, objects, report_section_name, container_index=None):
+        def _property_failed(property_path, error):
+            self._diagnostics.record(error, report_section_name, container_index, property_path)
 
-                if objects is None and vcObjects is None:
-                    config['singleVisual']['objects'] = {}
-                elif objects is None and vcObjects is not None:
-                    config['singleVisual']['objects'] = config['singleVisual'].get('vcObjects')
-                elif objects is not None and vcObjects is not None:
-                    config['singleVisual']['objects'].update(config['singleVisual'].get('vcObjects'))
+        with profile_span('decode_properties', section=report_section_name, container=container_index):
+            return self._property_decoder.decode_objects(objects, _property_failed)
 
-                visual_objects = self._fetch_object_properties_value(config['singleVisual']['objects'])
+    def _load_extraction_cache(self):
+        if self._extraction_cache is None or self._extraction_cache_key is not None or self._pbi_file_path is None:
+            return
+        with profile_span('load_extraction_cache') as span:
+            with PbixArchive(self._pbi_file_path) as power_bi_file:
+                layout_crc = power_bi_file.getinfo(LAYOUT_ENTRY_NAME).CRC
+            self._extraction_cache_key = self._extraction_cache.get_cache_key(self._pbi_file_path, layout_crc)
+            cached_data = self._extraction_cache.load(self._extraction_cache_key)
+            span.args['hit'] = cached_data is not None
+        if cached_data is not None:
+            self._report_pages = cached_data['reportPages']
+            self._extracted_pages = {
+                report_section_name: ExtractedPage.from_dict(report_page)
+                for report_section_name, report_page in cached_data['reportVisualData'].items()
+            }
 
-                page_visuals_properties['visuals'].append({
-                    'visual_type': config['singleVisual']['visualType'],
-                    'objects': visual_objects,
+    def save_extraction_cache(self):
+        """
+        Stores every report page extracted so far as one extraction cache entry. Lazily extracted report pages are not
+        stored as they are accessed, call this once they are extracted or before theme generator is dropped. Does
+        nothing when no report page was extracted since last call.
+        """
+        with self._extraction_lock:
+            if self._extraction_cache_key is None or not self._extracted_pages_changed or self._report_pages is None \
+                    or not self._extraction_cacheable:
+                return
+            with profile_span('save_extraction_cache'):
+                self._extraction_cache.store(self._extraction_cache_key, {
+                    'reportPages': self._report_pages,
+                    'reportVisualData': {
+                        report_section_name: report_page.to_dict()
+                        for report_section_name, report_page in self._extracted_pages.items()
+                    },
                 })
+            self._extracted_pages_changed = False
 
-            page_properties = self._get_page_properties(report_page_section)
-            if page_properties is not None:
-                page_objects = self._fetch_object_properties_value(page_properties.get('objects', {}))
-                if page_objects is not None:
-                    page_visuals_properties['visuals'].append({
-                        'visual_type': 'page',
-                        'objects': page_objects,
-                    })
-            return page_visuals_properties
-        except Exception as e:
-            ShowErrorDialog(LogException(e))
+    def _get_report_section_fingerprint(self, report_section):
+        # Visual properties of report page only depend on these, so pages with same fingerprint extract the same
+        section_hash = hashlib.sha1()
+        for text in (report_section['displayName'], report_section['config']):
+            section_hash.update(str(text).encode('utf-8', 'surrogatepass'))
+            section_hash.update(b'\0')
+        for visual_container_fingerprint in self._get_visual_container_fingerprints(report_section):
+            section_hash.update(visual_container_fingerprint)
+        return section_hash.hexdigest()
 
-    def _fetch_object_properties_value(self, objects):
-        try:
-            visual_objects = {}
-            for objectName, object_properties in objects.items():
-                visual_objects[objectName] = {}
-                for object_property_name, object_property_value in object_properties[0]['properties'].items():
-                    if type(object_property_value) is dict:
-                        if any(key in object_property_value for key in ['expr', 'solid']):
-                            property_value = ''
-                            if object_property_value.get('expr') is not None:
-                                try:
-                                    property_value = object_property_value.get('expr').get('Literal').get('Value')
-                                    property_value = self._fixPropertyValue(property_value)
-                                except AttributeError as e:
-                                    # print(object_property_name, object_property_value)
-                                    pass
-                            elif object_property_value.get('solid') is not None:
-                                try:
-
-                                    color_value = object_property_value.get('solid').get('color').get('expr')
-                                    if color_value.get('Literal') is not None:
-                                        property_value = object_property_value.get('solid').get('color').get(
-                                            'expr').get(
-                                            'Literal').get(
-                                            'Value')
-                                        property_value = self._fixPropertyValue(property_value)
-                                    elif color_value.get('ThemeDataColor') is not None:
-                                        color = self._default_theme_accent_colors[color_value.get('ThemeDataColor')
-                                            .get('ColorId')]
-                                        shade_percent = color_value.get('ThemeDataColor').get('Percent')
-                                        if color[0] is not '#':
-                                            color = '#' + color
-                                        ColorUtil.ShadeColor(color, shade_percent)
-                                        property_value = ColorUtil.ShadeColor(color, shade_percent)
-                                    property_value = {
-                                        'solid': {
-                                            'color': property_value
-                                        }
-                                    }
-                                except AttributeError as e:
-                                    # print(object_property_name, object_property_value)
-                                    pass
-                            visual_objects[objectName][object_property_name] = property_value
-                    else:
-                        visual_objects[objectName][object_property_name] = object_property_value[0]
-
-            return visual_objects
-        except Exception as e:
-            ShowErrorDialog(LogException(e))
+    def _get_report_page_summary(self, report_section):
+        return {
+            'name': report_section['name'],
+            'displayName': report_section['displayName'],
+            'visualCount': len(report_section['visualContainers']),
+            'fingerprint': self._get_report_section_fingerprint(report_section),
+        }
 
-    def _get_page_properties(self, report_page_section):
-        page_properties = json.loads(report_page_section['config'])
-        return page_properties
+    def adopt_unchanged_pages(self, previous_theme_generator):
+        """
+        Takes over report pages already extracted by theme generator of earlier version of same Power BI file whose
+        report sections did not change since, so only changed report pages are extracted again. Returns names of
+        report sections which are new or changed.
+        """
+        previous_fingerprints = {
+            report_page['name']: report_page.get('fingerprint')
+            for report_page in previous_theme_generator.get_report_pages()
+        }
+        # Pages which were extracted with failures are extracted again so their diagnostics are not lost
+        previous_failed_sections = {
+            diagnostic.report_section for diagnostic in previous_theme_generator.get_diagnostics()
+        }
+        changed_report_sections = []
+        for report_page in self.get_report_pages():
+            report_section_name = report_page['name']
+            if report_page['fingerprint'] != previous_fingerprints.get(report_section_name):
+                changed_report_sections.append(report_section_name)
+                continue
+            previous_report_page = previous_theme_generator._extracted_pages.get(report_section_name)
+            if previous_report_page is not None and report_section_name not in previous_failed_sections \
+                    and report_section_name not in self._extracted_pages:
+                self._extracted_pages[report_section_name] = previous_report_page
+                self._extracted_pages_changed = True
+        return changed_report_sections
 
-    def _fixPropertyValue(self, value):
-        try:
-            if type(value) is str:
-                if "'" in value:
-                    value = value.strip("'")
-                    value = value.replace("''", "")  # For font family
-
-                if value[-1] in ['L', 'D'] and value[0] != '#':
-                    value = int(float(value[0:-1]))
-                    return value
-
-                if value.isdigit():
-                    value = int(float(value))
-                    return value
-
-                if value in ['true', 'false']:
-                    if value == 'true':
-                        value = True
-                    else:
-                        value = False
-                    return value
-            return value
-        except Exception as e:
-            ShowErrorDialog(LogException(e))
+    def get_report_pages(self):
+        """
+        Returns name, display name and number of visuals of every report page without extracting visual properties.
+        """
+        self._load_extraction_cache()
+        if self._report_pages is None:
+            try:
+                self._report_pages = [
+                    self._get_report_page_summary(report_section) for report_section in self.iter_report_sections()
+                ]
+            except BadZipFile as e:
+                self._diagnostics.record(e)
+                self._report_pages = []
+        return self._report_pages
 
-    def modifiedDataStructure(self):
-        try:
-            _reportVisualData = {}
-            for reportSection in self.get_report_sections():
-                _reportVisualData[reportSection['name']] = self._get_page_wise_visual_properties(reportSection)
+    def _get_report_section(self, report_section_name):
+        # Report sections are not kept in memory, so Report/Layout is read again up to section asked for
+        for report_section in self.iter_report_sections():
+            if report_section['name'] == report_section_name:
+                return report_section
+        raise KeyError(report_section_name)
 
-            for reportPage in _reportVisualData:
-                for visual in _reportVisualData[reportPage].get('visuals'):
-                    visual['__selected'] = False
-                    visualObjects = visual.get('objects')
-                    for object in visualObjects:
-                        visualObjects[object]['__selected'] = True
+    def _extract_report_page(self, reportSectionName, reportSection=None):
+        with self._extraction_lock:
+            self._load_extraction_cache()
+            reportPage = self._extracted_pages.get(reportSectionName)
+            if reportPage is None:
+                if reportSection is None:
+                    reportSection = self._get_report_section(reportSectionName)
+                with profile_span('extract_page', section=reportSectionName,
+                                  displayName=reportSection['displayName']) as span:
+                    reportSectionFingerprint = self._get_report_section_fingerprint(reportSection)
+                    reportPage = self._extracted_pages_memo.get(reportSectionFingerprint)
+                    span.args['memoHit'] = reportPage is not None
+                    if reportPage is None:
+                        diagnosticCount = len(self._diagnostics)
+                        reportPage = self._get_page_wise_visual_properties(reportSection)
+                        if len(self._diagnostics) > diagnosticCount:
+                            # Caching page with skipped parts would hide them from diagnostics of later runs
+                            self._extraction_cacheable = False
+                        else:
+                            self._extracted_pages_memo.put(reportSectionFingerprint, reportPage)
+                self._extracted_pages[reportSectionName] = reportPage
+                self._extracted_pages_changed = True
+            return reportPage
 
+    def iter_extracted_report_pages(self):
+        """
+        Yields report section name and ExtractedPage of every report page in report order. Report pages which are not
+        extracted yet are extracted while Report/Layout is read once, instead of reading it again for each of them.
+        """
+        self._load_extraction_cache()
+        if self._report_pages is not None and all(
+                report_page['name'] in self._extracted_pages for report_page in self._report_pages):
+            for report_page in self._report_pages:
+                yield report_page['name'], self._extracted_pages[report_page['name']]
+            return
+
+        report_pages = []
+        for report_section in self.iter_report_sections():
+            report_pages.append(self._get_report_page_summary(report_section))
+            yield report_section['name'], self._extract_report_page(report_section['name'], report_section)
+        self._report_pages = report_pages
+
+    def modifiedDataStructure(self, lazy=False):
+        """
+        Returns ExtractedPage of every report page keyed by report section name, to_dict of ExtractedPage gives it as
+        plain dict. With lazy set to True report pages are extracted only when they are accessed for the first time,
+        see LazyReportVisualData. Returns None when Power BI file can not be read, reason is recorded in diagnostics.
+        """
+        try:
+            if lazy:
+                return LazyReportVisualData(self)
+
+            _reportVisualData = dict(self.iter_extracted_report_pages())
+            self.save_extraction_cache()
             return _reportVisualData
         except Exception as e:
-            ShowErrorDialog(LogException(e))
+            self._diagnostics.record(e)
+
+
+class LazyReportVisualData(dict):
+    """
+    Report visual data which extracts report page the first time it is accessed by its report section name and keeps
+    it for later use. Iterating over it only gives report pages which are already extracted, use get_report_pages of
+    PowerBIThemeGenerator to list all report pages. Extracted report pages are not written to extraction cache, see
+    save_extraction_cache of PowerBIThemeGenerator.
+    """
+
+    def __init__(self, theme_generator):
+        super().__init__()
+        self._theme_generator = theme_generator
+
+    def __missing__(self, report_section_name):
+        report_page = self._theme_generator._extract_report_page(report_section_name)
+        self[report_section_name] = report_page
+        return report_page
 
 
 if __name__ == '__main__':
     themeGenerator = PowerBIThemeGenerator('C:/test.pbix')
-    theme_data = themeGenerator._get_report_layout_data()
-    print(theme_data)
+    for section in themeGenerator.iter_report_sections():
+        print(section['displayName'])
@@ -0,0 +1,310 @@
+import argparse
+import glob
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from PowerBIThemeGenerator import PowerBIThemeGenerator
+from ExtractionCache import ExtractionCache
+from ErrorLoggingService import InitializeLogging
+import Profiling
+from Diagnostics import DiagnosticsCollector
+from SelectionStore import SelectionStore
+from ThemeApplier import apply_theme
+from ThemeEngine import ThemeConflict, build_theme, merge_themes, FIRST_REPORT_WINS, LAST_REPORT_WINS
+from ThemeValidator import validate_theme, get_errors
+from ThemeWriter import write_theme
+import AppInfo
+
+
+def _find_power_bi_files(inputs):
+    pbi_file_paths = []
+    for input_path in inputs:
+        if os.path.isdir(input_path):
+            candidates = sorted(glob.glob(os.path.join(input_path, '*.pbix')))
+        else:
+            candidates = sorted(glob.glob(input_path, recursive=True))
+        for candidate in candidates:
+            if candidate.endswith('.pbix') and os.path.isfile(candidate) and candidate not in pbi_file_paths:
+                pbi_file_paths.append(candidate)
+    return pbi_file_paths
+
+
+def _apply_selection_rules(report_visual_data, visual_types=None, objects=None, wildcard_objects=None):
+    # Theme can hold only one style per visual type so first visual of each type in report page order is used.
+    # Same goes for wild card objects, first selected visual having the object provides its properties.
+    selection_store = SelectionStore(report_visual_data)
+    selected_visual_types = set()
+    selected_wildcard_objects = set()
+    for report_page in report_visual_data:
+        for visual_index, visual in enumerate(report_visual_data[report_page].visuals):
+            visual_type = visual.visual_type
+            if visual_type in selected_visual_types or (visual_types and visual_type not in visual_types):
+                continue
+            selected_visual_types.add(visual_type)
+            selection_store.set_visual_selected(report_page, visual_index, True)
+            for object_index, (object, object_properties) in enumerate(visual.objects.items()):
+                if len(object_properties) == 0:
+                    continue
+                if objects and object not in objects:
+                    selection_store.set_object_selected(report_page, visual_index, object_index, False)
+                elif wildcard_objects and object in wildcard_objects and object not in selected_wildcard_objects:
+                    selected_wildcard_objects.add(object)
+                    selection_store.set_wildcard(report_page, visual_index, object_index, True)
+    return selection_store
+
+
+def _initialize_worker_process(profile=False):
+    # Only main process writes log file, rotating it from several processes would lose records. Same goes for trace
+    # file, spans of worker are returned with its results.
+    InitializeLogging(writeLogFile=False)
+    Profiling.enable_profiling(profile)
+
+
+def _write_theme_file(theme_data, output_directory, theme_name, compact):
+    theme_file_path = os.path.join(output_directory, theme_name + '.json')
+    with open(theme_file_path, 'w') as theme_file:
+        write_theme(theme_data, theme_file, compact)
+    return theme_file_path
+
+
+def _check_theme(theme_data, result, strict):
+    problems = validate_theme(theme_data)
+    result['problems'] = [problem.to_dict() for problem in problems]
+    errors = get_errors(problems)
+    if strict and len(errors) > 0:
+        raise ValueError('Theme has {} invalid values'.format(len(errors)))
+
+
+def _print_problems(problems):
+    for problem in problems:
+        print('      {} {}: {}'.format('Invalid value' if problem['severity'] == 'error' else 'Suspicious value',
+                                       problem['path'] or '<theme>', problem['message']))
+
+
+def _generate_theme_file(pbi_file_path, output_directory, visual_types, objects, wildcard_objects, use_cache,
+                         compact=False, strict=False):
+    # Without output directory theme is not written but returned in result, for themes which are merged
+    start_time = time.perf_counter()
+    start_time_ns = time.perf_counter_ns()
+    result = {
+        'file': pbi_file_path,
+        'output': None,
+        'theme': None,
+        'error': None,
+        'problems': [],
+    }
+    diagnostics = DiagnosticsCollector()
+    profile_event_index = Profiling.get_event_count()
+    try:
+        theme_generator = PowerBIThemeGenerator(pbi_file_path, ExtractionCache() if use_cache else None, diagnostics)
+        report_visual_data = theme_generator.modifiedDataStructure()
+        if report_visual_data is None:
+            raise ValueError('Unable to extract visual properties. ' + diagnostics.get_summary(max_lines=1))
+        selection_store = _apply_selection_rules(report_visual_data, visual_types, objects, wildcard_objects)
+
+        theme_name = os.path.splitext(os.path.basename(pbi_file_path))[0]
+        theme_data = build_theme(selection_store, theme_name).theme
+        _check_theme(theme_data, result, strict)
+        if output_directory is None:
+            result['theme'] = theme_data
+        else:
+            result['output'] = _write_theme_file(theme_data, output_directory, theme_name, compact)
+    except Exception as e:
+        result['error'] = '{}: {}'.format(type(e).__name__, e)
+    result['diagnostics'] = diagnostics.to_list()
+    result['seconds'] = time.perf_counter() - start_time
+    if Profiling.is_profiling_enabled():
+        Profiling.record_span('generate_theme_file', start_time_ns, time.perf_counter_ns(), {'file': pbi_file_path})
+        result['profile'] = (Profiling.get_events(profile_event_index), Profiling.get_thread_names())
+    return result
+
+
+def _apply_theme_file(pbi_file_path, theme_data, output_directory):
+    start_time = time.perf_counter()
+    start_time_ns = time.perf_counter_ns()
+    profile_event_index = Profiling.get_event_count()
+    result = {
+        'file': pbi_file_path,
+        'output': None,
+        'error': None,
+        'problems': [],
+        'diagnostics': [],
+    }
+    try:
+        output_file_path = os.path.join(output_directory, os.path.basename(pbi_file_path))
+        result['changed'] = apply_theme(pbi_file_path, theme_data, output_file_path)
+        result['output'] = output_file_path
+    except Exception as e:
+        result['error'] = '{}: {}'.format(type(e).__name__, e)
+    result['seconds'] = time.perf_counter() - start_time
+    if Profiling.is_profiling_enabled():
+        Profiling.record_span('apply_theme_file', start_time_ns, time.perf_counter_ns(), {'file': pbi_file_path})
+        result['profile'] = (Profiling.get_events(profile_event_index), Profiling.get_thread_names())
+    return result
+
+
+def _load_theme_to_apply(theme_file_path):
+    try:
+        with open(theme_file_path, 'r', encoding='utf-8-sig') as theme_file:
+            theme_data = json.load(theme_file)
+    except (OSError, ValueError) as e:
+        print('Unable to read theme file {}: {}'.format(theme_file_path, e), file=sys.stderr)
+        return None
+    problems = validate_theme(theme_data)
+    errors = get_errors(problems)
+    if len(errors) > 0:
+        print('Theme file {} has {} invalid values'.format(theme_file_path, len(errors)), file=sys.stderr)
+        _print_problems([problem.to_dict() for problem in problems])
+        return None
+    return theme_data
+
+
+def _merge_theme_files(results, arguments):
+    themes = [
+        (os.path.splitext(os.path.basename(result['file']))[0], result['theme'])
+        for result in results if result['theme'] is not None
+    ]
+    if len(themes) == 0:
+        return True
+    theme_merge_result = merge_themes(themes, arguments.merge, arguments.precedence)
+    merge_result = {}
+    try:
+        _check_theme(theme_merge_result.theme, merge_result, arguments.strict)
+    except ValueError as e:
+        print('FAIL  Merged {} themes: {}'.format(len(themes), e), file=sys.stderr)
+        _print_problems(merge_result['problems'])
+        return False
+    theme_file_path = _write_theme_file(theme_merge_result.theme, arguments.output_dir, arguments.merge,
+                                        arguments.compact)
+    print('Merged {} themes -> {}'.format(len(themes), theme_file_path))
+    for override in theme_merge_result.overrides:
+        print('      {} {} found in {}, taken from {}'.format(
+            'Visual type' if override.kind == ThemeConflict.VISUAL_TYPE else 'Wild card object', override.name,
+            ', '.join(override.report_pages), override.report_pages[0]))
+    _print_problems(merge_result['problems'])
+    return True
+
+
+def _parse_arguments(arguments):
+    parser = argparse.ArgumentParser(
+        prog='PowerBIThemeGeneratorCLI',
+        description='Generate one theme file for each Power BI file without opening ' + AppInfo.Name + ' window.'
+    )
+    parser.add_argument('inputs', nargs='+',
+                        help='Power BI files, directories containing Power BI files or glob patterns such as '
+                             '"reports/**/*.pbix"')
+    parser.add_argument('-o', '--output-dir', default='.',
+                        help='Directory in which theme files are written. Default is current directory.')
+    parser.add_argument('-t', '--visual-types', nargs='+', metavar='VISUAL_TYPE',
+                        help='Visual types to add in theme. Default is all visual types found in report.')
+    parser.add_argument('--objects', nargs='+', metavar='OBJECT',
+                        help='Visual objects such as title or legend to add in theme. Default is all objects.')
+    parser.add_argument('--wildcard-objects', nargs='+', metavar='OBJECT', default=[],
+                        help='Objects to add as wild card properties which apply to all visuals.')
+    parser.add_argument('-j', '--jobs', type=int, default=os.cpu_count(),
+                        help='Number of files processed in parallel. Default is number of available cores.')
+    parser.add_argument('--no-cache', action='store_true',
+                        help='Always parse Power BI files instead of reusing visual properties extracted earlier.')
+    parser.add_argument('--compact', action='store_true',
+                        help='Write theme files without indentation and line breaks.')
+    parser.add_argument('--merge', metavar='THEME_NAME',
+                        help='Merge themes of all Power BI files into one theme file with this name instead of '
+                             'writing one theme file for each of them.')
+    parser.add_argument('--precedence', choices=[FIRST_REPORT_WINS, LAST_REPORT_WINS], default=FIRST_REPORT_WINS,
+                        help='Which Power BI file, in order given, provides visual types and wild card objects found '
+                             'in more than one of them when merging. Default is first.')
+    parser.add_argument('--apply-theme', metavar='THEME_FILE',
+                        help='Instead of generating themes, write copy of each Power BI file to output directory with '
+                             'visual styles of this theme file applied to its visuals.')
+    parser.add_argument('--strict', action='store_true',
+                        help='Do not write theme which has values Power BI does not accept, such as colors which '
+                             'could not be read, and count its Power BI file as failed. By default such theme is '
+                             'written and its invalid values are listed.')
+    parser.add_argument('--profile', metavar='TRACE_FILE',
+                        help='Write time taken by every stage of every file as Chrome trace, which can be opened in '
+                             'chrome://tracing. Setting ' + Profiling.PROFILE_ENVIRONMENT_VARIABLE + ' environment '
+                             'variable does the same.')
+    parser.add_argument('--diagnostics-report', metavar='FILE',
+                        help='Write JSON report of visuals and properties which could not be read from each file.')
+    return parser.parse_args(arguments)
+
+
+def main(arguments=None):
+    arguments = _parse_arguments(arguments)
+    InitializeLogging()
+    profile = Profiling.initialize_profiling(arguments.profile)
+
+    pbi_file_paths = _find_power_bi_files(arguments.inputs)
+    if len(pbi_file_paths) == 0:
+        print('No Power BI files found', file=sys.stderr)
+        return 2
+    theme_to_apply = None
+    if arguments.apply_theme is not None:
+        theme_to_apply = _load_theme_to_apply(arguments.apply_theme)
+        if theme_to_apply is None:
+            return 2
+    os.makedirs(arguments.output_dir, exist_ok=True)
+
+    start_time = time.perf_counter()
+    failed_count = 0
+    results = []
+    with ProcessPoolExecutor(max_workers=max(1, min(arguments.jobs, len(pbi_file_paths))),
+                             initializer=_initialize_worker_process, initargs=(profile,)) as executor:
+        if theme_to_apply is not None:
+            futures = [
+                executor.submit(_apply_theme_file, pbi_file_path, theme_to_apply, arguments.output_dir)
+                for pbi_file_path in pbi_file_paths
+            ]
+        else:
+            futures = [
+                executor.submit(_generate_theme_file, pbi_file_path,
+                                arguments.output_dir if arguments.merge is None else None, arguments.visual_types,
+                                arguments.objects, arguments.wildcard_objects, not arguments.no_cache,
+                                arguments.compact, arguments.strict)
+                for pbi_file_path in pbi_file_paths
+            ]
+        for future in as_completed(futures):
+            result = future.result()
+            results.append(result)
+            if 'profile' in result:
+                Profiling.add_events(*result.pop('profile'))
+            if result['error'] is None:
+                skipped = '  ({} parts skipped)'.format(len(result['diagnostics'])) if result['diagnostics'] else ''
+                if 'changed' in result:
+                    skipped = '  ({} visuals and report pages restyled)'.format(result['changed'])
+                print('OK    {:8.2f}s  {} -> {}{}'.format(result['seconds'], result['file'],
+                                                         result['output'] or 'theme ' + str(arguments.merge), skipped))
+            else:
+                failed_count += 1
+                print('FAIL  {:8.2f}s  {}: {}'.format(result['seconds'], result['file'], result['error']),
+                      file=sys.stderr)
+            _print_problems(result['problems'])
+
+    results.sort(key=lambda result: pbi_file_paths.index(result['file']))
+    merged = True
+    if arguments.merge is not None and theme_to_apply is None:
+        merged = _merge_theme_files(results, arguments)
+
+    print('{} of {} files processed successfully in {:.2f}s'.format(
+        len(pbi_file_paths) - failed_count, len(pbi_file_paths), time.perf_counter() - start_time))
+
+    if arguments.diagnostics_report is not None:
+        with open(arguments.diagnostics_report, 'w') as report_file:
+            json.dump({
+                'files': [
+                    {
+                        'file': result['file'],
+                        'error': result['error'],
+                        'diagnostics': result['diagnostics'],
+                        'problems': result['problems'],
+                    }
+                    for result in results
+                ],
+            }, report_file, indent=4)
+    return 1 if failed_count > 0 or not merged else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,19 +1,24 @@
-import json
+import os
 import sys
 import logging
-from functools import partial
 from PyQt5 import QtWidgets
 from PyQt5.QtGui import QColor, QFont
-from PyQt5.QtCore import Qt
+from PyQt5.QtCore import Qt, QFileSystemWatcher, QTimer, QModelIndex
 from PyQt5.QtWidgets import QApplication, QMainWindow, QAction, QFileDialog, QLabel, QPushButton, QColorDialog, \
     QDialogButtonBox
-from PyQt5.QtWidgets import QStatusBar, QListWidget, QVBoxLayout, QHBoxLayout, QWidget, QTabWidget, QTabBar
-from PyQt5.QtWidgets import QGroupBox, QCheckBox, QTreeWidget, QMessageBox, QLineEdit, QFormLayout, QDialog
-from PowerBIThemeGenerator import PowerBIThemeGenerator
-from CustomWidgets import CQListWidgetItemReportPages, CQListWidgetItemReportPageVisuals, \
-    CQTreeWidgetItemVisualProperties
+from PyQt5.QtWidgets import QStatusBar, QListView, QVBoxLayout, QHBoxLayout, QWidget, QTabWidget, QTabBar
+from PyQt5.QtWidgets import QGroupBox, QTreeView, QMessageBox, QLineEdit, QFormLayout, QDialog
+from PyQt5.QtWidgets import QProgressBar
+from ReportLoader import ReportLoaderThread
+from SelectionStore import SelectionStore
+from ThemeEngine import build_theme
+from ThemeValidator import validate_theme, get_errors
+from ThemeWriter import write_theme
+from ReportItemModels import ReportPagesModel, ReportPageVisualsModel, VisualPropertiesModel, ReportSectionNameRole
 from Util import ColorUtil
-from ErrorLoggingService import LogException, ShowErrorDialog
+from ErrorLoggingService import LogException, ShowErrorDialog, InitializeLogging
+from Profiling import profiled, initialize_profiling, is_profiling_enabled, get_event_count, format_stage_summary, \
+    write_chrome_trace, get_trace_file_path
 import AppInfo
 
 
@@ -21,17 +26,40 @@ class PowerBIThemeGeneratorWindow(QMainWindow):
 
     _powerBIThemeGenerator = None
     _pbiFilePath = None
+    _selectionStore = None
+    _shownDiagnosticCount = 0
     _horizontalLayoutTabVisualsTop = None
     _horizontalLayoutWelcomeScreen = None
     _groupBoxSelectedVisualPropertiesTree = None
-    _listWidgetReportPages = None
-    _listWidgetReportPageVisuals = None
+    _listViewReportPages = None
+    _listViewReportPageVisuals = None
+    _lineEditSearchProperties = None
     _verticalLayoutVisualsPropertiesTab = None
     _verticalLayoutMainWindow = None
-    _treeWidgetSelectedVisualProperties = None
+    _treeViewSelectedVisualProperties = None
     _tabWidgetMainWindow = None
     _tabGeneralProperties = None
     _generalProperties = {}
+    _reportLoaderThread = None
+    _progressBarReportLoading = None
+    _pushButtonCancelReportLoading = None
+    _currentReportPageSection = None
+    _fileSystemWatcher = None
+    _timerReloadPowerBIFile = None
+    _actionWatchPowerBIFile = None
+    _profileEventIndex = 0
+    _tabGeneralPropertiesPopulated = False
+    _tabVisualPropertiesPopulated = False
+    # None until loader thread has indexed every report page, which is after report is shown
+    _propertyIndex = None
+    _propertySearchQuery = ''
+    _searchPropertiesPlaceholder = 'Search properties, e.g. fontSize=12 or #FF0000'
+    # Report section name to indexes of visuals matching search query, None while nothing is searched
+    _propertySearchMatches = None
+    # Spans shown in status bar while profiling, all spans are in exported trace
+    _statusBarProfileStages = ('open_pbix', 'load_extraction_cache', 'decode_layout_section', 'extract_page',
+                               'save_extraction_cache', 'populate_report_pages', 'populate_page_visuals',
+                               'populate_visual_properties', 'build_theme', 'write_theme', 'search_properties')
 
     def __init__(self):
 
@@ -48,13 +76,14 @@ class PowerBIThemeGeneratorWindow(QMainWindow):
         # Creating status bar
         self.statusBar = QStatusBar(self)
         self.setStatusBar(self.statusBar)
+        self._createReportLoadingProgress()
+        self._createPowerBIFileWatcher()
 
         # Creating menu bar
         self._createMenuBar()
 
-        # Creating main window layout and adding widgets to them
+        # Creating main window layout, tabs are added to it by _createTabs
         self._verticalLayoutMainWindow = QVBoxLayout(self.centralWidget)
-        self._verticalLayoutMainWindow.addWidget(self._tabWidgetMainWindow)
 
         # for testing
         # self.__testOpenFileMethod()
@@ -80,10 +109,15 @@ class PowerBIThemeGeneratorWindow(QMainWindow):
         actionOpenPowerBIFile.setStatusTip('Import Power BI file from which you want to export the visual settings to '
                                            'create theme')
 
-        # actionReloadPowerBIFile = QAction('&Reload Power BI File', self)
-        # actionReloadPowerBIFile.setShortcut('Ctrl+R')
-        # actionReloadPowerBIFile.setStatusTip('Click to reload Power BI file if there are changes made in Power BI
-        # file')
+        actionReloadPowerBIFile = QAction('&Reload Power BI File', self)
+        actionReloadPowerBIFile.setShortcut('Ctrl+R')
+        actionReloadPowerBIFile.setStatusTip('Click to reload Power BI file if there are changes made in Power BI '
+                                             'file')
+
+        self._actionWatchPowerBIFile = QAction('&Watch Power BI File for Changes', self)
+        self._actionWatchPowerBIFile.setCheckable(True)
+        self._actionWatchPowerBIFile.setStatusTip('Reload Power BI file automatically whenever it is saved, keeping '
+                                                  'selected visuals')
 
         actionGenerateTheme = QAction('&Generate Theme', self)
         actionGenerateTheme.setShortcut('Ctrl+G')
@@ -93,13 +127,20 @@ class PowerBIThemeGeneratorWindow(QMainWindow):
         actionQuit.setShortcut('Ctrl+Q')
         actionQuit.setStatusTip('Click to quit application')
 
+        actionExportProfilingTrace = QAction('Export Profiling &Trace', self)
+        actionExportProfilingTrace.setStatusTip('Save timing of every stage as Chrome trace which can be opened in '
+                                                'chrome://tracing')
+
         actionAbout = QAction('&About', self)
         actionAbout.setStatusTip('Click to see detail application information and useful links')
 
         # Add actions to menu
         menuBarFile.addAction(actionOpenPowerBIFile)
-        # menuBarFile.addAction(actionReloadPowerBIFile)
+        menuBarFile.addAction(actionReloadPowerBIFile)
+        menuBarFile.addAction(self._actionWatchPowerBIFile)
         menuBarFile.addAction(actionGenerateTheme)
+        if is_profiling_enabled():
+            menuBarFile.addAction(actionExportProfilingTrace)
         menuBarFile.addSeparator()
         menuBarFile.addAction(actionQuit)
 
@@ -107,9 +148,12 @@ class PowerBIThemeGeneratorWindow(QMainWindow):
 
         # Add global events i.e. what will happen when option is selected from menu bar
         actionOpenPowerBIFile.triggered.connect(self._openPowerBIFileDialog)
+        actionReloadPowerBIFile.triggered.connect(self._reloadPowerBIFile)
+        self._actionWatchPowerBIFile.toggled.connect(self._watchPowerBIFile)
         actionQuit.triggered.connect(self.close)
         actionGenerateTheme.triggered.connect(self.generateTheme)
         actionAbout.triggered.connect(self._showAboutDialog)
+        actionExportProfilingTrace.triggered.connect(self._exportProfilingTrace)
 
     def _openPowerBIFileDialog(self):
         try:
@@ -119,27 +163,251 @@ class PowerBIThemeGeneratorWindow(QMainWindow):
                 directory = self._pbiFilePath.split('/')[0:-1]
                 directory = "/".join(directory)
 
-            self._pbiFilePath = QFileDialog.getOpenFileName(
+            pbiFilePath = QFileDialog.getOpenFileName(
                 self,
                 caption='Select Power BI File',
                 directory=directory,
                 filter='Power BI Files(*.pbix)'
             )[0]
 
-            if self._pbiFilePath is not '' and not None:
-                if self._pbiFilePath.split('/')[-1].split('.')[-1] == 'pbix':
-                    self._powerBIThemeGenerator = PowerBIThemeGenerator(self._pbiFilePath)
+            if pbiFilePath is not None and pbiFilePath != '':
+                if pbiFilePath.split('/')[-1].split('.')[-1] == 'pbix':
+                    self._loadPowerBIFile(pbiFilePath)
                 else:
                     raise ValueError('Invalid Power BI File')
-                self._reportVisualData = self._powerBIThemeGenerator.modifiedDataStructure()
+        except Exception as e:
+            ShowErrorDialog(LogException(e))
+
+    def _createReportLoadingProgress(self):
+        self._progressBarReportLoading = QProgressBar()
+        self._progressBarReportLoading.setRange(0, 100)
+        self._progressBarReportLoading.setMaximumWidth(200)
+        self._pushButtonCancelReportLoading = QPushButton('Cancel')
+        self._pushButtonCancelReportLoading.setToolTip('Stop loading Power BI file')
+        self._pushButtonCancelReportLoading.clicked.connect(self._cancelReportLoading)
+        self.statusBar.addPermanentWidget(self._progressBarReportLoading)
+        self.statusBar.addPermanentWidget(self._pushButtonCancelReportLoading)
+        self._showReportLoadingProgress(False)
+
+    def _showReportLoadingProgress(self, visible):
+        self._progressBarReportLoading.setValue(0)
+        self._progressBarReportLoading.setVisible(visible)
+        self._pushButtonCancelReportLoading.setVisible(visible)
+
+    def _createPowerBIFileWatcher(self):
+        # Power BI Desktop writes file in several steps, reload starts once file has not changed for a while
+        self._timerReloadPowerBIFile = QTimer(self)
+        self._timerReloadPowerBIFile.setSingleShot(True)
+        self._timerReloadPowerBIFile.setInterval(1500)
+        self._timerReloadPowerBIFile.timeout.connect(self._reloadPowerBIFile)
+        self._fileSystemWatcher = QFileSystemWatcher(self)
+        self._fileSystemWatcher.fileChanged.connect(self._powerBIFileChanged)
+
+    def _watchPowerBIFile(self):
+        watchedFiles = self._fileSystemWatcher.files()
+        if len(watchedFiles) > 0:
+            self._fileSystemWatcher.removePaths(watchedFiles)
+        if self._actionWatchPowerBIFile.isChecked() and self._pbiFilePath is not None:
+            self._fileSystemWatcher.addPath(self._pbiFilePath)
+        else:
+            self._timerReloadPowerBIFile.stop()
+
+    def _powerBIFileChanged(self, pbiFilePath):
+        if pbiFilePath != self._pbiFilePath or not self._actionWatchPowerBIFile.isChecked():
+            return
+        # File replaced by saving it is no longer watched
+        if pbiFilePath not in self._fileSystemWatcher.files() and os.path.isfile(pbiFilePath):
+            self._fileSystemWatcher.addPath(pbiFilePath)
+        self._timerReloadPowerBIFile.start()
+
+    def _reloadPowerBIFile(self):
+        try:
+            if self._pbiFilePath is not None and os.path.isfile(self._pbiFilePath):
+                self._loadPowerBIFile(self._pbiFilePath, self._powerBIThemeGenerator)
+        except Exception as e:
+            ShowErrorDialog(LogException(e))
+
+    def _loadPowerBIFile(self, pbiFilePath, previousPowerBIThemeGenerator=None):
+        if pbiFilePath != self._pbiFilePath:
+            # Pending reload of file open until now would interrupt loading of the new one, file is watched again if
+            # loading of the new one does not succeed
+            self._timerReloadPowerBIFile.stop()
+            watchedFiles = self._fileSystemWatcher.files()
+            if len(watchedFiles) > 0:
+                self._fileSystemWatcher.removePaths(watchedFiles)
+        # Only one file is loaded at a time, signals of previous loader are ignored once it is replaced
+        previousReportLoaderThread = self._reportLoaderThread
+        if previousReportLoaderThread is not None:
+            if previousReportLoaderThread.isRunning():
+                previousReportLoaderThread.requestInterruption()
+                previousReportLoaderThread.finished.connect(previousReportLoaderThread.deleteLater)
+            else:
+                previousReportLoaderThread.deleteLater()
+        self._reportLoaderThread = ReportLoaderThread(pbiFilePath, self, previousPowerBIThemeGenerator)
+        self._reportLoaderThread.progressChanged.connect(self._reportLoadingProgressChanged)
+        self._reportLoaderThread.reportLoaded.connect(self._reportLoaded)
+        self._reportLoaderThread.loadingFailed.connect(self._reportLoadingFailed)
+        self._reportLoaderThread.loadingCancelled.connect(self._reportLoadingCancelled)
+        self._reportLoaderThread.indexingProgressChanged.connect(self._propertyIndexingProgressChanged)
+        self._reportLoaderThread.propertyIndexBuilt.connect(self._propertyIndexBuilt)
+        self._reportLoaderThread.indexingFailed.connect(self._propertyIndexingFailed)
+        self._showReportLoadingProgress(True)
+        self._profileEventIndex = get_event_count()
+        self._reportLoaderThread.start()
+
+    def _cancelReportLoading(self):
+        if self._reportLoaderThread is not None and self._reportLoaderThread.isRunning():
+            self._reportLoaderThread.requestInterruption()
+
+    def _reportLoadingProgressChanged(self, percent, message):
+        if self.sender() is self._reportLoaderThread:
+            self._progressBarReportLoading.setValue(percent)
+            self.statusBar.showMessage(message)
+
+    def _reportLoaded(self, powerBIThemeGenerator, reportVisualData):
+        try:
+            if self.sender() is not self._reportLoaderThread:
+                return
+            self._showReportLoadingProgress(False)
+            self._saveExtractionCache()
+            self._pbiFilePath = self._reportLoaderThread.GetPbiFilePath()
+            self._powerBIThemeGenerator = powerBIThemeGenerator
+            self._reportVisualData = reportVisualData
+            self._propertyIndex = None
+            self._shownDiagnosticCount = 0
+            if self._reportLoaderThread.IsReload():
+                # Selected visuals which are still in report stay selected, report page open before reload is
+                # opened again if it still exists
+                self._selectionStore = self._selectionStore.remap(reportVisualData)
+                currentReportPageSection = self._currentReportPageSection
                 self._populateTabVisualProperties()
+                reportPagesModel = self._listViewReportPages.model()
+                for row in range(reportPagesModel.rowCount()):
+                    if reportPagesModel.index(row).data(ReportSectionNameRole) == currentReportPageSection:
+                        self._listViewReportPages.setCurrentIndex(reportPagesModel.index(row))
+                        self._createReportPageVisualsList(currentReportPageSection)
+                        break
+                self.statusBar.showMessage('Reloaded ' + self._pbiFilePath + ', ' +
+                                           str(len(self._reportLoaderThread.GetChangedReportSections())) +
+                                           ' report pages changed', 5000)
+                self._showProfileSummary('Reloaded ' + self._pbiFilePath, self._profileEventIndex)
+            else:
+                self._selectionStore = SelectionStore(reportVisualData)
+                self._propertySearchQuery = ''
+                self._populateTabVisualProperties()
+                self.statusBar.showMessage('Loaded ' + self._pbiFilePath, 5000)
+                self._showProfileSummary('Loaded ' + self._pbiFilePath, self._profileEventIndex)
+            self._watchPowerBIFile()
+            self._showDiagnosticsSummary()
+        except Exception as e:
+            ShowErrorDialog(LogException(e))
+
+    def _propertyIndexingProgressChanged(self, percent):
+        if self.sender() is self._reportLoaderThread and self._lineEditSearchProperties is not None:
+            self._lineEditSearchProperties.setPlaceholderText('Indexing report pages for search, ' + str(percent) +
+                                                              '% done')
+
+    def _propertyIndexBuilt(self, propertyIndex):
+        try:
+            if self.sender() is not self._reportLoaderThread:
+                return
+            self._propertyIndex = propertyIndex
+            if self._lineEditSearchProperties is not None:
+                self._lineEditSearchProperties.setPlaceholderText(self._searchPropertiesPlaceholder)
+            if self._listViewReportPages is not None and self._propertySearchQuery.strip() != '':
+                # Query typed while report was being indexed is searched now
+                self._searchProperties(self._propertySearchQuery)
+            # Report pages not opened yet were extracted while indexing, parts of them which could not be read are
+            # shown now
+            self._showDiagnosticsSummary()
+        except Exception as e:
+            ShowErrorDialog(LogException(e))
+
+    def _propertyIndexingFailed(self, errorMessage):
+        if self.sender() is self._reportLoaderThread:
+            if self._lineEditSearchProperties is not None:
+                self._lineEditSearchProperties.setPlaceholderText('Search is not available, see log file for details')
+            self.statusBar.showMessage('Unable to index report pages for search, see log file for details', 5000)
+
+    def _showProfileSummary(self, message, profileEventIndex):
+        # While profiling, time taken by every stage since profileEventIndex is kept in status bar
+        if is_profiling_enabled():
+            self.statusBar.showMessage(message + ': ' +
+                                       format_stage_summary(profileEventIndex, self._statusBarProfileStages))
+
+    def _exportProfilingTrace(self):
+        try:
+            traceFilePath = QFileDialog.getSaveFileName(self, 'Export Profiling Trace', get_trace_file_path() or '',
+                                                        filter='JSON file(*.json)')[0]
+            if traceFilePath != '':
+                write_chrome_trace(traceFilePath)
+                self.statusBar.showMessage('Profiling trace saved to ' + traceFilePath, 5000)
+        except Exception as e:
+            ShowErrorDialog(LogException(e))
+
+    def _showDiagnosticsSummary(self):
+        # Parts of report which could not be read are shown together once they are skipped, report pages are
+        # extracted when opened so new ones can be found every time report page is selected
+        try:
+            diagnostics = self._powerBIThemeGenerator.get_diagnostics()
+            if len(diagnostics) <= self._shownDiagnosticCount:
+                return
+            messageBoxDiagnostics = QMessageBox()
+            messageBoxDiagnostics.setWindowTitle('Report Diagnostics')
+            messageBoxDiagnostics.setIcon(QMessageBox.Warning)
+            messageBoxDiagnostics.setText(str(len(diagnostics) - self._shownDiagnosticCount) +
+                                          ' visuals or properties could not be read and are left out. '
+                                          'Click on show details button to see them.')
+            messageBoxDiagnostics.setDetailedText(diagnostics.get_summary(self._shownDiagnosticCount))
+            messageBoxDiagnostics.setStandardButtons(QMessageBox.Ok)
+            self._shownDiagnosticCount = len(diagnostics)
+            messageBoxDiagnostics.exec_()
+        except Exception as e:
+            ShowErrorDialog(LogException(e))
+
+    def _reportLoadingFailed(self, errorMessage):
+        if self.sender() is self._reportLoaderThread:
+            self._showReportLoadingProgress(False)
+            if self._reportLoaderThread.IsReload():
+                # File can be read while Power BI Desktop is still writing it, loaded report is kept and next change
+                # of file is reloaded again
+                self.statusBar.showMessage('Unable to reload ' + self._reportLoaderThread.GetPbiFilePath() +
+                                           ', see log file for details', 5000)
+            else:
+                self.statusBar.clearMessage()
+                self._watchPowerBIFile()
+                ShowErrorDialog(errorMessage)
+
+    def _reportLoadingCancelled(self):
+        if self.sender() is self._reportLoaderThread:
+            self._showReportLoadingProgress(False)
+            self._watchPowerBIFile()
+            self.statusBar.showMessage('Loading of Power BI file cancelled', 5000)
+
+    def closeEvent(self, event):
+        for reportLoaderThread in self.findChildren(ReportLoaderThread):
+            reportLoaderThread.requestInterruption()
+            reportLoaderThread.wait()
+        self._saveExtractionCache()
+        super().closeEvent(event)
+
+    def _saveExtractionCache(self):
+        # Report pages opened since report was loaded are written to extraction cache once, not every time page is
+        # opened
+        try:
+            if self._powerBIThemeGenerator is not None:
+                self._powerBIThemeGenerator.save_extraction_cache()
         except Exception as e:
             ShowErrorDialog(LogException(e))
 
     def __testOpenFileMethod(self):
+        from PowerBIThemeGenerator import PowerBIThemeGenerator
+        from PropertyIndex import PropertyIndex
         self._pbiFilePath = 'G:/Power BI Reports/Theme Template.pbix'
         self._powerBIThemeGenerator = PowerBIThemeGenerator(self._pbiFilePath)
         self._reportVisualData = self._powerBIThemeGenerator.modifiedDataStructure()
+        self._selectionStore = SelectionStore(self._reportVisualData)
+        self._propertyIndex = PropertyIndex.build(self._reportVisualData)
 
     def _createTabs(self):
         # Creating tabs
@@ -158,11 +426,26 @@ class PowerBIThemeGeneratorWindow(QMainWindow):
         self._verticalLayoutVisualsPropertiesTab = QVBoxLayout(self._tabVisualProperties)
         self._verticalLayoutMainWindow.addWidget(self._tabWidgetMainWindow)
 
-        self._populateTabGeneralProperties()
-        self._populateTabVisualProperties()
+        # Content of tab is created when tab is shown for the first time, even the first tab is only created once
+        # window is shown so window appears without waiting for it
+        self._tabWidgetMainWindow.currentChanged.connect(self._populateTab)
+        QTimer.singleShot(0, lambda: self._populateTab(self._tabWidgetMainWindow.currentIndex()))
+
+    def _populateTab(self, index):
+        try:
+            tab = self._tabWidgetMainWindow.widget(index)
+            if tab is self._tabGeneralProperties and not self._tabGeneralPropertiesPopulated:
+                self._tabGeneralPropertiesPopulated = True
+                self._populateTabGeneralProperties()
+            elif tab is self._tabVisualProperties and not self._tabVisualPropertiesPopulated:
+                self._populateTabVisualProperties()
+        except Exception as e:
+            ShowErrorDialog(LogException(e))
 
+    @profiled('populate_report_pages')
     def _populateTabVisualProperties(self):
 
+        self._tabVisualPropertiesPopulated = True
         if self._pbiFilePath is None:
             self._showWelcomeScreenTabVisualProperties()
             self._verticalLayoutVisualsPropertiesTab.addLayout(self._horizontalLayoutWelcomeScreen)
@@ -350,9 +633,11 @@ class PowerBIThemeGeneratorWindow(QMainWindow):
     def _clearTabVisualProperties(self):
         self._removeWelcomeScreenFromTabVisualProperties()
         self._deleteLayout(self._verticalLayoutVisualsPropertiesTab)
-        self._listWidgetReportPages = None
-        self._listWidgetReportPageVisuals = None
-        self._treeWidgetSelectedVisualProperties = None
+        self._listViewReportPages = None
+        self._listViewReportPageVisuals = None
+        self._lineEditSearchProperties = None
+        self._groupBoxSelectedVisualPropertiesTree = None
+        self._treeViewSelectedVisualProperties = None
 
     def _deleteLayout(self, layout):
         if layout is not None:
@@ -367,342 +652,228 @@ class PowerBIThemeGeneratorWindow(QMainWindow):
 
     def _createReportPageList(self):
         try:
-            def __reportPageListValueSelected(item):
+            def __reportPageListValueSelected(index):
                 try:
-                    self._createReportPageVisualsList(item.GetMetaData()['reportPageSection'])
+                    profileEventIndex = get_event_count()
+                    self._createReportPageVisualsList(index.data(ReportSectionNameRole))
+                    self._showProfileSummary('Opened report page ' + str(index.data()), profileEventIndex)
                 except Exception as e:
                     ShowErrorDialog(LogException(e))
 
-            if self._listWidgetReportPages is not None:
-                self._listWidgetReportPages.clear()
-
             groupBoxReportPageList = QGroupBox(self.centralWidget)
             groupBoxReportPageList.setTitle("Report Pages")
             verticalLayoutReportPageList = QVBoxLayout(groupBoxReportPageList)
 
-            self._listWidgetReportPages = QListWidget()
-
-            i = 0
-            for reportSection in self._powerBIThemeGenerator.get_report_sections():
-                reportListWidgetItem = CQListWidgetItemReportPages(str(reportSection['displayName']))
-                reportListWidgetItem.SetMetaData(reportSection)
-                reportListWidgetItem.setToolTip(reportSection['name'])
-                self._listWidgetReportPages.insertItem(i, reportListWidgetItem)
-                i += 1
-
-            verticalLayoutReportPageList.addWidget(self._listWidgetReportPages)
+            lineEditSearchProperties = self._lineEditSearchProperties = QLineEdit()
+            lineEditSearchProperties.setClearButtonEnabled(True)
+            lineEditSearchProperties.setPlaceholderText(self._searchPropertiesPlaceholder
+                                                        if self._propertyIndex is not None else
+                                                        'Indexing report pages for search')
+            lineEditSearchProperties.setToolTip('Shows only report pages and visuals having all searched terms. Term '
+                                                'is object.property=value, any part of which can be left out such as '
+                                                'fontSize=12 or title.fontColor, or single word matching visual type, '
+                                                'object, property or value.')
+            verticalLayoutReportPageList.addWidget(lineEditSearchProperties)
+
+            self._listViewReportPages = QListView()
+            self._listViewReportPages.setUniformItemSizes(True)
+            self._listViewReportPages.setModel(ReportPagesModel(self._powerBIThemeGenerator.get_report_pages(),
+                                                                self._listViewReportPages))
+
+            verticalLayoutReportPageList.addWidget(self._listViewReportPages)
             self._horizontalLayoutTabVisualsTop.addWidget(groupBoxReportPageList)
-            # __reportPageListValueSelected(self._listWidgetReportPages.item(0))
 
-            self._listWidgetReportPages.itemClicked.connect(__reportPageListValueSelected)
+            self._listViewReportPages.clicked.connect(__reportPageListValueSelected)
+            # Search of report which was open before reload is kept
+            lineEditSearchProperties.setText(self._propertySearchQuery)
+            self._searchProperties(self._propertySearchQuery)
+            lineEditSearchProperties.textChanged.connect(self._searchProperties)
 
         except Exception as e:
             ShowErrorDialog(LogException(e))
 
+    @profiled('search_properties')
+    def _searchProperties(self, query):
+        try:
+            self._propertySearchQuery = query
+            if query.strip() == '':
+                self._propertySearchMatches = None
+            elif self._propertyIndex is None:
+                # Query is searched once report is indexed, see _propertyIndexBuilt
+                self._propertySearchMatches = None
+                self.statusBar.showMessage('Indexing report pages, search results are shown once done')
+            else:
+                self._propertySearchMatches = {}
+                for reportSectionName, visualIndex in self._propertyIndex.search(query):
+                    self._propertySearchMatches.setdefault(reportSectionName, set()).add(visualIndex)
+
+            reportPagesModel = self._listViewReportPages.model()
+            for row in range(reportPagesModel.rowCount()):
+                self._listViewReportPages.setRowHidden(
+                    row, self._propertySearchMatches is not None and
+                    reportPagesModel.index(row).data(ReportSectionNameRole) not in self._propertySearchMatches)
+            self._hideReportPageVisualsNotSearched()
+
+            if self._propertySearchMatches is not None:
+                self.statusBar.showMessage(
+                    str(sum(len(visualIndexes) for visualIndexes in self._propertySearchMatches.values())) +
+                    ' visuals in ' + str(len(self._propertySearchMatches)) + ' report pages match search')
+        except Exception as e:
+            ShowErrorDialog(LogException(e))
+
+    def _hideReportPageVisualsNotSearched(self):
+        if self._listViewReportPageVisuals is None or self._listViewReportPageVisuals.model() is None:
+            return
+        reportPageVisualsModel = self._listViewReportPageVisuals.model()
+        matchingVisualIndexes = None
+        if self._propertySearchMatches is not None:
+            # Matching visuals can be anywhere in report page, so rows are not fetched lazily while searching
+            while reportPageVisualsModel.canFetchMore(QModelIndex()):
+                reportPageVisualsModel.fetchMore(QModelIndex())
+            matchingVisualIndexes = self._propertySearchMatches.get(reportPageVisualsModel.GetReportSectionName(), ())
+        for row in range(reportPageVisualsModel.rowCount()):
+            self._listViewReportPageVisuals.setRowHidden(row, matchingVisualIndexes is not None and
+                                                         row not in matchingVisualIndexes)
+
+    @profiled('populate_page_visuals')
     def _createReportPageVisualsList(self, reportPageSection=None):
 
         try:
-            # print(self._reportVisualData[reportPageSection])
-            # print('inside report page visual list', reportPageSection)
-
-            def __updateStateInDataStructure(item):
-                vizProperties = item.GetVisualProperties()
-                if item.checkState() == Qt.Checked:
-                    (self._reportVisualData[vizProperties['report_section']]
-                        .get('visuals')[vizProperties['visual_index']]['__selected']) = True
-                else:
-                    (self._reportVisualData[vizProperties['report_section']]
-                        .get('visuals')[vizProperties['visual_index']]['__selected']) = False
-
-            def __getVisualProperties(item: CQListWidgetItemReportPageVisuals):
+            def __getVisualProperties(index):
                 try:
-                    __updateStateInDataStructure(item)
-                    self._createSelectedVisualPropertiesTree(item.GetVisualProperties())
+                    if index.isValid():
+                        profileEventIndex = get_event_count()
+                        self._createSelectedVisualPropertiesTree(
+                            self._listViewReportPageVisuals.model().GetReportSectionName(), index.row())
+                        self._showProfileSummary('Opened visual ' + str(index.data()), profileEventIndex)
                 except Exception as e:
                     ShowErrorDialog(LogException(e))
 
             def __selectDeselectAll():
                 try:
-                    if self._listWidgetReportPageVisuals is not None:
-                        for i in range(self._listWidgetReportPageVisuals.count()):
-                            item = self._listWidgetReportPageVisuals.item(i)
-                            if self.sender().objectName() == 'button_select_all':
-                                item.setCheckState(Qt.Checked)
-                            else:
-                                item.setCheckState(Qt.Unchecked)
-                            __updateStateInDataStructure(item)
+                    if self._listViewReportPageVisuals.model() is not None:
+                        self._listViewReportPageVisuals.model().SetAllChecked(
+                            self.sender().objectName() == 'button_select_all')
                 except Exception as e:
                     ShowErrorDialog(LogException(e))
 
-            groupBoxReportPageVisualsList = QGroupBox(self.centralWidget)
-            groupBoxReportPageVisualsList.setTitle("Visuals in Selected Report Page")
-            # groupBoxReportPageVisualsList.setToolTip("All visuals present in the selected page will be visible below")
-            verticalLayoutReportPageVisualsList = QVBoxLayout(groupBoxReportPageVisualsList)
-
-            horizontalLayoutSelectDeselectButton = QHBoxLayout()
-            pushButtonSelectAll = QPushButton('Select All')
-            pushButtonSelectAll.setObjectName('button_select_all')
-            pushButtonDeselectAll = QPushButton('Deselect All')
-            pushButtonDeselectAll.setObjectName('button_deselect_all')
-            horizontalLayoutSelectDeselectButton.addWidget(pushButtonSelectAll)
-            horizontalLayoutSelectDeselectButton.addWidget(pushButtonDeselectAll)
-            verticalLayoutReportPageVisualsList.addLayout(horizontalLayoutSelectDeselectButton)
-
-            if self._listWidgetReportPageVisuals is None:
-                self._listWidgetReportPageVisuals = QListWidget()
-                verticalLayoutReportPageVisualsList.addWidget(self._listWidgetReportPageVisuals)
+            if self._listViewReportPageVisuals is None:
+                groupBoxReportPageVisualsList = QGroupBox(self.centralWidget)
+                groupBoxReportPageVisualsList.setTitle("Visuals in Selected Report Page")
+                verticalLayoutReportPageVisualsList = QVBoxLayout(groupBoxReportPageVisualsList)
+
+                horizontalLayoutSelectDeselectButton = QHBoxLayout()
+                pushButtonSelectAll = QPushButton('Select All')
+                pushButtonSelectAll.setObjectName('button_select_all')
+                pushButtonDeselectAll = QPushButton('Deselect All')
+                pushButtonDeselectAll.setObjectName('button_deselect_all')
+                horizontalLayoutSelectDeselectButton.addWidget(pushButtonSelectAll)
+                horizontalLayoutSelectDeselectButton.addWidget(pushButtonDeselectAll)
+                verticalLayoutReportPageVisualsList.addLayout(horizontalLayoutSelectDeselectButton)
+
+                # Visuals are rendered by view straight from extracted report page, only rows in sight are drawn
+                self._listViewReportPageVisuals = QListView()
+                self._listViewReportPageVisuals.setUniformItemSizes(True)
+                verticalLayoutReportPageVisualsList.addWidget(self._listViewReportPageVisuals)
                 self._horizontalLayoutTabVisualsTop.addWidget(groupBoxReportPageVisualsList)
-                self._listWidgetReportPageVisuals.itemClicked.connect(__getVisualProperties, Qt.UniqueConnection)
-            else:
-                self._listWidgetReportPageVisuals.clear()
-
-            i = 0
-            for visualIndex, visual in enumerate(self._reportVisualData[reportPageSection].get('visuals')):
-                visualType = visual['visual_type']
-                visualTitle = visual.get('objects').get('title')
-                # print(visualType, visualTitle)
-                if visualTitle is None or visualTitle.get('text') is None:
-                    listDisplayText = str(visualType)
-                else:
-                    listDisplayText = str(visualType) + " - " + visualTitle.get('text')
-                pageVisualsList = CQListWidgetItemReportPageVisuals(listDisplayText)
-                pageVisualsList.setFlags(pageVisualsList.flags() | Qt.ItemIsUserCheckable)
-                if visual['__selected'] is False:
-                    pageVisualsList.setCheckState(Qt.Unchecked)
-                else:
-                    pageVisualsList.setCheckState(Qt.Checked)
-                pageVisualsList.SetVisualProperties(visual, reportPageSection, visualIndex)
-                # print(pageVisualsList.GetVisualProperties())
-                self._listWidgetReportPageVisuals.insertItem(i, pageVisualsList)
-                i += 1
 
-            pushButtonSelectAll.clicked.connect(__selectDeselectAll)
-            pushButtonDeselectAll.clicked.connect(__selectDeselectAll)
+                self._listViewReportPageVisuals.clicked.connect(__getVisualProperties)
+                pushButtonSelectAll.clicked.connect(__selectDeselectAll)
+                pushButtonDeselectAll.clicked.connect(__selectDeselectAll)
 
-            # self._listWidgetReportPageVisuals.setCurrentRow(0)
-            # __getVisualProperties(self._listWidgetReportPageVisuals.item(0))
+            self._currentReportPageSection = reportPageSection
+            previousModel = self._listViewReportPageVisuals.model()
+            self._listViewReportPageVisuals.setModel(
+                ReportPageVisualsModel(self._selectionStore, reportPageSection,
+                                       self._reportVisualData[reportPageSection], self._listViewReportPageVisuals))
+            if previousModel is not None:
+                previousModel.deleteLater()
+            self._hideReportPageVisualsNotSearched()
+            self._showDiagnosticsSummary()
 
         except Exception as e:
             ShowErrorDialog(LogException(e))
 
-    def _createSelectedVisualPropertiesTree(self, visualProperties=None):
+    @profiled('populate_visual_properties')
+    def _createSelectedVisualPropertiesTree(self, reportPageSection, visualIndex):
         try:
 
-            def __getVisualProperty(item: CQTreeWidgetItemVisualProperties):
-                try:
-                    visualProperties = item.GetVisualProperties()
-                    if visualProperties is not None:
-                        visualProperty = (self._reportVisualData[visualProperties['report_section']]
-                                          .get('visuals')[visualProperties['visual_index']].get('objects')
-                                          .get(str(item.data(0, 0))))
-                        return visualProperty
-                except Exception as e:
-                    ShowErrorDialog(LogException(e))
-
-            def __updateStateInDataStructure(item: CQTreeWidgetItemVisualProperties):
-                try:
-                    visualProperty = __getVisualProperty(item)
-                    if visualProperty is not None:
-                        if item.checkState(0) == Qt.Unchecked:
-                            visualProperty['__selected'] = False
-                        else:
-                            visualProperty['__selected'] = True
-                except Exception as e:
-                    ShowErrorDialog(LogException(e))
-
-            def __updateWildCardState(state, item=None):
-                try:
-                    visualProperty = __getVisualProperty(item)
-                    if visualProperty is not None:
-                        if state == Qt.Checked:
-                            visualProperty['__wildcard'] = True
-                            # print(visualProperty)
-                        elif visualProperty.get('__wildcard') is not None and state == Qt.Unchecked:
-                            visualProperty.pop('__wildcard')
-                except Exception as e:
-                    ShowErrorDialog(LogException(e))
-
-            def __treeWidgetVisualsPropertiesClicked(item: CQTreeWidgetItemVisualProperties):
-                try:
-                    __updateStateInDataStructure(item)
-                except Exception as e:
-                    ShowErrorDialog(LogException(e))
-
             def __selectDeselectAll():
                 try:
-                    if self._treeWidgetSelectedVisualProperties is not None:
-                        for i in range(self._treeWidgetSelectedVisualProperties.topLevelItemCount()):
-                            item = self._treeWidgetSelectedVisualProperties.topLevelItem(i)
-                            if self.sender().objectName() == 'button_select_all':
-                                item.setCheckState(0, Qt.Checked)
-                            else:
-                                item.setCheckState(0, Qt.Unchecked)
-                            __updateStateInDataStructure(item)
+                    if self._treeViewSelectedVisualProperties.model() is not None:
+                        self._treeViewSelectedVisualProperties.model().SetAllChecked(
+                            self.sender().objectName() == 'button_select_all')
                 except Exception as e:
                     ShowErrorDialog(LogException(e))
 
-            self._groupBoxSelectedVisualPropertiesTree = QGroupBox(self.centralWidget)
-            self._groupBoxSelectedVisualPropertiesTree.setTitle("Selected Visual Properties")
-            verticalLayoutSelectedVisualPropertiesTree = QVBoxLayout(self._groupBoxSelectedVisualPropertiesTree)
-
-            horizontalLayoutSelectDeselectButton = QHBoxLayout()
-            pushButtonSelectAll = QPushButton('Select All')
-            pushButtonSelectAll.setObjectName('button_select_all')
-            pushButtonDeselectAll = QPushButton('Deselect All')
-            pushButtonDeselectAll.setObjectName('button_deselect_all')
-            horizontalLayoutSelectDeselectButton.addWidget(pushButtonSelectAll)
-            horizontalLayoutSelectDeselectButton.addWidget(pushButtonDeselectAll)
-            verticalLayoutSelectedVisualPropertiesTree.addLayout(horizontalLayoutSelectDeselectButton)
-
-            if self._treeWidgetSelectedVisualProperties is None:
-                self._treeWidgetSelectedVisualProperties = QTreeWidget()
-                verticalLayoutSelectedVisualPropertiesTree.addWidget(self._treeWidgetSelectedVisualProperties)
+            if self._treeViewSelectedVisualProperties is None:
+                self._groupBoxSelectedVisualPropertiesTree = QGroupBox(self.centralWidget)
+                self._groupBoxSelectedVisualPropertiesTree.setTitle("Selected Visual Properties")
+                verticalLayoutSelectedVisualPropertiesTree = QVBoxLayout(self._groupBoxSelectedVisualPropertiesTree)
+
+                horizontalLayoutSelectDeselectButton = QHBoxLayout()
+                pushButtonSelectAll = QPushButton('Select All')
+                pushButtonSelectAll.setObjectName('button_select_all')
+                pushButtonDeselectAll = QPushButton('Deselect All')
+                pushButtonDeselectAll.setObjectName('button_deselect_all')
+                horizontalLayoutSelectDeselectButton.addWidget(pushButtonSelectAll)
+                horizontalLayoutSelectDeselectButton.addWidget(pushButtonDeselectAll)
+                verticalLayoutSelectedVisualPropertiesTree.addLayout(horizontalLayoutSelectDeselectButton)
+
+                self._treeViewSelectedVisualProperties = QTreeView()
+                self._treeViewSelectedVisualProperties.setUniformRowHeights(True)
+                verticalLayoutSelectedVisualPropertiesTree.addWidget(self._treeViewSelectedVisualProperties)
                 self._verticalLayoutVisualsPropertiesTab.insertWidget(1, self._groupBoxSelectedVisualPropertiesTree)
-                self._treeWidgetSelectedVisualProperties.itemClicked.connect(__treeWidgetVisualsPropertiesClicked)
-            else:
-                self._treeWidgetSelectedVisualProperties.clear()
 
-            self._treeWidgetSelectedVisualProperties.setHeaderLabels(['Property', 'Value', 'Wild Card'])
-            treeHeader = self._treeWidgetSelectedVisualProperties.header()
+                pushButtonSelectAll.clicked.connect(__selectDeselectAll)
+                pushButtonDeselectAll.clicked.connect(__selectDeselectAll)
+
+            previousModel = self._treeViewSelectedVisualProperties.model()
+            self._treeViewSelectedVisualProperties.setModel(
+                VisualPropertiesModel(self._selectionStore, reportPageSection, visualIndex,
+                                      self._reportVisualData[reportPageSection].visuals[visualIndex],
+                                      self._treeViewSelectedVisualProperties))
+            if previousModel is not None:
+                previousModel.deleteLater()
+            treeHeader = self._treeViewSelectedVisualProperties.header()
             treeHeader.setSectionResizeMode(QtWidgets.QHeaderView.ResizeToContents)
-            # treeHeader.setStretchLastSection(False)
-
-            visualObjects = visualProperties['visual_properties'].get('objects')
-            for object, objectValues in visualObjects.items():
-                if len(objectValues.keys()) > 1:  # greater than 1 because one default key is __selected
-                    parent = CQTreeWidgetItemVisualProperties(self._treeWidgetSelectedVisualProperties, [str(object)])
-                    parent.SetVisualProperties(visualProperties)
-                    wildCardCheckBox = QCheckBox()
-                    wildCardCheckBox.stateChanged.connect(partial(__updateWildCardState, item=parent))
-                    self._treeWidgetSelectedVisualProperties.setItemWidget(parent, 2, wildCardCheckBox)
-                    if objectValues['__selected'] is False:
-                        parent.setCheckState(0, Qt.Unchecked)
-                    else:
-                        parent.setCheckState(0, Qt.Checked)
-                    for objectKey, objectValue in objectValues.items():
-                        if objectKey is not '__selected':
-                            mObjectV = None
-                            if type(objectValue) is dict and objectValue.get('solid') is not None:
-                                mObjectV = objectValue.get('solid').get('color')
-                            else:
-                                mObjectV = objectValue
-                            CQTreeWidgetItemVisualProperties(parent, [str(objectKey), str(mObjectV)])
-                else:
-                    objectValues['__selected'] = False
-
-            pushButtonSelectAll.clicked.connect(__selectDeselectAll)
-            pushButtonDeselectAll.clicked.connect(__selectDeselectAll)
 
         except Exception as e:
             ShowErrorDialog(LogException(e))
 
     def generateTheme(self):
         try:
-            correctVisualData = True
-            correctWildcardData = True
-            themeName = self._generalProperties.get('name')
-            themeData = {
-                'name': themeName
-                if themeName is not None and len(themeName.strip()) > 0 else 'My Theme',
-            }
-            if self._generalProperties.get('dataColors') is not None:
-                dataColors = list(filter(None, self._generalProperties.get('dataColors')))
+            profileEventIndex = get_event_count()
+            selectionStore = self._selectionStore if self._selectionStore is not None else SelectionStore({})
+            themeBuildResult = build_theme(selectionStore, self._generalProperties.get('name'),
+                                           self._generalProperties)
+
+            if len(themeBuildResult.visual_type_conflicts) > 0:
+                message = 'Multiple visual of same type selected from different report pages. See details below.' \
+                          ' Please select one visual type for only once.'
+                detailMessage = ''
+                for conflict in themeBuildResult.visual_type_conflicts:
+                    for pageName in conflict.report_pages:
+                        detailMessage += conflict.name + ' is selected in report page ' + pageName + '\n'
+                self._showDialogAfterThemeGeneration(message, detailMessage=detailMessage)
+
+            elif len(themeBuildResult.wildcard_object_conflicts) > 0:
+                message = 'Multiple wild card properties of same types are selected. Please only select ' \
+                          'unique properties for wild card from all the visuals. As a result this ' \
+                          'properties will not be added as wild card property in them file. ' \
+                          'See details below'
+                detailMessage = ''
+                for conflict in themeBuildResult.wildcard_object_conflicts:
+                    for pageName in conflict.report_pages:
+                        detailMessage += conflict.name + ' is selected in report page ' + pageName + '\n'
+                self._showDialogAfterThemeGeneration(message, detailMessage=detailMessage)
 
             else:
-                dataColors = []
-            background = self._generalProperties.get('background')
-            foreground = self._generalProperties.get('foreground')
-            tableAccent = self._generalProperties.get('tableAccent')
-
-            if dataColors is not None and dataColors is not "":
-                themeData['dataColors'] = dataColors
-            if background is not None and background is not "":
-                themeData['background'] = background
-            if foreground is not None and foreground is not "":
-                themeData['foreground'] = foreground
-            if tableAccent is not None and tableAccent is not "":
-                themeData['tableAccent'] = tableAccent
-
-            selectedVisualsList = [[], [], []]  # page name, visual type and visual data or visual objects
-            wildCardPropertiesList = [[], [], []]  # page name, property type and property data
-            visualObjectIndex = 0
-            themeData['visualStyles'] = {}
-            if self._pbiFilePath is not None:
-                for reportPage in self._reportVisualData:
-                    for visual in self._reportVisualData[reportPage].get('visuals'):
-                        pageName = self._reportVisualData[reportPage]['reportPageDisplayName']
-                        if visual['__selected'] is True:
-                            selectedVisualsList[0].append(pageName)
-                            selectedVisualsList[1].append(visual['visual_type'])
-                            selectedVisualsList[2].append({})
-                            visualObjects = visual.get('objects')
-                            for object in visualObjects:
-                                if visualObjects[object]['__selected'] is True:
-                                    selectedVisualsList[2][visualObjectIndex][object] = [visualObjects[object]]
-                                    if visualObjects[object].get('__wildcard') is not None:
-                                        # wildCardObjects[object] = [visualObjects[object]]
-                                        wildCardPropertiesList[0].append(pageName)
-                                        wildCardPropertiesList[1].append(object)
-                                        wildCardPropertiesList[2].append(visualObjects[object])
-
-                            visualObjectIndex += 1
-                if len(selectedVisualsList[1]) > 0:
-                    if len(selectedVisualsList[1]) != len(set(selectedVisualsList[1])):
-                        message = 'Multiple visual of same type selected from different report pages. See details below.' \
-                                  ' Please select one visual type for only once.'
-                        detailMessage = ''
-                        seen = set()
-                        repeatedVisuals = []
-                        for selectedVisual in selectedVisualsList[1]:
-                            if selectedVisual in seen:
-                                repeatedVisuals.append(selectedVisual)
-                            else:
-                                seen.add(selectedVisual)
-
-                        for i, selectedVisual in enumerate(selectedVisualsList[1]):
-                            if selectedVisual in repeatedVisuals:
-                                detailMessage += selectedVisual + ' is selected in report page'\
-                                                 + selectedVisualsList[0][i] + '\n'
-                        correctVisualData = False
-                        self._showDialogAfterThemeGeneration(message, detailMessage=detailMessage)
-
-                    else:
-                        # adding wild card data
-                        if len(wildCardPropertiesList[1]) > 0:
-                            if len(wildCardPropertiesList[1]) != len(set(wildCardPropertiesList[1])):
-                                message = 'Multiple wild card properties of same types are selected. Please only select '\
-                                          'unique properties for wild card from all the visuals. As a result this' \
-                                          'properties will not be added as wild card property in them file. ' \
-                                          'See details below'
-                                detailMessage = ''
-                                seen = set()
-                                repeatedWildCardProperties = []
-                                for wildCardProperty in wildCardPropertiesList[1]:
-                                    if wildCardProperty in seen:
-                                        repeatedWildCardProperties.append(wildCardProperty)
-                                    else:
-                                        seen.add(wildCardProperty)
-
-                                for i, wildCardProperty in enumerate(wildCardPropertiesList[1]):
-                                    if wildCardProperty in repeatedWildCardProperties:
-                                        detailMessage += wildCardProperty + 'is selected in report page' +\
-                                                         wildCardPropertiesList[0][i]
-                                correctWildcardData = False
-                                self._showDialogAfterThemeGeneration(message, detailMessage=detailMessage)
-                            else:
-                                themeData['visualStyles']['*'] = {
-                                    '*': {}
-                                }
-                                for i in range(len(wildCardPropertiesList[1])):
-                                    themeData['visualStyles']['*']['*'][wildCardPropertiesList[1][i]] = [wildCardPropertiesList[2][i]]
-
-                        # adding visual data
-                        for i in range(len(selectedVisualsList[1])):
-                            themeData['visualStyles'][selectedVisualsList[1][i]] = {
-                                "*": selectedVisualsList[2][i]
-                            }
-            if correctVisualData is True and correctWildcardData is True:
+                themeData = themeBuildResult.theme
+                if not self._confirmSavingInvalidTheme(validate_theme(themeData)):
+                    return
                 self._saveThemeFile(themeData, 'C:/Users/bjadav/Desktop/', themeData['name'])
+                self._showProfileSummary('Generated theme', profileEventIndex)
 
         except Exception as e:
             ShowErrorDialog(LogException(e))
@@ -721,23 +892,31 @@ class PowerBIThemeGeneratorWindow(QMainWindow):
         except Exception as e:
             ShowErrorDialog(LogException(e))
 
+    def _confirmSavingInvalidTheme(self, problems):
+        # Theme with values Power BI does not accept, such as colors which could not be read, is only saved when user
+        # chooses to, as Power BI refuses to import it. Values which only look wrong are listed along but do not ask
+        errors = get_errors(problems)
+        if len(errors) == 0:
+            return True
+        messageBoxInvalidTheme = QMessageBox()
+        messageBoxInvalidTheme.setIcon(QMessageBox.Warning)
+        messageBoxInvalidTheme.setWindowTitle('Invalid Theme Values')
+        messageBoxInvalidTheme.setText(str(len(errors)) + ' values of theme are not valid for Power BI theme and it '
+                                       'may not be imported. Click on show details button to see them. Save theme '
+                                       'anyway?')
+        messageBoxInvalidTheme.setDetailedText('\n'.join(str(problem) for problem in problems))
+        messageBoxInvalidTheme.setStandardButtons(QMessageBox.Save | QMessageBox.Cancel)
+        messageBoxInvalidTheme.setDefaultButton(QMessageBox.Cancel)
+        return messageBoxInvalidTheme.exec_() == QMessageBox.Save
+
     def _saveThemeFile(self, themeData, saveFileDirectory, fileName):
         try:
-            _themeData = json.loads(json.dumps(themeData))
-            # Removing internal keys such as __selected from final output
-            for visualType, visualProperties in _themeData['visualStyles'].items():
-                for propertyType, propertyValue in visualProperties['*'].items():
-                    if propertyValue[0].get('__selected') is not None:
-                        propertyValue[0].pop('__selected')
-                    if propertyValue[0].get('__wildcard') is not None:
-                        propertyValue[0].pop('__wildcard')
-
             initialSaveFilePath = saveFileDirectory + fileName + '.json'
             saveFile = QFileDialog.getSaveFileName(self, 'Save Theme File', initialSaveFilePath,
                                                    filter='JSON file(*.json)')[0]
             if saveFile is not '':
                 with open(saveFile, 'w') as themeFile:
-                    json.dump(_themeData, themeFile, indent=4)
+                    write_theme(themeData, themeFile)
                 message = 'Successfully generated theme'
                 self._showDialogAfterThemeGeneration(message)
         except Exception as e:
@@ -795,6 +974,8 @@ class PowerBIThemeGeneratorWindow(QMainWindow):
 
 
 if __name__ == '__main__':
+    InitializeLogging()
+    initialize_profiling()
     app = QApplication(sys.argv)
     try:
         window = PowerBIThemeGeneratorWindow()
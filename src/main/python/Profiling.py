@@ -0,0 +1,194 @@
+import atexit
+import functools
+import json
+import os
+import threading
+import time
+from Util import PathUtil
+
+# Set to any value to profile every run, value ending with .json is path of trace file written at exit
+PROFILE_ENVIRONMENT_VARIABLE = 'PBI_THEME_GENERATOR_PROFILE'
+TraceFileName = 'pbi_theme_generator_trace.json'
+
+_enabled = False
+_events = []
+_thread_names = {}
+_trace_file_path = None
+
+
+class _Span:
+    __slots__ = ('name', 'args', '_start')
+
+    def __init__(self, name, args):
+        self.name = name
+        # More arguments can be added while span is open, such as result of timed work
+        self.args = args
+        self._start = 0
+
+    def __enter__(self):
+        self._start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        record_span(self.name, self._start, time.perf_counter_ns(), self.args)
+
+
+class _DisabledSpan:
+    __slots__ = ()
+
+    @property
+    def args(self):
+        # Arguments added to disabled span are thrown away
+        return {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        pass
+
+
+_disabled_span = _DisabledSpan()
+
+
+def initialize_profiling(trace_file_path=None):
+    """
+    Enables profiling when trace_file_path is given or PBI_THEME_GENERATOR_PROFILE environment variable is set, in
+    which case Chrome trace of all spans is written at exit to trace_file_path, path given by environment variable or
+    trace file in application data directory. Returns whether profiling is enabled.
+    """
+    global _trace_file_path
+    if trace_file_path is None:
+        environment_value = os.environ.get(PROFILE_ENVIRONMENT_VARIABLE, '')
+        if environment_value == '':
+            return _enabled
+        trace_file_path = environment_value if environment_value.lower().endswith('.json') else \
+            os.path.join(PathUtil.AppDataDirectory(), TraceFileName)
+    _trace_file_path = trace_file_path
+    enable_profiling()
+    atexit.unregister(_write_trace_at_exit)
+    atexit.register(_write_trace_at_exit)
+    return True
+
+
+def _write_trace_at_exit():
+    if _trace_file_path is not None and len(_events) > 0:
+        write_chrome_trace(_trace_file_path)
+
+
+def enable_profiling(enabled=True):
+    global _enabled
+    _enabled = enabled
+
+
+def is_profiling_enabled():
+    return _enabled
+
+
+def get_trace_file_path():
+    return _trace_file_path
+
+
+def profile_span(name, **args):
+    """
+    Returns context manager timing the work done inside it as span of given name, recorded with args once it exits.
+    Does nothing when profiling is not enabled so spans can be left in hot code.
+    """
+    if not _enabled:
+        return _disabled_span
+    return _Span(name, args)
+
+
+def profiled(name):
+    """
+    Decorator timing every call of function as span of given name.
+    """
+    def _decorator(function):
+        @functools.wraps(function)
+        def _wrapper(*args, **kwargs):
+            if not _enabled:
+                return function(*args, **kwargs)
+            with _Span(name, {}):
+                return function(*args, **kwargs)
+        return _wrapper
+    return _decorator
+
+
+def record_span(name, start_ns, end_ns, args=None):
+    """
+    Records span which was timed by caller with time.perf_counter_ns.
+    """
+    thread = threading.current_thread()
+    _thread_names.setdefault((os.getpid(), thread.ident), thread.name)
+    # Appending to list is atomic so spans of all threads are recorded without lock
+    _events.append({
+        'name': name,
+        'ph': 'X',
+        'ts': start_ns / 1000,
+        'dur': (end_ns - start_ns) / 1000,
+        'pid': os.getpid(),
+        'tid': thread.ident,
+        'args': args if args is not None else {},
+    })
+
+
+def get_event_count():
+    return len(_events)
+
+
+def get_events(start=0):
+    """
+    Returns recorded spans as Chrome trace events, starting from event at index start. Events can be passed to
+    add_events of another process, such as main process of command line workers.
+    """
+    return _events[start:]
+
+
+def add_events(events, thread_names=None):
+    _events.extend(events)
+    if thread_names is not None:
+        _thread_names.update(thread_names)
+
+
+def get_thread_names():
+    return dict(_thread_names)
+
+
+def clear_events():
+    del _events[:]
+
+
+def get_stage_summary(start=0, stage_names=None):
+    """
+    Returns list of span name, number of spans and total seconds of spans recorded from index start, in order spans
+    first ended. Only spans named in stage_names are included when it is given.
+    """
+    stages = {}
+    for event in _events[start:]:
+        if stage_names is not None and event['name'] not in stage_names:
+            continue
+        stage = stages.setdefault(event['name'], [0, 0])
+        stage[0] += 1
+        stage[1] += event['dur']
+    return [(name, count, duration / 1000000) for name, (count, duration) in stages.items()]
+
+
+def format_stage_summary(start=0, stage_names=None):
+    return ', '.join('{} {:.0f} ms'.format(name, seconds * 1000)
+                     for name, _, seconds in get_stage_summary(start, stage_names))
+
+
+def write_chrome_trace(trace_file_path):
+    """
+    Writes all recorded spans as Chrome trace event JSON, which can be opened in chrome://tracing or Perfetto.
+    """
+    metadata_events = [
+        {'name': 'thread_name', 'ph': 'M', 'pid': pid, 'tid': tid, 'args': {'name': thread_name}}
+        for (pid, tid), thread_name in _thread_names.items()
+    ]
+    with open(trace_file_path, 'w') as trace_file:
+        json.dump({
+            'traceEvents': metadata_events + _events,
+            'displayTimeUnit': 'ms',
+        }, trace_file)
+    return trace_file_path
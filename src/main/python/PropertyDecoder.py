@@ -0,0 +1,133 @@
+import re
+from functools import lru_cache
+from Util import ColorUtil
+from ExtractedRecords import SolidColor
+
+# Numeric literals of Power BI expressions end with L for integers and D for decimals such as 3L or 12.5D
+_NUMERIC_LITERAL = re.compile(r'[-+]?(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?[LD]')
+_KEYWORD_LITERALS = {
+    'true': True,
+    'false': False,
+}
+
+# Returned by value decoders when property should not be part of extracted object
+_OMITTED = object()
+
+
+@lru_cache(maxsize=8192)
+def _decode_literal_text(value):
+    if "'" in value:
+        value = value.strip("'")
+        value = value.replace("''", "")  # For font family
+    if _NUMERIC_LITERAL.fullmatch(value) is not None:
+        return int(float(value[0:-1]))
+    if value.isdecimal():
+        return int(value)
+    return _KEYWORD_LITERALS.get(value, value)
+
+
+def decode_literal(value):
+    """
+    Converts value of Literal expression to python value, '12D' and '3L' become numbers, 'true' and 'false' become
+    booleans and quotes are removed from text. Values other than text are returned as they are.
+    """
+    if type(value) is str:
+        return _decode_literal_text(value)
+    return value
+
+
+class PropertyDecoder:
+    """
+    Decodes properties of visual objects found in visual container config into plain values used in theme file, colors
+    are decoded to SolidColor.
+
+    Every property value is dispatched on its shape instead of trying each possible path and catching errors, values
+    of unexpected shape are decoded to empty text same as before.
+    """
+
+    def __init__(self, theme_colors):
+        self._theme_colors = theme_colors
+        self._value_decoders = {
+            dict: self._decode_expression_value,
+            list: self._decode_list_value,
+        }
+        # In order of precedence when color expression holds more than one of them
+        self._color_expression_decoders = (
+            ('Literal', self._decode_literal_expression),
+            ('ThemeDataColor', self._decode_theme_data_color_expression),
+        )
+
+    def decode_objects(self, objects, on_error=None):
+        """
+        Returns properties of every object decoded to plain values. When on_error is given, object or property which
+        can not be decoded is left out and on_error is called with its path such as 'title.text' and the exception,
+        otherwise exception is raised.
+        """
+        value_decoders = self._value_decoders
+        visual_objects = {}
+        for object_name, object_properties in objects.items():
+            try:
+                object_properties = object_properties[0].get('properties', {}).items()
+            except Exception as e:
+                if on_error is None:
+                    raise
+                on_error(object_name, e)
+                continue
+            decoded_properties = visual_objects[object_name] = {}
+            for property_name, property_value in object_properties:
+                value_decoder = value_decoders.get(type(property_value))
+                if value_decoder is not None:
+                    try:
+                        property_value = value_decoder(property_value)
+                    except Exception as e:
+                        if on_error is None:
+                            raise
+                        on_error(object_name + '.' + property_name, e)
+                        continue
+                    if property_value is _OMITTED:
+                        continue
+                decoded_properties[property_name] = property_value
+        return visual_objects
+
+    @staticmethod
+    def _decode_list_value(property_value):
+        return property_value[0] if len(property_value) > 0 else _OMITTED
+
+    def _decode_expression_value(self, property_value):
+        expression = property_value.get('expr')
+        if expression is not None:
+            literal = expression.get('Literal') if type(expression) is dict else None
+            return self._decode_literal_expression(literal) if type(literal) is dict else ''
+
+        solid = property_value.get('solid')
+        if solid is not None:
+            return self._decode_solid_value(solid)
+
+        # Dictionaries which are not expressions are not part of theme
+        return '' if 'expr' in property_value or 'solid' in property_value else _OMITTED
+
+    def _decode_solid_value(self, solid):
+        color = solid.get('color') if type(solid) is dict else None
+        color_expression = color.get('expr') if type(color) is dict else None
+        if type(color_expression) is not dict:
+            return ''
+
+        color_value = ''
+        for expression_type, expression_decoder in self._color_expression_decoders:
+            expression = color_expression.get(expression_type)
+            if expression is not None:
+                if type(expression) is not dict:
+                    return ''
+                color_value = expression_decoder(expression)
+                break
+        return SolidColor.of(color_value)
+
+    @staticmethod
+    def _decode_literal_expression(literal):
+        return decode_literal(literal.get('Value'))
+
+    def _decode_theme_data_color_expression(self, theme_data_color):
+        color_id = theme_data_color.get('ColorId')
+        if type(color_id) is not int or not 0 <= color_id < len(self._theme_colors):
+            return ''
+        return ColorUtil.ThemeDataColor(self._theme_colors, color_id, theme_data_color.get('Percent'))
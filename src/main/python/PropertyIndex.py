@@ -0,0 +1,179 @@
+import re
+import shlex
+from functools import lru_cache
+from ExtractedRecords import SolidColor
+from Profiling import profiled
+
+_SHORT_HEX_COLOR = re.compile(r'#[0-9a-f]{3}')
+
+
+@lru_cache(maxsize=4096)
+def normalize_name(name):
+    return str(name).strip().casefold()
+
+
+def normalize_value(value):
+    """
+    Returns text under which property value is indexed, so values written differently are found by same query. Text
+    and colors are compared ignoring case, #abc is same color as #aabbcc, 12 is same number as 12.0 and text of a
+    number in query such as '12' finds the number.
+    """
+    try:
+        return _normalize_hashable_value(value)
+    except TypeError:
+        # Values such as lists taken over from report as they are can not be cached
+        return _normalize_value(value)
+
+
+# Values repeat across visuals, typed so True and 1 are not taken for same value
+@lru_cache(maxsize=8192, typed=True)
+def _normalize_hashable_value(value):
+    return _normalize_value(value)
+
+
+def _normalize_value(value):
+    if type(value) is SolidColor:
+        value = value.color
+    if type(value) is bool:
+        return 'true' if value else 'false'
+    if type(value) is not int and type(value) is not float:
+        text = str(value).strip().casefold()
+        if _SHORT_HEX_COLOR.fullmatch(text) is not None:
+            return '#' + ''.join(digit * 2 for digit in text[1:])
+        try:
+            value = float(text)
+        except ValueError:
+            return text
+    if value != value or value in (float('inf'), float('-inf')):
+        return str(value)
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+def _is_number(text):
+    try:
+        float(text)
+    except ValueError:
+        return False
+    return True
+
+
+class PropertyIndex:
+    """
+    Inverted index of visual properties of report, mapping object name, property name and normalized property value to
+    locations of visuals having them. Location is report section name and index of visual in its ExtractedPage. Index
+    is built once for all report pages, after which every query only looks up the entries it names instead of going
+    through visuals.
+
+    Page visual, holding properties of report page itself, is indexed as well under its index which is the last one of
+    the page.
+    """
+
+    def __init__(self):
+        self._locations = []
+        self._location_ids_by_visual_type = {}
+        self._postings = {}
+        self._keys_by_object = {}
+        self._keys_by_property = {}
+        self._keys_by_value = {}
+
+    @classmethod
+    @profiled('build_property_index')
+    def build(cls, report_visual_data, report_section_names=None):
+        """
+        Returns index of report pages in report_visual_data, in order of report_section_names when it is given.
+        """
+        property_index = cls()
+        for report_section_name in report_section_names if report_section_names is not None else report_visual_data:
+            property_index.add_page(report_section_name, report_visual_data[report_section_name])
+        return property_index
+
+    def add_page(self, report_section_name, report_page):
+        postings = self._postings
+        for visual_index, visual in enumerate(report_page.visuals):
+            location_id = len(self._locations)
+            self._locations.append((report_section_name, visual_index))
+            self._location_ids_by_visual_type.setdefault(normalize_name(visual.visual_type), []).append(location_id)
+            for object_name, object_properties in visual.objects.items():
+                object_key = normalize_name(object_name)
+                for property_name, property_value in object_properties.items():
+                    key = (object_key, normalize_name(property_name), normalize_value(property_value))
+                    location_ids = postings.get(key)
+                    if location_ids is None:
+                        location_ids = postings[key] = []
+                        self._keys_by_object.setdefault(key[0], []).append(key)
+                        self._keys_by_property.setdefault(key[1], []).append(key)
+                        self._keys_by_value.setdefault(key[2], []).append(key)
+                    if len(location_ids) == 0 or location_ids[-1] != location_id:
+                        location_ids.append(location_id)
+
+    def __len__(self):
+        return len(self._locations)
+
+    def _find_location_ids(self, object_name=None, property_name=None, value=None, visual_type=None):
+        if visual_type is not None:
+            visual_type_location_ids = set(self._location_ids_by_visual_type.get(normalize_name(visual_type), ()))
+            if object_name is None and property_name is None and value is None:
+                return visual_type_location_ids
+            return visual_type_location_ids & self._find_location_ids(object_name, property_name, value)
+
+        fields = []
+        if object_name is not None:
+            fields.append((0, normalize_name(object_name), self._keys_by_object))
+        if property_name is not None:
+            fields.append((1, normalize_name(property_name), self._keys_by_property))
+        if value is not None:
+            fields.append((2, normalize_value(value), self._keys_by_value))
+        if len(fields) == 0:
+            return set(range(len(self._locations)))
+
+        # Keys are taken from the field with fewest of them and checked against the other fields
+        candidate_keys = min((keys_by_field.get(field_value, ()) for _, field_value, keys_by_field in fields), key=len)
+        location_ids = set()
+        for key in candidate_keys:
+            if all(key[field_index] == field_value for field_index, field_value, _ in fields):
+                location_ids.update(self._postings[key])
+        return location_ids
+
+    def find(self, object_name=None, property_name=None, value=None, visual_type=None):
+        """
+        Returns locations of visuals having property matching all given arguments in report order, such as every
+        visual with fontSize of 12 by find(property_name='fontSize', value=12). Names are matched ignoring case and
+        values after normalize_value. Only visuals of visual_type are returned when it is given, page visuals have
+        visual type 'page'. Without arguments all visuals are returned.
+        """
+        return [self._locations[location_id]
+                for location_id in sorted(self._find_location_ids(object_name, property_name, value, visual_type))]
+
+    def _find_term_location_ids(self, term):
+        if '=' in term:
+            name, value = term.split('=', 1)
+            object_name, _, property_name = name.rpartition('.')
+            return self._find_location_ids(object_name or None, property_name or None, value or None)
+        if '.' in term and not _is_number(term):
+            object_name, _, property_name = term.rpartition('.')
+            return self._find_location_ids(object_name or None, property_name or None)
+        # Single word can be visual type, name of object or property or value
+        return self._find_location_ids(visual_type=term) | self._find_location_ids(object_name=term) | \
+            self._find_location_ids(property_name=term) | self._find_location_ids(value=term)
+
+    def search(self, query):
+        """
+        Returns locations of visuals matching every term of query in report order. Terms are separated by spaces and
+        can be quoted, term is either object.property=value, any part of which can be left out such as fontSize=12,
+        title.fontColor or =Top, or single word matching visual type, object name, property name or value such as
+        legend or #FF0000. Empty query matches all visuals.
+        """
+        try:
+            terms = shlex.split(query)
+        except ValueError:
+            # Unfinished quote while query is still being typed
+            terms = query.split()
+        location_ids = None
+        for term in terms:
+            term_location_ids = self._find_term_location_ids(term)
+            location_ids = term_location_ids if location_ids is None else location_ids & term_location_ids
+            if len(location_ids) == 0:
+                break
+        if location_ids is None:
+            return list(self._locations)
+        return [self._locations[location_id] for location_id in sorted(location_ids)]
@@ -0,0 +1,227 @@
+from PyQt5.QtCore import Qt, QAbstractListModel, QAbstractItemModel, QModelIndex
+from ExtractedRecords import SolidColor
+
+# Role under which ReportPagesModel returns report section name of page
+ReportSectionNameRole = Qt.UserRole
+
+# Number of rows given to view at a time, further rows are only fetched when view is scrolled to them
+_FETCH_BATCH_SIZE = 200
+
+
+class ReportPagesModel(QAbstractListModel):
+    """
+    List of report pages as returned by get_report_pages of PowerBIThemeGenerator.
+    """
+
+    def __init__(self, reportPages, parent=None):
+        super().__init__(parent)
+        self._reportPages = reportPages
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._reportPages)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        reportPage = self._reportPages[index.row()]
+        if role == Qt.DisplayRole:
+            return str(reportPage['displayName'])
+        if role == Qt.ToolTipRole:
+            return reportPage['name'] + ' - ' + str(reportPage['visualCount']) + ' visuals'
+        if role == ReportSectionNameRole:
+            return reportPage['name']
+        return None
+
+
+class ReportPageVisualsModel(QAbstractListModel):
+    """
+    Checkable list of visuals of one extracted report page. Checking a visual selects it for theme generation in
+    SelectionStore.
+    """
+
+    def __init__(self, selectionStore, reportSectionName, reportPage, parent=None):
+        super().__init__(parent)
+        self._selectionStore = selectionStore
+        self._reportSectionName = reportSectionName
+        self._visuals = reportPage.visuals
+        self._fetchedRowCount = min(_FETCH_BATCH_SIZE, len(self._visuals))
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else self._fetchedRowCount
+
+    def canFetchMore(self, parent):
+        return not parent.isValid() and self._fetchedRowCount < len(self._visuals)
+
+    def fetchMore(self, parent):
+        if parent.isValid():
+            return
+        fetchRowCount = min(_FETCH_BATCH_SIZE, len(self._visuals) - self._fetchedRowCount)
+        self.beginInsertRows(QModelIndex(), self._fetchedRowCount, self._fetchedRowCount + fetchRowCount - 1)
+        self._fetchedRowCount += fetchRowCount
+        self.endInsertRows()
+
+    def flags(self, index):
+        if not index.isValid():
+            return Qt.NoItemFlags
+        return Qt.ItemIsEnabled | Qt.ItemIsSelectable | Qt.ItemIsUserCheckable
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        visual = self._visuals[index.row()]
+        if role == Qt.DisplayRole:
+            visualTitle = visual.objects.get('title')
+            if visualTitle is None or visualTitle.get('text') is None:
+                return str(visual.visual_type)
+            return str(visual.visual_type) + ' - ' + str(visualTitle.get('text'))
+        if role == Qt.CheckStateRole:
+            return Qt.Checked if self._selectionStore.is_visual_selected(self._reportSectionName, index.row()) \
+                else Qt.Unchecked
+        return None
+
+    def setData(self, index, value, role=Qt.EditRole):
+        if not index.isValid() or role != Qt.CheckStateRole:
+            return False
+        self._selectionStore.set_visual_selected(self._reportSectionName, index.row(), value == Qt.Checked)
+        self.dataChanged.emit(index, index, [Qt.CheckStateRole])
+        return True
+
+    def GetReportSectionName(self):
+        return self._reportSectionName
+
+    def SetAllChecked(self, checked):
+        self._selectionStore.set_all_visuals_selected(self._reportSectionName, checked)
+        if self._fetchedRowCount > 0:
+            self.dataChanged.emit(self.index(0), self.index(self._fetchedRowCount - 1), [Qt.CheckStateRole])
+
+
+class _VisualObjectRow:
+    __slots__ = ('name', 'properties', 'row', 'objectIndex')
+
+    def __init__(self, name, properties, row, objectIndex):
+        self.name = name
+        self.properties = properties
+        self.row = row
+        # Index of object in visual, rows skip objects without properties
+        self.objectIndex = objectIndex
+
+
+class VisualPropertiesModel(QAbstractItemModel):
+    """
+    Tree of objects of one visual with their properties as children. Objects are checkable in first column to add
+    them to theme and in last column to add them as wild card properties.
+    """
+
+    _headerLabels = ['Property', 'Value', 'Wild Card']
+    _wildCardColumn = 2
+
+    def __init__(self, selectionStore, reportSectionName, visualIndex, visual, parent=None):
+        super().__init__(parent)
+        self._selectionStore = selectionStore
+        self._reportSectionName = reportSectionName
+        self._visualIndex = visualIndex
+        self._objectRows = []
+        for objectIndex, (objectName, objectValues) in enumerate(visual.objects.items()):
+            # Objects without properties are never part of theme
+            if len(objectValues) > 0:
+                self._objectRows.append(
+                    _VisualObjectRow(objectName, list(objectValues.items()), len(self._objectRows), objectIndex))
+        self._fetchedRowCount = min(_FETCH_BATCH_SIZE, len(self._objectRows))
+
+    def columnCount(self, parent=QModelIndex()):
+        return len(self._headerLabels)
+
+    def rowCount(self, parent=QModelIndex()):
+        if not parent.isValid():
+            return self._fetchedRowCount
+        if parent.internalPointer() is None and parent.column() == 0:
+            return len(self._objectRows[parent.row()].properties)
+        return 0
+
+    def canFetchMore(self, parent):
+        return not parent.isValid() and self._fetchedRowCount < len(self._objectRows)
+
+    def fetchMore(self, parent):
+        if parent.isValid():
+            return
+        fetchRowCount = min(_FETCH_BATCH_SIZE, len(self._objectRows) - self._fetchedRowCount)
+        self.beginInsertRows(QModelIndex(), self._fetchedRowCount, self._fetchedRowCount + fetchRowCount - 1)
+        self._fetchedRowCount += fetchRowCount
+        self.endInsertRows()
+
+    def index(self, row, column, parent=QModelIndex()):
+        if not self.hasIndex(row, column, parent):
+            return QModelIndex()
+        if not parent.isValid():
+            return self.createIndex(row, column)
+        # Property rows point to row of their object
+        return self.createIndex(row, column, self._objectRows[parent.row()])
+
+    def parent(self, index):
+        if not index.isValid():
+            return QModelIndex()
+        objectRow = index.internalPointer()
+        if objectRow is None:
+            return QModelIndex()
+        return self.createIndex(objectRow.row, 0)
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if orientation == Qt.Horizontal and role == Qt.DisplayRole:
+            return self._headerLabels[section]
+        return None
+
+    def flags(self, index):
+        if not index.isValid():
+            return Qt.NoItemFlags
+        flags = Qt.ItemIsEnabled | Qt.ItemIsSelectable
+        if index.internalPointer() is None and index.column() in (0, self._wildCardColumn):
+            flags |= Qt.ItemIsUserCheckable
+        return flags
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        objectRow = index.internalPointer()
+        if objectRow is None:
+            objectRow = self._objectRows[index.row()]
+            if role == Qt.DisplayRole and index.column() == 0:
+                return str(objectRow.name)
+            if role == Qt.CheckStateRole:
+                if index.column() == 0:
+                    checked = self._selectionStore.is_object_selected(self._reportSectionName, self._visualIndex,
+                                                                      objectRow.objectIndex)
+                    return Qt.Checked if checked else Qt.Unchecked
+                if index.column() == self._wildCardColumn:
+                    checked = self._selectionStore.is_wildcard(self._reportSectionName, self._visualIndex,
+                                                               objectRow.objectIndex)
+                    return Qt.Checked if checked else Qt.Unchecked
+            return None
+
+        if role == Qt.DisplayRole and index.column() < 2:
+            propertyName, propertyValue = objectRow.properties[index.row()]
+            if index.column() == 0:
+                return str(propertyName)
+            if type(propertyValue) is SolidColor:
+                propertyValue = propertyValue.color
+            return str(propertyValue)
+        return None
+
+    def setData(self, index, value, role=Qt.EditRole):
+        if not index.isValid() or role != Qt.CheckStateRole or index.internalPointer() is not None:
+            return False
+        objectIndex = self._objectRows[index.row()].objectIndex
+        if index.column() == 0:
+            self._selectionStore.set_object_selected(self._reportSectionName, self._visualIndex, objectIndex,
+                                                     value == Qt.Checked)
+        elif index.column() == self._wildCardColumn:
+            self._selectionStore.set_wildcard(self._reportSectionName, self._visualIndex, objectIndex,
+                                              value == Qt.Checked)
+        else:
+            return False
+        self.dataChanged.emit(index, index, [Qt.CheckStateRole])
+        return True
+
+    def SetAllChecked(self, checked):
+        self._selectionStore.set_all_objects_selected(self._reportSectionName, self._visualIndex, checked)
+        if self._fetchedRowCount > 0:
+            self.dataChanged.emit(self.index(0, 0), self.index(self._fetchedRowCount - 1, 0), [Qt.CheckStateRole])
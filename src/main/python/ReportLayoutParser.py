@@ -0,0 +1,98 @@
+import codecs
+import json
+import re
+
+_WHITESPACE = re.compile(r'[ \t\n\r]*')
+_JSON_DECODER = json.JSONDecoder()
+
+
+class ReportLayoutParser:
+    """
+    Incremental parser for Report/Layout document of Power BI file.
+
+    Report/Layout is single JSON document which can be tens of MB of UTF-16 text. Instead of decoding and loading whole
+    document this parser reads layout stream in chunks and yields report sections one at a time, so only the section
+    being parsed is kept in memory along with small read buffer.
+    """
+
+    def __init__(self, layout_stream, total_bytes=None, chunk_size=1 << 20):
+        self._layout_stream = layout_stream
+        self._chunk_size = chunk_size
+        self._decoder = None
+        self._buffer = ''
+        self._position = 0
+        self._end_of_stream = False
+        self.bytes_read = 0
+        self.total_bytes = total_bytes
+
+    def iter_sections(self):
+        self._expect('{')
+        while not self._skip_separator('}'):
+            key = self._read_value()
+            self._expect(':')
+            if key == 'sections':
+                self._expect('[')
+                while not self._skip_separator(']'):
+                    yield self._read_value()
+            else:
+                self._read_value()
+
+    def _read_more(self):
+        if self._end_of_stream:
+            return False
+        # Reading at least as much as already buffered keeps re-decoding of values cut by buffer end linear
+        data = self._layout_stream.read(max(self._chunk_size, len(self._buffer) * 2))
+        if self._decoder is None:
+            # Encoding detection needs first four bytes of document
+            while 0 < len(data) < 4:
+                next_data = self._layout_stream.read(4)
+                if len(next_data) == 0:
+                    break
+                data += next_data
+            self._decoder = codecs.getincrementaldecoder(json.detect_encoding(data))()
+        self.bytes_read += len(data)
+        if len(data) == 0:
+            self._end_of_stream = True
+        self._buffer = self._buffer[self._position:] + self._decoder.decode(data, final=self._end_of_stream)
+        self._position = 0
+        return True
+
+    def _peek(self):
+        self._position = _WHITESPACE.match(self._buffer, self._position).end()
+        while self._position >= len(self._buffer):
+            if not self._read_more():
+                raise ValueError('Unexpected end of Report/Layout')
+            self._position = _WHITESPACE.match(self._buffer, self._position).end()
+        return self._buffer[self._position]
+
+    def _expect(self, character):
+        if self._peek() != character:
+            raise ValueError('Expected "{}" at Report/Layout character {} but found "{}"'.format(
+                character, self._position, self._buffer[self._position]))
+        self._position += 1
+
+    def _skip_separator(self, closing_character):
+        # Returns True when closing character of object or array is reached
+        character = self._peek()
+        if character == ',':
+            self._position += 1
+            character = self._peek()
+        if character == closing_character:
+            self._position += 1
+            return True
+        return False
+
+    def _read_value(self):
+        self._peek()
+        while True:
+            try:
+                value, value_end = _JSON_DECODER.raw_decode(self._buffer, self._position)
+                # Scalar value such as number can be cut at the end of buffer and still be valid JSON
+                if value_end < len(self._buffer) or self._end_of_stream or self._buffer[self._position] in '{["':
+                    self._position = value_end
+                    return value
+            except json.JSONDecodeError:
+                if self._end_of_stream:
+                    raise
+            if not self._read_more():
+                raise ValueError('Unexpected end of Report/Layout')
@@ -0,0 +1,92 @@
+from PyQt5.QtCore import QThread, pyqtSignal
+from ErrorLoggingService import LogException
+from Profiling import profiled
+
+
+class ReportLoaderThread(QThread):
+    """
+    Loads Power BI file outside of GUI thread so window stays responsive while large reports are read. Progress is
+    reported after every report page read and loading stops at next page once requestInterruption is called.
+
+    When theme generator of previously loaded version of same file is given, report pages which did not change are
+    taken over from it instead of being extracted again.
+
+    Report is shown as soon as it is read and report pages are extracted when opened. Meanwhile loader thread goes on
+    to extract the report pages not opened yet in one pass over Report/Layout, building PropertyIndex used to search
+    visual properties. Extracted report pages are written to extraction cache once all of them are indexed.
+    """
+
+    progressChanged = pyqtSignal(int, str)  # percent of Report/Layout read, message
+    reportLoaded = pyqtSignal(object, object)  # PowerBIThemeGenerator, report visual data
+    loadingFailed = pyqtSignal(str)  # error details
+    loadingCancelled = pyqtSignal()
+    indexingProgressChanged = pyqtSignal(int)  # percent of report pages indexed
+    propertyIndexBuilt = pyqtSignal(object)  # PropertyIndex
+    indexingFailed = pyqtSignal(str)  # error details
+
+    def __init__(self, pbiFilePath, parent=None, previousPowerBIThemeGenerator=None):
+        super().__init__(parent)
+        self._pbiFilePath = pbiFilePath
+        self._previousPowerBIThemeGenerator = previousPowerBIThemeGenerator
+        self._changedReportSections = None
+
+    def GetPbiFilePath(self):
+        return self._pbiFilePath
+
+    def IsReload(self):
+        return self._previousPowerBIThemeGenerator is not None
+
+    def GetChangedReportSections(self):
+        # Only known once reload is done
+        return self._changedReportSections
+
+    def run(self):
+        powerBIThemeGenerator = self._loadReport()
+        if powerBIThemeGenerator is not None and not self.isInterruptionRequested():
+            self._indexReport(powerBIThemeGenerator)
+
+    @profiled('load_report')
+    def _loadReport(self):
+        try:
+            # Imported by loader thread so starting application does not wait for extraction modules
+            from PowerBIThemeGenerator import PowerBIThemeGenerator
+            from ExtractionCache import ExtractionCache
+
+            def __sectionRead(bytesRead, totalBytes, reportSection):
+                percent = int(bytesRead * 100 / totalBytes) if totalBytes else 100
+                self.progressChanged.emit(percent, 'Reading report page ' + str(reportSection['displayName']))
+                return not self.isInterruptionRequested()
+
+            self.progressChanged.emit(0, 'Opening ' + self._pbiFilePath)
+            powerBIThemeGenerator = PowerBIThemeGenerator(self._pbiFilePath, ExtractionCache())
+            if not powerBIThemeGenerator.load(__sectionRead) or self.isInterruptionRequested():
+                self.loadingCancelled.emit()
+                return None
+            if self._previousPowerBIThemeGenerator is not None:
+                self._changedReportSections = powerBIThemeGenerator.adopt_unchanged_pages(
+                    self._previousPowerBIThemeGenerator)
+            self.progressChanged.emit(100, 'Loaded ' + self._pbiFilePath)
+            self.reportLoaded.emit(powerBIThemeGenerator, powerBIThemeGenerator.modifiedDataStructure(lazy=True))
+            return powerBIThemeGenerator
+        except Exception as e:
+            self.loadingFailed.emit(LogException(e))
+            return None
+
+    @profiled('index_report')
+    def _indexReport(self, powerBIThemeGenerator):
+        try:
+            from PropertyIndex import PropertyIndex
+
+            propertyIndex = PropertyIndex()
+            reportPageCount = len(powerBIThemeGenerator.get_report_pages())
+            # Report pages opened meanwhile are already extracted and only indexed here
+            for reportPageIndex, (reportSectionName, reportPage) in enumerate(
+                    powerBIThemeGenerator.iter_extracted_report_pages()):
+                propertyIndex.add_page(reportSectionName, reportPage)
+                if self.isInterruptionRequested():
+                    return
+                self.indexingProgressChanged.emit(int((reportPageIndex + 1) * 100 / max(reportPageCount, 1)))
+            powerBIThemeGenerator.save_extraction_cache()
+            self.propertyIndexBuilt.emit(propertyIndex)
+        except Exception as e:
+            self.indexingFailed.emit(LogException(e))
@@ -0,0 +1,175 @@
+from array import array
+
+# Object flags are stored inverted so zero filled flags mean selected object, which is the default
+_OBJECT_DESELECTED = 1
+_OBJECT_WILDCARD = 2
+
+
+def _get_visual_keys(visuals):
+    # Page visual has no name, its visual type tells it apart from other visuals. Other visuals without name are told
+    # apart by their visual type and how many visuals of same type without name come before them.
+    visual_keys = []
+    unnamed_visual_counts = {}
+    for visual in visuals:
+        if visual.name is not None:
+            visual_keys.append(('name', visual.name))
+        elif visual.visual_type == 'page':
+            visual_keys.append(('page',))
+        else:
+            occurrence = unnamed_visual_counts.get(visual.visual_type, 0)
+            unnamed_visual_counts[visual.visual_type] = occurrence + 1
+            visual_keys.append(('visual_type', visual.visual_type, occurrence))
+    return visual_keys
+
+
+class _PageSelection:
+    __slots__ = ('visual_flags', 'object_offsets', 'object_flags')
+
+    def __init__(self, visuals):
+        # One byte per visual and one byte per object of every visual, object flags of visual at index i start at
+        # object_offsets[i] in same order as objects of visual
+        self.visual_flags = bytearray(len(visuals))
+        self.object_offsets = array('L', [0]) * len(visuals)
+        object_count = 0
+        for visual_index, visual in enumerate(visuals):
+            self.object_offsets[visual_index] = object_count
+            object_count += len(visual.objects)
+        self.object_flags = bytearray(object_count)
+
+
+class SelectionStore:
+    """
+    Visuals and objects selected for theme generation, kept apart from extracted report visual data so extracted data
+    is never modified and can be shared, cached and saved as it is.
+
+    Selection is indexed by report section name, index of visual in report page and index of object in visual. Flags
+    of a report page are allocated the first time the page is accessed, by default no visual is selected and every
+    object having at least one property is selected.
+    """
+
+    def __init__(self, report_visual_data):
+        self._report_visual_data = report_visual_data
+        self._pages = {}
+
+    def _get_page_selection(self, report_section_name):
+        page_selection = self._pages.get(report_section_name)
+        if page_selection is None:
+            page_selection = self._pages[report_section_name] = _PageSelection(
+                self._report_visual_data[report_section_name].visuals)
+        return page_selection
+
+    def is_visual_selected(self, report_section_name, visual_index):
+        return self._get_page_selection(report_section_name).visual_flags[visual_index] != 0
+
+    def set_visual_selected(self, report_section_name, visual_index, selected):
+        self._get_page_selection(report_section_name).visual_flags[visual_index] = 1 if selected else 0
+
+    def set_all_visuals_selected(self, report_section_name, selected):
+        visual_flags = self._get_page_selection(report_section_name).visual_flags
+        visual_flags[:] = (b'\x01' if selected else b'\x00') * len(visual_flags)
+
+    def _get_object_flag_index(self, report_section_name, visual_index, object_index):
+        return self._get_page_selection(report_section_name).object_offsets[visual_index] + object_index
+
+    def is_object_selected(self, report_section_name, visual_index, object_index):
+        object_flags = self._get_page_selection(report_section_name).object_flags
+        if object_flags[self._get_object_flag_index(report_section_name, visual_index, object_index)] \
+                & _OBJECT_DESELECTED:
+            return False
+        # Objects without properties are never part of theme. Values of PropertyMap are a tuple, so object is found
+        # by index without listing object names on every call
+        visual_objects = self._report_visual_data[report_section_name].visuals[visual_index].objects
+        return len(visual_objects.values()[object_index]) > 0
+
+    def set_object_selected(self, report_section_name, visual_index, object_index, selected):
+        object_flags = self._get_page_selection(report_section_name).object_flags
+        flag_index = self._get_object_flag_index(report_section_name, visual_index, object_index)
+        if selected:
+            object_flags[flag_index] &= ~_OBJECT_DESELECTED
+        else:
+            object_flags[flag_index] |= _OBJECT_DESELECTED
+
+    def set_all_objects_selected(self, report_section_name, visual_index, selected):
+        visual_objects = self._report_visual_data[report_section_name].visuals[visual_index].objects
+        for object_index in range(len(visual_objects)):
+            self.set_object_selected(report_section_name, visual_index, object_index, selected)
+
+    def is_wildcard(self, report_section_name, visual_index, object_index):
+        object_flags = self._get_page_selection(report_section_name).object_flags
+        return object_flags[self._get_object_flag_index(report_section_name, visual_index, object_index)] \
+            & _OBJECT_WILDCARD != 0
+
+    def set_wildcard(self, report_section_name, visual_index, object_index, wildcard):
+        object_flags = self._get_page_selection(report_section_name).object_flags
+        flag_index = self._get_object_flag_index(report_section_name, visual_index, object_index)
+        if wildcard:
+            object_flags[flag_index] |= _OBJECT_WILDCARD
+        else:
+            object_flags[flag_index] &= ~_OBJECT_WILDCARD
+
+    def iter_selected_visuals(self):
+        """
+        Yields report page, visual and list of selected objects of every selected visual in report page order. Every
+        selected object is given as tuple of object name, its properties and whether it is selected as wild card.
+        Report pages which were never accessed have no selected visuals and are not visited.
+        """
+        for report_section_name in self._report_visual_data:
+            page_selection = self._pages.get(report_section_name)
+            if page_selection is None:
+                continue
+            visual_flags = page_selection.visual_flags
+            object_flags = page_selection.object_flags
+            report_page = self._report_visual_data[report_section_name]
+            visuals = report_page.visuals
+            for visual_index in range(len(visuals)):
+                if visual_flags[visual_index] == 0:
+                    continue
+                visual = visuals[visual_index]
+                flag_index = page_selection.object_offsets[visual_index]
+                selected_objects = []
+                for object_name, object_properties in visual.objects.items():
+                    object_flag = object_flags[flag_index]
+                    flag_index += 1
+                    if object_flag & _OBJECT_DESELECTED == 0 and len(object_properties) > 0:
+                        selected_objects.append(
+                            (object_name, object_properties, object_flag & _OBJECT_WILDCARD != 0))
+                yield report_page, visual, selected_objects
+
+    def remap(self, report_visual_data):
+        """
+        Returns SelectionStore for report visual data of reloaded Power BI file, keeping selection of visuals and
+        objects which are still present. Visuals are matched by their name within same report page and objects by
+        their name within matched visual. Visuals without name are matched by their visual type and order among
+        visuals of that type without name.
+        """
+        selection_store = SelectionStore(report_visual_data)
+        for report_section_name, page_selection in self._pages.items():
+            if not any(page_selection.visual_flags) and not any(page_selection.object_flags):
+                # Nothing changed from default selection in this page
+                continue
+            try:
+                visuals = report_visual_data[report_section_name].visuals
+            except KeyError:
+                # Report page was removed
+                continue
+            visual_indexes = {
+                visual_key: visual_index for visual_index, visual_key in enumerate(_get_visual_keys(visuals))
+            }
+            new_page_selection = selection_store._get_page_selection(report_section_name)
+            previous_visuals = self._report_visual_data[report_section_name].visuals
+            previous_visual_keys = _get_visual_keys(previous_visuals)
+            for previous_visual_index, previous_visual in enumerate(previous_visuals):
+                visual_index = visual_indexes.get(previous_visual_keys[previous_visual_index])
+                if visual_index is None:
+                    continue
+                new_page_selection.visual_flags[visual_index] = page_selection.visual_flags[previous_visual_index]
+                object_indexes = {object_name: object_index
+                                  for object_index, object_name in enumerate(visuals[visual_index].objects)}
+                previous_flag_index = page_selection.object_offsets[previous_visual_index]
+                for previous_object_index, object_name in enumerate(previous_visual.objects):
+                    object_index = object_indexes.get(object_name)
+                    if object_index is not None:
+                        new_page_selection.object_flags[new_page_selection.object_offsets[visual_index] +
+                                                        object_index] = \
+                            page_selection.object_flags[previous_flag_index + previous_object_index]
+        return selection_store
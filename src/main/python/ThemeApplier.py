@@ -0,0 +1,275 @@
+import json
+import os
+import re
+import shutil
+import tempfile
+from decimal import Decimal
+from ExtractionMemo import PARSED_CONFIG_INDEX
+from PbixArchive import PbixArchive, PbixWriter, LAYOUT_ENTRY_NAME, CONTENT_TYPES_ENTRY_NAME, \
+    SECURITY_BINDINGS_ENTRY_NAME
+from Profiling import profiled, profile_span
+from PropertyDecoder import decode_literal
+from ThemeValidator import validate_theme, get_errors
+
+# Objects of visual container itself rather than of visual, which Power BI keeps in vcObjects of visual config
+_VISUAL_CONTAINER_OBJECTS = frozenset((
+    'title', 'subTitle', 'divider', 'spacing', 'padding', 'background', 'border', 'dropShadow', 'visualHeader',
+    'visualHeaderTooltip', 'visualTooltip', 'visualLink', 'lockAspect',
+))
+# Power BI does not open file whose layout was changed while it still has security bindings of the old layout
+_SECURITY_BINDINGS_OVERRIDE = re.compile(rb'<Override\s[^>]*PartName="/' + SECURITY_BINDINGS_ENTRY_NAME.encode() +
+                                         rb'"[^>]*/>')
+_LAYOUT_SEPARATORS = (',', ':')
+# Integer literals such as 3L, which keep their suffix when value written over them is whole number
+_INTEGER_LITERAL = re.compile(r'[-+]?\d+L')
+# Properties holding list of font families such as fontFamily or labelFontFamily
+_FONT_FAMILY_PROPERTY_NAME = re.compile(r'(?:fontFamily|.+FontFamily)')
+
+
+def _encode_literal(literal):
+    return {
+        'expr': {
+            'Literal': {
+                'Value': literal
+            }
+        }
+    }
+
+
+def _format_number(value):
+    # Literals of Power BI expressions never use exponent, 1e-05 is written as 0.00001
+    text = repr(value)
+    if 'e' in text or 'E' in text:
+        text = format(Decimal(text), 'f')
+    return text
+
+
+def _encode_property_value(value):
+    # Reverse of PropertyDecoder, returns None for values which can not be written to report
+    value_type = type(value)
+    if value_type is bool:
+        return _encode_literal('true' if value else 'false')
+    if value_type is int or value_type is float:
+        return _encode_literal(_format_number(value) + 'D')
+    if value_type is str:
+        return _encode_literal("'" + value.replace("'", "''") + "'")
+    if value_type is dict:
+        solid = value.get('solid')
+        if type(solid) is dict and type(solid.get('color')) is str:
+            return {
+                'solid': {
+                    'color': _encode_literal("'" + solid['color'] + "'")
+                }
+            }
+    return None
+
+
+def _get_literal(encoded_value):
+    # Text of Literal expression of property already in visual, None for other expressions
+    try:
+        literal = encoded_value['expr']['Literal']['Value']
+    except (KeyError, TypeError):
+        return None
+    return literal if type(literal) is str else None
+
+
+def _encode_font_families(value):
+    # Font families with spaces in list of them are quoted within text, such as '''Segoe UI'', wf_segoe-ui_normal',
+    # which PropertyDecoder decodes to Segoe UI, wf_segoe-ui_normal. Single font family is quoted as any other text.
+    font_families = [font_family.strip() for font_family in value.split(',')]
+    if len(font_families) == 1:
+        return _encode_property_value(value)
+    return _encode_literal("'" + ', '.join("''" + font_family + "''" if ' ' in font_family else font_family
+                                          for font_family in font_families) + "'")
+
+
+def _encode_property_value_like(value, encoded_value):
+    """
+    Returns value encoded the same way as encoded_value, the property visual already has, or None when it is encoded
+    the default way. Literal which decodes to value is kept as it is, so literals PropertyDecoder does not decode
+    exactly such as 45.5D or quoted font families are not changed by writing their own value back. Integer literals
+    keep their L suffix and quoted font families keep their quoting.
+    """
+    literal = _get_literal(encoded_value)
+    if literal is None:
+        return None
+    decoded_value = decode_literal(literal)
+    if type(decoded_value) is type(value) and decoded_value == value:
+        return encoded_value
+    value_type = type(value)
+    if (value_type is int or value_type is float and value.is_integer()) and \
+            _INTEGER_LITERAL.fullmatch(literal) is not None:
+        return _encode_literal(str(int(value)) + 'L')
+    if value_type is str and "''" in literal.strip("'"):
+        return _encode_font_families(value)
+    return None
+
+
+def _encode_theme_object(object_values):
+    # Theme object applies to visual through its first entry without selector, entries with $id are for selectors.
+    # Properties are kept as value and its default encoding, value is needed to encode it like property it replaces.
+    for object_properties in object_values if type(object_values) is list else ():
+        if type(object_properties) is dict and '$id' not in object_properties:
+            theme_properties = {}
+            for property_name, property_value in object_properties.items():
+                if type(property_value) is str and _FONT_FAMILY_PROPERTY_NAME.fullmatch(property_name) is not None:
+                    encoded_value = _encode_font_families(property_value)
+                else:
+                    encoded_value = _encode_property_value(property_value)
+                if encoded_value is not None and not property_name.startswith('__'):
+                    theme_properties[property_name] = (property_value, encoded_value)
+            return theme_properties
+    return {}
+
+
+class _ThemeObjects:
+    # Encoded objects of theme for each visual type, wild card objects are applied first so objects of visual type
+    # take precedence over them
+
+    def __init__(self, theme):
+        self._visual_styles = theme.get('visualStyles') or {}
+        self._objects = {}
+
+    def get(self, visual_type):
+        objects = self._objects.get(visual_type)
+        if objects is None:
+            objects = {}
+            styles = (visual_type,) if visual_type == 'page' else ('*', visual_type)
+            for style_name in styles:
+                visual_style = self._visual_styles.get(style_name) or {}
+                for object_name, object_values in (visual_style.get('*') or {}).items():
+                    theme_properties = _encode_theme_object(object_values)
+                    if len(theme_properties) > 0:
+                        objects.setdefault(object_name, {}).update(theme_properties)
+            self._objects[visual_type] = objects
+        return objects
+
+
+def _set_object_properties(objects, object_name, theme_properties):
+    # Entries and properties come from shared parsed config, so they are copied before being changed
+    object_entries = objects[object_name] = list(objects.get(object_name, []))
+    for entry_index, object_entry in enumerate(object_entries):
+        # Entries with selector only format some data points, theme replaces properties of whole visual
+        if type(object_entry) is dict and 'selector' not in object_entry:
+            object_entry = object_entries[entry_index] = dict(object_entry)
+            properties = object_entry['properties'] = dict(object_entry.get('properties', {}))
+            break
+    else:
+        properties = {}
+        object_entries.insert(0, {'properties': properties})
+    for property_name, (property_value, encoded_value) in theme_properties.items():
+        if property_name in properties:
+            # New properties are written the default way, existing ones keep the way they are written
+            existing_encoded_value = _encode_property_value_like(property_value, properties[property_name])
+            if existing_encoded_value is not None:
+                encoded_value = existing_encoded_value
+        properties[property_name] = encoded_value
+
+
+def _apply_to_visual(single_visual, theme_objects):
+    # Returns changed copy of single visual, which comes from shared parsed config
+    single_visual = dict(single_visual)
+    objects = single_visual['objects'] = dict(single_visual.get('objects', {}))
+    visual_container_objects = single_visual.get('vcObjects')
+    if visual_container_objects is not None:
+        visual_container_objects = single_visual['vcObjects'] = dict(visual_container_objects)
+    for object_name, theme_properties in theme_objects.items():
+        if object_name in objects:
+            target_objects = objects
+        elif object_name in (visual_container_objects or {}) or object_name in _VISUAL_CONTAINER_OBJECTS:
+            if visual_container_objects is None:
+                visual_container_objects = single_visual['vcObjects'] = {}
+            target_objects = visual_container_objects
+        else:
+            target_objects = objects
+        _set_object_properties(target_objects, object_name, theme_properties)
+    return single_visual
+
+
+def apply_theme_to_layout(layout, theme):
+    """
+    Writes properties of visual styles of theme into objects of every visual of parsed report layout, replacing
+    properties the visuals already have. Objects of 'page' visual style are written to report pages. Returns number
+    of visuals and report pages changed.
+    """
+    theme_objects = _ThemeObjects(theme)
+    changed_count = 0
+    for report_section in layout.get('sections', []):
+        with profile_span('apply_theme_to_section', section=report_section.get('name')):
+            page_objects = theme_objects.get('page')
+            if len(page_objects) > 0:
+                # Configs already parsed by page extraction are taken from PARSED_CONFIG_INDEX, so changes are written
+                # to copies of them. Configs parsed here are not kept as they are replaced right after
+                section_config = dict(PARSED_CONFIG_INDEX.get(report_section.get('config') or '{}', keep=False))
+                section_objects = section_config['objects'] = dict(section_config.get('objects', {}))
+                for object_name, theme_properties in page_objects.items():
+                    _set_object_properties(section_objects, object_name, theme_properties)
+                report_section['config'] = json.dumps(section_config, separators=_LAYOUT_SEPARATORS)
+                changed_count += 1
+
+            for visual_container in report_section.get('visualContainers', []):
+                config = PARSED_CONFIG_INDEX.get(visual_container.get('config') or '{}', keep=False)
+                single_visual = config.get('singleVisual')
+                if type(single_visual) is not dict:
+                    # Groups of visuals and visuals which are not single visual have no objects of their own
+                    continue
+                visual_objects = theme_objects.get(single_visual.get('visualType'))
+                if len(visual_objects) == 0:
+                    continue
+                config = dict(config, singleVisual=_apply_to_visual(single_visual, visual_objects))
+                visual_container['config'] = json.dumps(config, separators=_LAYOUT_SEPARATORS)
+                changed_count += 1
+    return changed_count
+
+
+def _read_layout(power_bi_file):
+    layout_data = power_bi_file.read(LAYOUT_ENTRY_NAME)
+    layout_encoding = json.detect_encoding(layout_data)
+    return json.loads(layout_data.decode(layout_encoding)), layout_encoding
+
+
+@profiled('apply_theme')
+def apply_theme(pbi_file_path, theme, output_file_path):
+    """
+    Writes copy of Power BI file to output_file_path with theme applied to its visuals by apply_theme_to_layout.
+    Only Report/Layout is written again, other entries such as DataModel are copied without being decompressed.
+    Security bindings are left out, Power BI creates them again when file is saved. output_file_path can not be the
+    Power BI file itself, so original report is never lost. Output file is written next to its final path and moved
+    there once complete, so existing file at output_file_path is never left half written. Returns number of visuals
+    and report pages changed.
+    """
+    errors = get_errors(validate_theme(theme))
+    if len(errors) > 0:
+        raise ValueError('Theme has {} invalid values, first of them {}'.format(len(errors), errors[0]))
+    if os.path.exists(output_file_path) and os.path.samefile(output_file_path, pbi_file_path):
+        raise ValueError('Output would replace Power BI file itself, choose other output file')
+
+    output_directory = os.path.dirname(os.path.abspath(output_file_path))
+    file_descriptor, temporary_file_path = tempfile.mkstemp(suffix='.pbix', dir=output_directory)
+    os.close(file_descriptor)
+    try:
+        with PbixArchive(pbi_file_path) as power_bi_file, PbixWriter(temporary_file_path) as power_bi_writer:
+            with profile_span('rewrite_layout'):
+                layout, layout_encoding = _read_layout(power_bi_file)
+                changed_count = apply_theme_to_layout(layout, theme)
+                layout_data = json.dumps(layout, separators=_LAYOUT_SEPARATORS, ensure_ascii=False) \
+                    .encode(layout_encoding)
+
+            with profile_span('write_pbix'):
+                for name in power_bi_file.namelist():
+                    if name == SECURITY_BINDINGS_ENTRY_NAME:
+                        continue
+                    if name == LAYOUT_ENTRY_NAME:
+                        power_bi_writer.write_entry(power_bi_file.getinfo(name), layout_data)
+                    elif name == CONTENT_TYPES_ENTRY_NAME:
+                        power_bi_writer.write_entry(power_bi_file.getinfo(name), _SECURITY_BINDINGS_OVERRIDE.sub(
+                            b'', power_bi_file.read(name)))
+                    else:
+                        power_bi_writer.copy_raw_entry(power_bi_file, name)
+        # Temporary file is only readable by its owner until it gets permissions of Power BI file
+        shutil.copymode(pbi_file_path, temporary_file_path)
+        os.replace(temporary_file_path, output_file_path)
+    except BaseException:
+        os.remove(temporary_file_path)
+        raise
+    return changed_count
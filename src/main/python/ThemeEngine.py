@@ -0,0 +1,165 @@
+from Profiling import profiled
+
+DEFAULT_THEME_NAME = 'My Theme'
+
+# Precedence of themes given to merge_themes, in order of reports they were built from
+FIRST_REPORT_WINS = 'first'
+LAST_REPORT_WINS = 'last'
+
+# General theme properties in order they are written to theme file
+_GENERAL_PROPERTIES = ('dataColors', 'background', 'foreground', 'tableAccent')
+
+
+class ThemeConflict:
+    """
+    Selection which can not be written to theme because theme holds only one entry for it, such as same visual type
+    selected in more than one report page.
+    """
+
+    VISUAL_TYPE = 'visualType'
+    WILDCARD_OBJECT = 'wildcardObject'
+
+    def __init__(self, kind, name, report_pages):
+        self.kind = kind
+        self.name = name
+        # Display names of report pages in which name is selected, once for every selection. For themes merged by
+        # merge_themes these are names of themes having it instead.
+        self.report_pages = report_pages
+
+    def to_dict(self):
+        return {
+            'kind': self.kind,
+            'name': self.name,
+            'reportPages': list(self.report_pages),
+        }
+
+    def __repr__(self):
+        return 'ThemeConflict({!r}, {!r}, {!r})'.format(self.kind, self.name, self.report_pages)
+
+
+class ThemeBuildResult:
+    def __init__(self, theme, conflicts, overrides=()):
+        self.theme = theme
+        self.conflicts = conflicts
+        # Names found in more than one merged theme, taken from theme of highest precedence
+        self.overrides = list(overrides)
+
+    @property
+    def visual_type_conflicts(self):
+        return [conflict for conflict in self.conflicts if conflict.kind == ThemeConflict.VISUAL_TYPE]
+
+    @property
+    def wildcard_object_conflicts(self):
+        return [conflict for conflict in self.conflicts if conflict.kind == ThemeConflict.WILDCARD_OBJECT]
+
+
+@profiled('build_theme')
+def build_theme(selection_store, theme_name=None, general_properties=None):
+    """
+    Builds theme from visuals and objects selected in SelectionStore in one pass over the selection. Properties
+    of selected objects are copied into theme as plain dicts, so theme can be changed and serialized as it is.
+
+    Selected visuals are indexed by visual type and wild card objects by object name, every name selected more than
+    once is returned as ThemeConflict. Conflicting visual types keep the first selected visual and conflicting wild
+    card objects are left out of theme, so theme should only be saved when there are no conflicts.
+    """
+    theme = {
+        'name': theme_name if theme_name is not None and len(theme_name.strip()) > 0 else DEFAULT_THEME_NAME,
+    }
+    if general_properties is not None:
+        for property_name in _GENERAL_PROPERTIES:
+            property_value = general_properties.get(property_name)
+            if property_name == 'dataColors' and property_value is not None:
+                property_value = [data_color for data_color in property_value if data_color]
+            if property_value is not None and property_value != '':
+                theme[property_name] = property_value
+
+    visual_styles = {}
+    visual_type_pages = {}
+    wildcard_objects = {}
+    wildcard_object_pages = {}
+    for report_page, visual, visual_objects in selection_store.iter_selected_visuals():
+        page_name = report_page.display_name
+        visual_type = visual.visual_type
+        selected_pages = visual_type_pages.setdefault(visual_type, [])
+        selected_pages.append(page_name)
+
+        selected_objects = {}
+        for object_name, object_properties, wildcard in visual_objects:
+            object_properties = object_properties.to_dict()
+            selected_objects[object_name] = [object_properties]
+            if wildcard:
+                wildcard_object_pages.setdefault(object_name, []).append(page_name)
+                wildcard_objects.setdefault(object_name, [object_properties])
+        if len(selected_pages) == 1:
+            visual_styles[visual_type] = {
+                '*': selected_objects
+            }
+
+    conflicts = [ThemeConflict(ThemeConflict.VISUAL_TYPE, visual_type, pages)
+                 for visual_type, pages in visual_type_pages.items() if len(pages) > 1]
+    conflicts += [ThemeConflict(ThemeConflict.WILDCARD_OBJECT, object_name, pages)
+                  for object_name, pages in wildcard_object_pages.items() if len(pages) > 1]
+    for conflict in conflicts:
+        if conflict.kind == ThemeConflict.WILDCARD_OBJECT:
+            wildcard_objects.pop(conflict.name)
+
+    theme['visualStyles'] = {}
+    if len(wildcard_objects) > 0:
+        theme['visualStyles']['*'] = {
+            '*': wildcard_objects
+        }
+    theme['visualStyles'].update(visual_styles)
+    return ThemeBuildResult(theme, conflicts)
+
+
+@profiled('merge_themes')
+def merge_themes(themes, theme_name=None, precedence=FIRST_REPORT_WINS):
+    """
+    Merges themes built from several reports, given as list of (theme name, theme) in report order, into one theme.
+    Every visual type, wild card object and general property is taken from theme of highest precedence having it,
+    which is the earliest theme with FIRST_REPORT_WINS and the latest one with LAST_REPORT_WINS.
+
+    Names found in more than one theme are returned as overrides of ThemeBuildResult listing names of those themes in
+    order of precedence, first one being used. They are resolved by precedence so unlike conflicts of build_theme they
+    do not stop theme from being saved.
+    """
+    if precedence not in (FIRST_REPORT_WINS, LAST_REPORT_WINS):
+        raise ValueError('Unknown theme precedence ' + str(precedence))
+    themes = list(themes) if precedence == FIRST_REPORT_WINS else list(reversed(themes))
+
+    theme = {
+        'name': theme_name if theme_name is not None and len(theme_name.strip()) > 0 else DEFAULT_THEME_NAME,
+    }
+    for property_name in _GENERAL_PROPERTIES:
+        for _, source_theme in themes:
+            if property_name in source_theme:
+                theme[property_name] = source_theme[property_name]
+                break
+
+    visual_styles = {}
+    visual_type_themes = {}
+    wildcard_objects = {}
+    wildcard_object_themes = {}
+    for source_theme_name, source_theme in themes:
+        for visual_type, visual_style in source_theme.get('visualStyles', {}).items():
+            if visual_type == '*':
+                for object_name, object_values in visual_style.get('*', {}).items():
+                    wildcard_objects.setdefault(object_name, object_values)
+                    wildcard_object_themes.setdefault(object_name, []).append(source_theme_name)
+            else:
+                visual_styles.setdefault(visual_type, visual_style)
+                visual_type_themes.setdefault(visual_type, []).append(source_theme_name)
+
+    overrides = [ThemeConflict(ThemeConflict.VISUAL_TYPE, visual_type, theme_names)
+                 for visual_type, theme_names in visual_type_themes.items() if len(theme_names) > 1]
+    overrides += [ThemeConflict(ThemeConflict.WILDCARD_OBJECT, object_name, theme_names)
+                  for object_name, theme_names in wildcard_object_themes.items() if len(theme_names) > 1]
+
+    theme['visualStyles'] = {}
+    if len(wildcard_objects) > 0:
+        theme['visualStyles']['*'] = {
+            '*': wildcard_objects
+        }
+    theme['visualStyles'].update(visual_styles)
+    return ThemeBuildResult(theme, [], overrides)
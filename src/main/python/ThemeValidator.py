@@ -0,0 +1,325 @@
+import glob
+import json
+import math
+import os
+import re
+import sys
+from functools import lru_cache
+from Profiling import profiled
+from Util import ColorUtil
+
+# Path segment matching any key of object or any item of list
+ANY = '*'
+
+# Severity of ThemeProblem, themes with errors are not accepted by Power BI while warnings only point at values which
+# look wrong, such as property named like a color which does not hold solid color
+ERROR = 'error'
+WARNING = 'warning'
+
+# Properties usually holding color, which theme file gives as {'solid': {'color': '#RRGGBB'}}. Name alone does not
+# tell property holds color, so rule using it only warns
+_COLOR_PROPERTY_NAME = re.compile(r'(?:fill|color|.+Color)')
+
+# Limit of keys whose rules are remembered by each state of validator, so themes with generated names can not grow it
+# without bound
+_MAX_CACHED_KEYS = 4096
+
+
+class ThemeProblem:
+    """
+    Value of theme which is not valid for Power BI theme, or only looks wrong when severity is WARNING. path is
+    location of value such as 'visualStyles.barChart.*.title[0].fontColor'.
+    """
+
+    def __init__(self, path, message, value=None, severity=ERROR):
+        self.path = path
+        self.message = message
+        self.value = value
+        self.severity = severity
+
+    def is_error(self):
+        return self.severity == ERROR
+
+    def to_dict(self):
+        return {
+            'path': self.path,
+            'message': self.message,
+            'value': self.value,
+            'severity': self.severity,
+        }
+
+    def __str__(self):
+        text = '{}: {}'.format(self.path or '<theme>', self.message)
+        return text if self.is_error() else 'Warning, ' + text
+
+    def __repr__(self):
+        return 'ThemeProblem({!r}, {!r}, {!r}, {!r})'.format(self.path, self.message, self.value, self.severity)
+
+
+def _check_object(value):
+    if type(value) is not dict:
+        return 'Expected object, found ' + _describe(value)
+
+
+def _check_list(value):
+    if type(value) is not list:
+        return 'Expected list, found ' + _describe(value)
+
+
+def _check_name(value):
+    if type(value) is not str or value.strip() == '':
+        return 'Expected theme name, found ' + _describe(value)
+
+
+def _check_color(value):
+    if not ColorUtil.IsValidHexColor(value):
+        return 'Expected hex color such as #12AB34, found ' + _describe(value)
+
+
+def _check_property_value(value):
+    value_type = type(value)
+    if value_type is float and not math.isfinite(value):
+        return 'Expected finite number, found ' + _describe(value)
+    if value_type not in (str, bool, int, float, dict):
+        return 'Expected text, number, boolean or object, found ' + _describe(value)
+
+
+def _check_solid_color(value):
+    solid = value.get('solid') if type(value) is dict else None
+    if type(solid) is not dict or 'color' not in solid:
+        return 'Expected solid color such as {"solid": {"color": "#12AB34"}}, found ' + _describe(value)
+
+
+def _describe(value):
+    if type(value) is dict:
+        return 'object'
+    if type(value) is list:
+        return 'list'
+    try:
+        text = json.dumps(value, allow_nan=False)
+    except (TypeError, ValueError):
+        text = repr(value)
+    return text if len(text) <= 40 else text[:37] + '...'
+
+
+# Rules of theme schema as path of value, check returning message when value is not valid and optionally severity of
+# problem, ERROR when left out. Segments of path are keys, ANY or regular expressions matching keys. Keys of visual
+# objects starting with __ are internal and are never written to theme file, so they are not checked.
+THEME_SCHEMA_RULES = (
+    ((), _check_object),
+    (('name',), _check_name),
+    (('dataColors',), _check_list),
+    (('dataColors', ANY), _check_color),
+    (('background',), _check_color),
+    (('foreground',), _check_color),
+    (('tableAccent',), _check_color),
+    (('visualStyles',), _check_object),
+    (('visualStyles', ANY), _check_object),
+    (('visualStyles', ANY, ANY), _check_object),
+    (('visualStyles', ANY, ANY, ANY), _check_list),
+    (('visualStyles', ANY, ANY, ANY, ANY), _check_object),
+    (('visualStyles', ANY, ANY, ANY, ANY, re.compile(r'(?!__).*')), _check_property_value),
+    (('visualStyles', ANY, ANY, ANY, ANY, _COLOR_PROPERTY_NAME), _check_solid_color, WARNING),
+    (('visualStyles', ANY, ANY, ANY, ANY, ANY, 'solid', 'color'), _check_color),
+)
+
+
+class _RuleNode:
+    # Rules compiled into tree of path segments, so theme is walked once whatever number of rules there is
+
+    __slots__ = ('checks', 'keys', 'patterns', 'any')
+
+    def __init__(self):
+        self.checks = []
+        self.keys = {}
+        self.patterns = []
+        self.any = None
+
+    def add_rule(self, path, check, severity):
+        node = self
+        for segment in path:
+            node = node._get_child(segment)
+        node.checks.append((check, severity))
+
+    def _get_child(self, segment):
+        if segment == ANY:
+            if self.any is None:
+                self.any = _RuleNode()
+            return self.any
+        if isinstance(segment, re.Pattern):
+            for pattern, child in self.patterns:
+                if pattern == segment:
+                    return child
+            child = _RuleNode()
+            self.patterns.append((segment, child))
+            return child
+        return self.keys.setdefault(segment, _RuleNode())
+
+    def get_children(self, key):
+        # Every node whose segment matches key, rules of all of them apply to value of key
+        children = []
+        child = self.keys.get(key)
+        if child is not None:
+            children.append(child)
+        if type(key) is str:
+            children.extend(child for pattern, child in self.patterns if pattern.fullmatch(key) is not None)
+        if self.any is not None:
+            children.append(self.any)
+        return children
+
+
+class _RuleState:
+    # Rule nodes matching one value, with states of its keys and items found as theme is walked. Keys such as object
+    # and property names repeat in every visual type, so state of each key is only looked up once.
+
+    __slots__ = ('checks', 'nodes', 'item_state', '_key_states', '_states')
+
+    def __init__(self, nodes, states):
+        self.nodes = nodes
+        self.checks = tuple(check for node in nodes for check in node.checks)
+        self._key_states = {}
+        self._states = states
+        item_nodes = tuple(node.any for node in nodes if node.any is not None)
+        self.item_state = self._get_state(item_nodes) if len(item_nodes) > 0 else None
+
+    def _get_state(self, nodes):
+        state = self._states.get(nodes)
+        if state is None:
+            state = self._states[nodes] = _RuleState(nodes, self._states)
+        return state
+
+    def get_key_state(self, key):
+        try:
+            return self._key_states[key]
+        except KeyError:
+            pass
+        nodes = tuple(child for node in self.nodes for child in node.get_children(key))
+        state = self._get_state(nodes) if len(nodes) > 0 else None
+        if len(self._key_states) < _MAX_CACHED_KEYS:
+            self._key_states[key] = state
+        return state
+
+
+class ThemeValidator:
+    """
+    Checks theme against rules given as path and check, such as THEME_SCHEMA_RULES. Rules are compiled once when
+    validator is created, use get_theme_validator to get validator of theme schema shared by all callers.
+    """
+
+    def __init__(self, rules):
+        root = _RuleNode()
+        for path, check, *severity in rules:
+            root.add_rule(path, check, severity[0] if len(severity) > 0 else ERROR)
+        self._root_state = _RuleState((root,), {})
+
+    def validate(self, theme):
+        """
+        Returns ThemeProblem for every value of theme which breaks a rule, in order values are found in theme. Every
+        value is visited once and only parts of theme which have rules are visited.
+        """
+        problems = []
+        self._validate_value(theme, self._root_state, [], problems)
+        return problems
+
+    def _validate_value(self, value, state, path, problems):
+        # path holds keys and list indexes leading to value, it is only formatted when value has problem
+        for check, severity in state.checks:
+            message = check(value)
+            if message is not None:
+                problems.append(ThemeProblem(_format_path(path), message, value, severity))
+                if severity == ERROR:
+                    # Contents of value are not checked once value itself is not what rules expect
+                    return
+        value_type = type(value)
+        if value_type is dict:
+            for key, item in value.items():
+                key_state = state.get_key_state(key)
+                if key_state is not None:
+                    path.append(key)
+                    self._validate_value(item, key_state, path, problems)
+                    path.pop()
+        elif value_type is list:
+            item_state = state.item_state
+            if item_state is not None:
+                for index, item in enumerate(value):
+                    path.append(index)
+                    self._validate_value(item, item_state, path, problems)
+                    path.pop()
+
+
+def _format_path(path):
+    text = ''
+    for segment in path:
+        if type(segment) is int:
+            text += '[{}]'.format(segment)
+        else:
+            text += '.' + segment if text else segment
+    return text
+
+
+@lru_cache(maxsize=None)
+def get_theme_validator():
+    return ThemeValidator(THEME_SCHEMA_RULES)
+
+
+@profiled('validate_theme')
+def validate_theme(theme):
+    """
+    Returns list of ThemeProblem for every value of theme which is not valid for Power BI theme or looks wrong, see
+    is_error of ThemeProblem. Empty when theme is valid.
+    """
+    return get_theme_validator().validate(theme)
+
+
+def get_errors(problems):
+    return [problem for problem in problems if problem.is_error()]
+
+
+def validate_theme_file(theme_file_path):
+    try:
+        with open(theme_file_path, 'r', encoding='utf-8-sig') as theme_file:
+            theme = json.load(theme_file)
+    except OSError as e:
+        return [ThemeProblem('', 'Theme file can not be read: {}'.format(e))]
+    except ValueError as e:
+        return [ThemeProblem('', 'Theme file is not valid JSON: {}'.format(e))]
+    return validate_theme(theme)
+
+
+def validate_theme_files(inputs):
+    """
+    Validates theme files given as paths, directories containing .json files or glob patterns. Returns dict of theme
+    file path to its problems, in order files were found.
+    """
+    theme_file_paths = []
+    for input_path in inputs:
+        if os.path.isdir(input_path):
+            theme_file_paths.extend(sorted(glob.glob(os.path.join(input_path, '*.json'))))
+        elif glob.has_magic(input_path):
+            theme_file_paths.extend(sorted(glob.glob(input_path, recursive=True)))
+        else:
+            theme_file_paths.append(input_path)
+    return {theme_file_path: validate_theme_file(theme_file_path) for theme_file_path in theme_file_paths}
+
+
+def main(arguments=None):
+    arguments = sys.argv[1:] if arguments is None else arguments
+    if len(arguments) == 0:
+        print('Usage: ThemeValidator.py THEME_FILE_OR_DIRECTORY...', file=sys.stderr)
+        return 2
+    invalid_count = 0
+    theme_file_problems = validate_theme_files(arguments)
+    for theme_file_path, problems in theme_file_problems.items():
+        if len(get_errors(problems)) == 0:
+            print('OK       {}'.format(theme_file_path))
+        else:
+            invalid_count += 1
+            print('INVALID  {}'.format(theme_file_path))
+        for problem in problems:
+            print('         {}'.format(problem))
+    print('{} of {} theme files are valid'.format(len(theme_file_problems) - invalid_count, len(theme_file_problems)))
+    return 1 if invalid_count > 0 else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,45 @@
+import json
+from Profiling import profiled
+
+_INDENT = 4
+
+
+@profiled('write_theme')
+def write_theme(theme, theme_file, compact=False):
+    """
+    Writes theme to text file opened for writing. Entries of visualStyles are serialized one by one straight to the
+    file, so no copy of whole theme is made. Output is same as json.dump with indent of 4, or without any white space
+    when compact is True.
+    """
+    if compact:
+        encoder = json.JSONEncoder(separators=(',', ':'))
+    else:
+        encoder = json.JSONEncoder(indent=_INDENT)
+    key_separator = encoder.key_separator
+
+    def _new_line(level):
+        return '' if compact else '\n' + ' ' * (_INDENT * level)
+
+    def _encode(value, level):
+        # Nested values are encoded on their own so their lines are shifted to level at which they are written
+        text = encoder.encode(value)
+        return text if compact else text.replace('\n', _new_line(level))
+
+    if len(theme) == 0:
+        theme_file.write('{}')
+        return
+
+    theme_file.write('{')
+    for theme_key_index, (theme_key, theme_value) in enumerate(theme.items()):
+        if theme_key_index > 0:
+            theme_file.write(',')
+        theme_file.write(_new_line(1) + json.dumps(theme_key) + key_separator)
+        if theme_key == 'visualStyles' and type(theme_value) is dict and len(theme_value) > 0:
+            theme_file.write('{')
+            for visual_type_index, (visual_type, visual_style) in enumerate(theme_value.items()):
+                theme_file.write((',' if visual_type_index > 0 else '') + _new_line(2) + json.dumps(visual_type) +
+                                 key_separator + _encode(visual_style, 2))
+            theme_file.write(_new_line(1) + '}')
+        else:
+            theme_file.write(_encode(theme_value, 1))
+    theme_file.write(_new_line(0) + '}')
@@ -1,39 +1,61 @@
 import logging
+import os
 import re
+from functools import lru_cache
+import AppInfo
 
-class ColorUtil:
+# https://stackoverflow.com/questions/20275524/how-to-check-if-a-string-is-an-rgb-hex-string
+_HEX_COLOR = re.compile(r'#[a-fA-F0-9]{3}(?:[a-fA-F0-9]{3})?$')
 
-    @staticmethod
-    def ShadeColor(hexColor, percent):
-        try:
-            hexNum = int(hexColor[1:], 16)
-            t = 0 if percent < 0 else 255
-            p = percent * -1 if percent < 0 else percent
 
-            R = hexNum >> 16
-            G = hexNum >> 8 & 0x00FF
-            B = hexNum & 0x0000FF
+@lru_cache(maxsize=4096)
+def _ShadeHexColor(hexColor, percent):
+    # Raises for color or percent which can not be shaded, exceptions are not memoized so every failure is logged
+    hexNum = int(hexColor[1:], 16)
+    t = 0 if percent < 0 else 255
+    p = percent * -1 if percent < 0 else percent
 
-            # print(hexColor, percent)
-            # print(R, G, B)
+    R = hexNum >> 16
+    G = hexNum >> 8 & 0x00FF
+    B = hexNum & 0x0000FF
 
-            Rhex = hex(round((t - R) * p) + R)[2:].zfill(2)
-            Ghex = hex(round((t - G) * p) + G)[2:].zfill(2)
-            BHex = hex(round((t - B) * p) + B)[2:].zfill(2)
+    Rhex = hex(round((t - R) * p) + R)[2:].zfill(2)
+    Ghex = hex(round((t - G) * p) + G)[2:].zfill(2)
+    BHex = hex(round((t - B) * p) + B)[2:].zfill(2)
 
-            # print(Rhex, Ghex, BHex)
+    return '#' + Rhex + Ghex + BHex
 
-            hexString = '#' + Rhex + Ghex + BHex
 
-            # print(hexString)
-            # print()
+class ColorUtil:
 
-            return hexString
+    @staticmethod
+    def ShadeColor(hexColor, percent):
+        try:
+            return _ShadeHexColor(hexColor, percent)
         except Exception as e:
             logging.error(logging.exception("Error creating shade of color"))
 
-    # https://stackoverflow.com/questions/20275524/how-to-check-if-a-string-is-an-rgb-hex-string
+    @staticmethod
+    def ThemeDataColor(themeColors, colorId, percent):
+        """
+        Returns hex color of ThemeDataColor expression i.e. color at colorId in themeColors tuple shaded by percent.
+        Shades are memoized as reports only use handful of color and shade combinations.
+        """
+        color = themeColors[colorId]
+        if color[0] != '#':
+            color = '#' + color
+        return ColorUtil.ShadeColor(color, percent)
+
     @staticmethod
     def IsValidHexColor(hexColor):
-        hexstring = re.compile(r'#[a-fA-F0-9]{3}(?:[a-fA-F0-9]{3})?$')
-        return bool(hexstring.match(hexColor))
+        return type(hexColor) is str and _HEX_COLOR.match(hexColor) is not None
+
+
+class PathUtil:
+
+    @staticmethod
+    def AppDataDirectory(*subDirectories):
+        # APPDATA only exists on windows, home directory is used everywhere else
+        appDataDirectory = os.path.join(os.getenv('APPDATA', os.path.expanduser('~')), AppInfo.Name, *subDirectories)
+        os.makedirs(appDataDirectory, exist_ok=True)
+        return appDataDirectory
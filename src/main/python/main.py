@@ -1,5 +1,7 @@
 from fbs_runtime.application_context import ApplicationContext
 from PowerBIThemeGeneratorGUI import PowerBIThemeGeneratorWindow
+from ErrorLoggingService import InitializeLogging
+from Profiling import initialize_profiling
 
 import sys
 
@@ -11,6 +13,8 @@ class AppContext(ApplicationContext):           # 1. Subclass ApplicationContext
 
 
 if __name__ == '__main__':
+    InitializeLogging()
+    initialize_profiling()
     appctxt = AppContext()                      # 4. Instantiate the subclass
     exit_code = appctxt.run()                   # 5. Invoke run()
     sys.exit(exit_code)
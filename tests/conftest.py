@@ -0,0 +1,24 @@
+import os
+import sys
+
+import pytest
+
+_REPOSITORY_DIRECTORY = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+# Modules of program are run from src/main/python, benchmarks folder holds synthetic Power BI file generator and
+# reference implementations compared against
+sys.path.insert(0, os.path.join(_REPOSITORY_DIRECTORY, 'src', 'main', 'python'))
+sys.path.insert(0, os.path.join(_REPOSITORY_DIRECTORY, 'benchmarks'))
+
+from synthetic_pbix import generate_report_layout, write_synthetic_pbix  # noqa: E402
+
+
+@pytest.fixture
+def report_layout():
+    return generate_report_layout(page_count=4, visuals_per_page=6, objects_per_visual=5,
+                                  theme_data_color_density=0.5)
+
+
+@pytest.fixture
+def pbi_file_path(tmp_path):
+    return write_synthetic_pbix(str(tmp_path / 'report.pbix'), page_count=4, visuals_per_page=6,
+                                objects_per_visual=5, data_model_bytes=4096)
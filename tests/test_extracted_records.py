@@ -0,0 +1,85 @@
+import json
+
+import pytest
+
+from ExtractedRecords import ExtractedPage, ExtractedVisual, PropertyMap, SolidColor
+from PowerBIThemeGenerator import PowerBIThemeGenerator
+
+
+def _extracted_page():
+    return ExtractedPage('Sales', [
+        ExtractedVisual('a1b2', 'barChart', {
+            'title': {'show': True, 'text': 'Sales by month', 'fontSize': 12},
+            'dataPoint': {'fill': SolidColor.of('#01B8AA'), 'values': [1, 2]},
+            'legend': {},
+        }),
+        ExtractedVisual(None, 'page', {'background': {'color': SolidColor.of('#FFFFFF'), 'transparency': 50}}),
+    ])
+
+
+def _assert_same_pages(report_page, other_report_page):
+    assert other_report_page.display_name == report_page.display_name
+    assert len(other_report_page.visuals) == len(report_page.visuals)
+    for visual, other_visual in zip(report_page.visuals, other_report_page.visuals):
+        assert other_visual.name == visual.name
+        assert other_visual.visual_type == visual.visual_type
+        assert list(other_visual.objects) == list(visual.objects)
+        for object_name, object_properties in visual.objects.items():
+            assert dict(other_visual.objects[object_name].items()) == dict(object_properties.items())
+
+
+def test_page_round_trips_through_dict():
+    report_page = _extracted_page()
+
+    _assert_same_pages(report_page, ExtractedPage.from_dict(report_page.to_dict()))
+
+
+def test_page_round_trips_through_json():
+    report_page = _extracted_page()
+    page_dict = json.loads(json.dumps(report_page.to_dict()))
+
+    restored_page = ExtractedPage.from_dict(page_dict)
+
+    _assert_same_pages(report_page, restored_page)
+    assert restored_page.to_dict() == page_dict
+    # Colors come back as shared SolidColor, not as the dict they are stored as
+    assert restored_page.visuals[0].objects['dataPoint']['fill'] is SolidColor.of('#01B8AA')
+
+
+def test_to_dict_writes_colors_as_theme_file_does():
+    page_dict = _extracted_page().to_dict()
+
+    assert page_dict['reportPageDisplayName'] == 'Sales'
+    assert page_dict['visuals'][0] == {
+        'name': 'a1b2',
+        'visual_type': 'barChart',
+        'objects': {
+            'title': {'show': True, 'text': 'Sales by month', 'fontSize': 12},
+            'dataPoint': {'fill': {'solid': {'color': '#01B8AA'}}, 'values': [1, 2]},
+            'legend': {},
+        },
+    }
+
+
+def test_extracted_report_round_trips(pbi_file_path):
+    report_visual_data = PowerBIThemeGenerator(pbi_file_path).modifiedDataStructure()
+
+    for report_page in report_visual_data.values():
+        page_dict = json.loads(json.dumps(report_page.to_dict()))
+        assert ExtractedPage.from_dict(page_dict).to_dict() == page_dict
+
+
+def test_property_map_is_read_only_mapping():
+    property_map = PropertyMap({'show': True, 'fontSize': 12})
+
+    assert property_map['fontSize'] == 12
+    assert property_map.get('missing') is None
+    assert list(property_map.items()) == [('show', True), ('fontSize', 12)]
+    with pytest.raises(KeyError):
+        property_map['missing']
+    with pytest.raises(TypeError):
+        property_map['show'] = False
+
+
+def test_property_maps_with_same_names_share_name_tuple():
+    assert PropertyMap({'show': True, 'text': 'a'}).keys() is PropertyMap({'show': False, 'text': 'b'}).keys()
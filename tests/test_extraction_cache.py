@@ -0,0 +1,78 @@
+import os
+import time
+
+from ExtractionCache import ExtractionCache
+from PowerBIThemeGenerator import PowerBIThemeGenerator
+
+_CACHED_DATA = {
+    'reportPages': [{'name': 'ReportSection1', 'displayName': 'Sales', 'visualCount': 1, 'fingerprint': 'ab'}],
+    'reportVisualData': {'ReportSection1': {'reportPageDisplayName': 'Sales', 'visuals': []}},
+}
+
+
+def test_store_and_load_round_trip(tmp_path):
+    extraction_cache = ExtractionCache(str(tmp_path))
+
+    extraction_cache.store('key', _CACHED_DATA)
+
+    assert extraction_cache.load('key') == _CACHED_DATA
+    assert extraction_cache.load('other key') is None
+
+
+def test_store_creates_missing_cache_directory(tmp_path):
+    cache_directory = tmp_path / 'not' / 'created'
+    extraction_cache = ExtractionCache(str(cache_directory))
+
+    extraction_cache.store('key', _CACHED_DATA)
+
+    assert extraction_cache.load('key') == _CACHED_DATA
+
+
+def test_unreadable_entry_is_ignored(tmp_path):
+    (tmp_path / 'key.json').write_text('{"reportPages": [', encoding='utf-8')
+
+    assert ExtractionCache(str(tmp_path)).load('key') is None
+
+
+def test_least_recently_used_entries_are_evicted(tmp_path):
+    ExtractionCache(str(tmp_path)).store('first', _CACHED_DATA)
+    entry_size = os.path.getsize(str(tmp_path / 'first.json'))
+    # Room for two entries only
+    extraction_cache = ExtractionCache(str(tmp_path), max_size_bytes=entry_size * 2 + entry_size // 2)
+    extraction_cache.store('second', _CACHED_DATA)
+    # Entry is used once loaded, so the other one is evicted first
+    old_time = time.time() - 60
+    os.utime(str(tmp_path / 'second.json'), (old_time, old_time))
+    os.utime(str(tmp_path / 'first.json'), (old_time - 60, old_time - 60))
+    assert extraction_cache.load('first') is not None
+
+    extraction_cache.store('third', _CACHED_DATA)
+
+    assert extraction_cache.load('second') is None
+    assert extraction_cache.load('first') is not None
+    assert extraction_cache.load('third') is not None
+
+
+def test_cache_key_changes_with_file(pbi_file_path):
+    cache_key = ExtractionCache.get_cache_key(pbi_file_path, 1)
+
+    assert ExtractionCache.get_cache_key(pbi_file_path, 1) == cache_key
+    assert ExtractionCache.get_cache_key(pbi_file_path, 2) != cache_key
+    modified_time = os.stat(pbi_file_path).st_mtime + 10
+    os.utime(pbi_file_path, (modified_time, modified_time))
+    assert ExtractionCache.get_cache_key(pbi_file_path, 1) != cache_key
+
+
+def test_extracted_report_round_trips_through_cache(tmp_path, pbi_file_path):
+    cache_directory = str(tmp_path / 'cache')
+    extracted_data = PowerBIThemeGenerator(pbi_file_path, ExtractionCache(cache_directory)).modifiedDataStructure()
+    PowerBIThemeGenerator.clear_extraction_memo()
+
+    theme_generator = PowerBIThemeGenerator(pbi_file_path, ExtractionCache(cache_directory))
+    assert theme_generator.load()
+    # Every report page comes from cache, so Report/Layout is not read at all
+    assert len(theme_generator._extracted_pages) == len(extracted_data)
+    cached_data = theme_generator.modifiedDataStructure()
+
+    assert {name: page.to_dict() for name, page in cached_data.items()} == \
+        {name: page.to_dict() for name, page in extracted_data.items()}
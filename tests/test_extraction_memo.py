@@ -0,0 +1,75 @@
+import copy
+import json
+
+import pytest
+
+from ExtractionMemo import ExtractionMemo, ParsedConfigIndex, PARSED_CONFIG_INDEX, get_fingerprint
+from PbixArchive import PbixArchive
+from PowerBIThemeGenerator import PowerBIThemeGenerator
+from ThemeApplier import apply_theme
+
+
+def test_memo_drops_least_recently_used_entries():
+    extraction_memo = ExtractionMemo(2)
+    extraction_memo.put(b'a', 1)
+    extraction_memo.put(b'b', 2)
+    assert extraction_memo.get(b'a') == 1
+
+    extraction_memo.put(b'c', 3)
+
+    assert extraction_memo.get(b'b') is None
+    assert (extraction_memo.get(b'a'), extraction_memo.get(b'c')) == (1, 3)
+
+
+def test_parsed_config_index_parses_config_once():
+    parsed_config_index = ParsedConfigIndex(10)
+    config = '{"singleVisual": {"visualType": "card"}}'
+
+    parsed_config = parsed_config_index.get(config)
+
+    assert parsed_config == json.loads(config)
+    assert parsed_config_index.get(config) is parsed_config
+    assert parsed_config_index.get(config, get_fingerprint(config)) is parsed_config
+    assert len(parsed_config_index) == 1
+
+
+def test_parsed_config_index_keeps_only_when_asked():
+    parsed_config_index = ParsedConfigIndex(10)
+
+    parsed_config = parsed_config_index.get('{"name": "v1"}', keep=False)
+
+    assert parsed_config == {'name': 'v1'}
+    assert len(parsed_config_index) == 0
+    assert parsed_config_index.get('{"name": "v1"}', keep=False) is not parsed_config
+
+
+def test_malformed_config_is_not_kept():
+    parsed_config_index = ParsedConfigIndex(10)
+
+    with pytest.raises(ValueError):
+        parsed_config_index.get('{"name": ')
+    assert len(parsed_config_index) == 0
+
+
+def test_applying_theme_leaves_configs_parsed_by_extraction_unchanged(tmp_path, pbi_file_path):
+    PowerBIThemeGenerator.clear_extraction_memo()
+    PowerBIThemeGenerator(pbi_file_path).modifiedDataStructure()
+    parsed_configs = {}
+    for report_section in PowerBIThemeGenerator(pbi_file_path).get_report_sections():
+        for config in [report_section['config']] + [visual_container['config']
+                                                    for visual_container in report_section['visualContainers']]:
+            parsed_config = PARSED_CONFIG_INDEX.get(config)
+            parsed_configs[config] = (parsed_config, copy.deepcopy(parsed_config))
+    theme = {'visualStyles': {
+        '*': {'*': {'title': [{'fontSize': 20}], 'legend': [{'show': False}]}},
+        'page': {'*': {'background': [{'transparency': 30}]}},
+    }}
+
+    apply_theme(pbi_file_path, theme, str(tmp_path / 'applied.pbix'))
+
+    with PbixArchive(str(tmp_path / 'applied.pbix')) as applied_file:
+        applied_layout = applied_file.read('Report/Layout').decode('utf-16-le')
+    assert '\\"Value\\":\\"20D\\"' in applied_layout
+    for config, (parsed_config, parsed_config_copy) in parsed_configs.items():
+        assert PARSED_CONFIG_INDEX.get(config) is parsed_config
+        assert parsed_config == parsed_config_copy
@@ -0,0 +1,107 @@
+import pytest
+
+from bench_property_decoder import THEME_COLORS, _legacy_fetch_object_properties_value, generate_visual_objects
+from ExtractedRecords import PropertyMap, SolidColor
+from PropertyDecoder import PropertyDecoder, decode_literal
+
+
+def _decode_to_dicts(objects):
+    # Colors are decoded to SolidColor, which legacy decoder gave as {'solid': {'color': color}}
+    return {object_name: PropertyMap(object_properties).to_dict()
+            for object_name, object_properties in PropertyDecoder(THEME_COLORS).decode_objects(objects).items()}
+
+
+def _literal(value):
+    return {'expr': {'Literal': {'Value': value}}}
+
+
+@pytest.mark.parametrize('seed', [0, 1, 2])
+def test_matches_legacy_decoder_on_generated_visuals(seed):
+    for objects in generate_visual_objects(200, seed):
+        assert _decode_to_dicts(objects) == _legacy_fetch_object_properties_value(objects)
+
+
+@pytest.mark.parametrize('property_value', [
+    _literal('12D'),
+    _literal('12.75D'),
+    _literal('-3L'),
+    _literal('100L'),
+    _literal('42'),
+    _literal('true'),
+    _literal('false'),
+    _literal("'Segoe UI'"),
+    _literal("'''Segoe UI Light'', wf_segoe-ui_light, helvetica'"),
+    _literal("'#FF0000'"),
+    _literal("'Top'"),
+    _literal(7),
+    {'expr': {'Measure': {'Property': 'Sales'}}},
+    {'expr': {}},
+    {'solid': {'color': _literal("'#01B8AA'")}},
+    {'solid': {'color': {'expr': {'ThemeDataColor': {'ColorId': 2, 'Percent': 0}}}}},
+    {'solid': {'color': {'expr': {'ThemeDataColor': {'ColorId': 5, 'Percent': -0.25}}}}},
+    {'solid': {'color': {'expr': {'ThemeDataColor': {'ColorId': 7, 'Percent': 0.6}}}}},
+    [3, 4],
+])
+def test_matches_legacy_decoder_on_property_shapes(property_value):
+    objects = {'title': [{'properties': {'value': property_value}}]}
+
+    assert _decode_to_dicts(objects) == _legacy_fetch_object_properties_value(objects)
+
+
+def test_colors_are_shared_solid_colors():
+    objects = {'dataPoint': [{'properties': {
+        'fill': {'solid': {'color': _literal("'#FF0000'")}},
+        'stroke': {'solid': {'color': _literal("'#FF0000'")}},
+    }}]}
+
+    decoded_properties = PropertyDecoder(THEME_COLORS).decode_objects(objects)['dataPoint']
+
+    assert decoded_properties['fill'] == SolidColor('#FF0000')
+    assert decoded_properties['fill'] is decoded_properties['stroke']
+
+
+def test_plain_values_are_kept_as_they_are():
+    # Legacy decoder took first item of any value which is not dict, cutting text to its first character
+    objects = {'general': [{'properties': {'text': 'Sales', 'count': 12, 'show': True}}]}
+
+    assert PropertyDecoder(THEME_COLORS).decode_objects(objects) == {
+        'general': {'text': 'Sales', 'count': 12, 'show': True}
+    }
+
+
+def test_empty_list_value_is_left_out():
+    objects = {'labels': [{'properties': {'show': _literal('true'), 'values': []}}]}
+
+    assert PropertyDecoder(THEME_COLORS).decode_objects(objects) == {'labels': {'show': True}}
+
+
+def test_malformed_object_is_reported_and_left_out():
+    objects = {
+        'title': 'not a list',
+        'legend': [{'properties': {'show': _literal('true')}}],
+    }
+    failures = []
+
+    decoded_objects = PropertyDecoder(THEME_COLORS).decode_objects(
+        objects, lambda property_path, error: failures.append(property_path))
+
+    assert decoded_objects == {'legend': {'show': True}}
+    assert failures == ['title']
+
+
+def test_malformed_object_raises_without_error_callback():
+    with pytest.raises(Exception):
+        PropertyDecoder(THEME_COLORS).decode_objects({'title': None})
+
+
+@pytest.mark.parametrize('value, decoded_value', [
+    ('12D', 12),
+    ('3L', 3),
+    ('1.5e2D', 150),
+    ('true', True),
+    ("'Segoe UI'", 'Segoe UI'),
+    ("'''Segoe UI'', wf_segoe-ui_normal'", 'Segoe UI, wf_segoe-ui_normal'),
+    (None, None),
+])
+def test_decode_literal(value, decoded_value):
+    assert decode_literal(value) == decoded_value
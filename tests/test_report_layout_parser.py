@@ -0,0 +1,76 @@
+import io
+import json
+
+import pytest
+
+from PowerBIThemeGenerator import PowerBIThemeGenerator
+from ReportLayoutParser import ReportLayoutParser
+
+
+def _parse_sections(layout_data, chunk_size):
+    return list(ReportLayoutParser(io.BytesIO(layout_data), len(layout_data), chunk_size).iter_sections())
+
+
+@pytest.mark.parametrize('encoding', ['utf-16-le', 'utf-16-be', 'utf-8', 'utf-8-sig', 'utf-16', 'utf-32'])
+@pytest.mark.parametrize('chunk_size', [1, 3, 7, 64, 1 << 20])
+def test_sections_match_whole_document(report_layout, encoding, chunk_size):
+    layout_data = json.dumps(report_layout).encode(encoding)
+
+    assert _parse_sections(layout_data, chunk_size) == report_layout['sections']
+
+
+@pytest.mark.parametrize('chunk_size', [1, 2, 5])
+def test_values_cut_at_chunk_boundary(chunk_size):
+    # Numbers, escapes and characters outside basic plane are cut between chunks at every position
+    layout = {
+        'id': 12345,
+        'config': '{"version":"5.4"}',
+        'sections': [
+            {'name': 'ReportSection1', 'displayName': 'Sales é\U0001F600 "quoted"', 'ordinal': 10.25,
+             'visualContainers': [], 'config': '{}'},
+            {'name': 'ReportSection2', 'displayName': 'Line\nbreak\\', 'ordinal': -1e-05, 'visualContainers': [],
+             'config': '{}'},
+        ],
+        'layoutOptimization': 0,
+    }
+    for encoding in ('utf-16-le', 'utf-8'):
+        layout_data = json.dumps(layout, ensure_ascii=False, indent=1).encode(encoding)
+
+        assert _parse_sections(layout_data, chunk_size) == layout['sections']
+
+
+def test_sections_after_other_keys_and_empty_sections():
+    layout_data = json.dumps({'config': '{}', 'resourcePackages': [{'a': [1, 2]}], 'sections': []}).encode('utf-8')
+
+    assert _parse_sections(layout_data, 4) == []
+
+
+def test_bytes_read_reaches_total_bytes(report_layout):
+    layout_data = json.dumps(report_layout).encode('utf-16-le')
+    report_layout_parser = ReportLayoutParser(io.BytesIO(layout_data), len(layout_data), 1000)
+
+    for _ in report_layout_parser.iter_sections():
+        assert report_layout_parser.bytes_read <= len(layout_data)
+    assert report_layout_parser.bytes_read == len(layout_data)
+
+
+@pytest.mark.parametrize('layout_text', ['{"sections": [{"name": "ReportSection1"}', '{"sections": [', '['])
+def test_truncated_or_malformed_layout_raises(layout_text):
+    with pytest.raises(ValueError):
+        _parse_sections(layout_text.encode('utf-8'), 2)
+
+
+def test_loaded_generator_extracts_pages_lazily_like_eagerly(pbi_file_path):
+    eager_data = PowerBIThemeGenerator(pbi_file_path).modifiedDataStructure()
+    PowerBIThemeGenerator.clear_extraction_memo()
+
+    theme_generator = PowerBIThemeGenerator(pbi_file_path)
+    assert theme_generator.load()
+    # Only page summaries are kept after loading, report sections are read again when page is extracted
+    assert theme_generator._layout_data is None
+    lazy_data = theme_generator.modifiedDataStructure(lazy=True)
+    report_section_names = [report_page['name'] for report_page in theme_generator.get_report_pages()]
+
+    assert report_section_names == list(eager_data)
+    for report_section_name in reversed(report_section_names):
+        assert lazy_data[report_section_name].to_dict() == eager_data[report_section_name].to_dict()
@@ -0,0 +1,111 @@
+from ExtractedRecords import ExtractedPage, ExtractedVisual
+from SelectionStore import SelectionStore
+
+
+def _visual(name, visual_type, *object_names):
+    return ExtractedVisual(name, visual_type, {object_name: {'show': True} for object_name in object_names})
+
+
+def _page_visual():
+    return ExtractedVisual(None, 'page', {'background': {'transparency': 0}})
+
+
+def _selected(selection_store):
+    return [(report_page.display_name, visual.name, visual.visual_type,
+             [(object_name, wildcard) for object_name, _, wildcard in selected_objects])
+            for report_page, visual, selected_objects in selection_store.iter_selected_visuals()]
+
+
+def test_remap_follows_named_visuals_moved_within_page():
+    report_visual_data = {'ReportSection1': ExtractedPage('Sales', [
+        _visual('a', 'card', 'title', 'labels'),
+        _visual('b', 'barChart', 'title', 'legend', 'dataPoint'),
+        _page_visual(),
+    ])}
+    selection_store = SelectionStore(report_visual_data)
+    selection_store.set_visual_selected('ReportSection1', 1, True)
+    selection_store.set_object_selected('ReportSection1', 1, 1, False)
+    selection_store.set_wildcard('ReportSection1', 1, 2, True)
+
+    reloaded_visual_data = {'ReportSection1': ExtractedPage('Sales', [
+        _visual('c', 'lineChart', 'title'),
+        _visual('b', 'barChart', 'dataPoint', 'title', 'legend', 'labels'),
+        _visual('a', 'card', 'title', 'labels'),
+        _page_visual(),
+    ])}
+    remapped_store = selection_store.remap(reloaded_visual_data)
+
+    # Object new to visual gets default selection
+    assert _selected(remapped_store) == [
+        ('Sales', 'b', 'barChart', [('dataPoint', True), ('title', False), ('labels', False)]),
+    ]
+    assert not remapped_store.is_visual_selected('ReportSection1', 2)
+
+
+def test_remap_drops_removed_visuals_objects_and_pages():
+    report_visual_data = {
+        'ReportSection1': ExtractedPage('Sales', [_visual('a', 'card', 'title', 'labels'), _page_visual()]),
+        'ReportSection2': ExtractedPage('Costs', [_visual('b', 'card', 'title'), _page_visual()]),
+    }
+    selection_store = SelectionStore(report_visual_data)
+    selection_store.set_visual_selected('ReportSection1', 0, True)
+    selection_store.set_visual_selected('ReportSection2', 0, True)
+
+    reloaded_visual_data = {
+        'ReportSection1': ExtractedPage('Sales', [_visual('a', 'card', 'title'), _page_visual()]),
+    }
+    remapped_store = selection_store.remap(reloaded_visual_data)
+
+    assert _selected(remapped_store) == [('Sales', 'a', 'card', [('title', False)])]
+
+
+def test_remap_keeps_page_visual_and_unnamed_visuals_of_each_type_apart():
+    report_visual_data = {'ReportSection1': ExtractedPage('Sales', [
+        _visual(None, 'textbox', 'general'),
+        _visual(None, 'shape', 'line'),
+        _visual(None, 'textbox', 'general', 'background'),
+        _page_visual(),
+    ])}
+    selection_store = SelectionStore(report_visual_data)
+    selection_store.set_visual_selected('ReportSection1', 2, True)
+    selection_store.set_visual_selected('ReportSection1', 3, True)
+
+    # Unnamed visual of other type added in front does not shift unnamed textboxes
+    reloaded_visual_data = {'ReportSection1': ExtractedPage('Sales', [
+        _visual(None, 'image', 'general'),
+        _visual(None, 'textbox', 'general'),
+        _visual(None, 'textbox', 'general', 'background'),
+        _visual(None, 'shape', 'line'),
+        _page_visual(),
+    ])}
+    remapped_store = selection_store.remap(reloaded_visual_data)
+
+    assert _selected(remapped_store) == [
+        ('Sales', None, 'textbox', [('general', False), ('background', False)]),
+        ('Sales', None, 'page', [('background', False)]),
+    ]
+    assert [remapped_store.is_visual_selected('ReportSection1', visual_index) for visual_index in range(5)] == \
+        [False, False, True, False, True]
+
+
+def test_remap_of_untouched_pages_keeps_default_selection():
+    report_visual_data = {'ReportSection1': ExtractedPage('Sales', [_visual('a', 'card', 'title'), _page_visual()])}
+    selection_store = SelectionStore(report_visual_data)
+    # Accessing page allocates its flags without changing selection
+    assert not selection_store.is_visual_selected('ReportSection1', 0)
+
+    remapped_store = selection_store.remap(report_visual_data)
+
+    assert _selected(remapped_store) == []
+    assert remapped_store.is_object_selected('ReportSection1', 0, 0)
+
+
+def test_objects_without_properties_are_never_selected():
+    report_visual_data = {'ReportSection1': ExtractedPage('Sales', [
+        ExtractedVisual('a', 'card', {'title': {'show': True}, 'labels': {}}),
+    ])}
+    selection_store = SelectionStore(report_visual_data)
+    selection_store.set_all_visuals_selected('ReportSection1', True)
+
+    assert not selection_store.is_object_selected('ReportSection1', 0, 1)
+    assert _selected(selection_store) == [('Sales', 'a', 'card', [('title', False)])]
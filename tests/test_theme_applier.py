@@ -0,0 +1,146 @@
+import json
+import os
+
+import pytest
+
+from bench_pbix_copy import check_round_trip, write_source_archives
+from ExtractedRecords import SolidColor
+from PbixArchive import PbixArchive
+from PowerBIThemeGenerator import PowerBIThemeGenerator
+from ThemeApplier import apply_theme, apply_theme_to_layout
+
+_THEME = {
+    'name': 'Applied',
+    'visualStyles': {
+        '*': {'*': {'title': [{'fontSize': 20, 'fontColor': {'solid': {'color': '#123456'}}}]}},
+        'card': {'*': {'labels': [{'color': {'solid': {'color': '#FF0000'}}, 'fontFamily': 'Segoe UI, Arial'}]}},
+        'page': {'*': {'background': [{'transparency': 30}]}},
+    },
+}
+
+
+def _literal(value):
+    return {'expr': {'Literal': {'Value': value}}}
+
+
+def _get_properties(config, object_name, visual_container_objects=False):
+    single_visual = config['singleVisual']
+    objects = single_visual['vcObjects' if visual_container_objects else 'objects']
+    return [object_entry.get('properties') for object_entry in objects[object_name]]
+
+
+def test_raw_copy_round_trips(tmp_path):
+    source_file_paths = write_source_archives(str(tmp_path))
+
+    entry_counts = [check_round_trip(source_file_path, str(tmp_path / 'copy.pbix'))
+                    for source_file_path in source_file_paths]
+
+    # First source is written to seekable file, second one with data descriptor after every entry
+    assert entry_counts == [(0, 2), (5, 2)]
+
+
+def test_applied_theme_is_extracted_back(tmp_path, pbi_file_path):
+    output_file_path = str(tmp_path / 'applied.pbix')
+    report_visual_data = PowerBIThemeGenerator(pbi_file_path).modifiedDataStructure()
+
+    changed_count = apply_theme(pbi_file_path, _THEME, output_file_path)
+
+    applied_visual_data = PowerBIThemeGenerator(output_file_path).modifiedDataStructure()
+    assert changed_count == sum(len(report_page.visuals) for report_page in report_visual_data.values())
+    assert any(visual.visual_type == 'card' for report_page in report_visual_data.values()
+               for visual in report_page.visuals)
+    for report_section_name, report_page in report_visual_data.items():
+        applied_page = applied_visual_data[report_section_name]
+        for visual, applied_visual in zip(report_page.visuals, applied_page.visuals):
+            assert applied_visual.visual_type == visual.visual_type
+            changed_objects = {'background'} if visual.visual_type == 'page' else \
+                {'title', 'labels'} if visual.visual_type == 'card' else {'title'}
+            for object_name, object_properties in visual.objects.items():
+                if object_name not in changed_objects:
+                    assert dict(applied_visual.objects[object_name].items()) == dict(object_properties.items())
+            if visual.visual_type == 'page':
+                assert applied_visual.objects['background']['transparency'] == 30
+                continue
+            assert applied_visual.objects['title']['fontSize'] == 20
+            assert applied_visual.objects['title']['fontColor'] == SolidColor('#123456')
+            if visual.visual_type == 'card':
+                assert applied_visual.objects['labels']['color'] == SolidColor('#FF0000')
+                assert applied_visual.objects['labels']['fontFamily'] == 'Segoe UI, Arial'
+
+
+def test_applied_file_copies_other_entries_raw(tmp_path, pbi_file_path):
+    output_file_path = str(tmp_path / 'applied.pbix')
+
+    apply_theme(pbi_file_path, _THEME, output_file_path)
+
+    with PbixArchive(pbi_file_path) as power_bi_file, PbixArchive(output_file_path) as applied_file:
+        assert applied_file.namelist() == [name for name in power_bi_file.namelist() if name != 'SecurityBindings']
+        assert b'SecurityBindings' not in applied_file.read('[Content_Types].xml')
+        for name in ('Version', 'DataModel'):
+            assert b''.join(applied_file.iter_raw_data(name)) == b''.join(power_bi_file.iter_raw_data(name))
+    # Temporary file output was written to is moved, not left next to it
+    assert sorted(os.listdir(str(tmp_path))) == ['applied.pbix', 'report.pbix']
+
+
+def test_existing_literals_keep_their_form():
+    visual_config = {
+        'name': 'v1',
+        'singleVisual': {
+            'visualType': 'card',
+            'objects': {
+                'labels': [
+                    {'properties': {'fontSize': _literal('12D'), 'count': _literal('3L'),
+                                    'fontFamily': _literal("'''Segoe UI'', wf_segoe-ui_normal'")}},
+                    {'properties': {'fontSize': _literal('8D')}, 'selector': {'metadata': 'Sales.Amount'}},
+                ],
+            },
+        },
+    }
+    layout = {'sections': [{'name': 'ReportSection1', 'config': '{}', 'visualContainers': [
+        {'config': json.dumps(visual_config)},
+        {'config': json.dumps({'name': 'group', 'singleVisualGroup': {'displayName': 'Group'}})},
+    ]}]}
+    theme = {'visualStyles': {'card': {'*': {'labels': [
+        {'fontSize': 12, 'count': 5, 'fontFamily': 'Segoe UI Light, wf_segoe-ui_light', 'precision': 1e-05},
+    ]}}}}
+
+    assert apply_theme_to_layout(layout, theme) == 1
+
+    properties = _get_properties(json.loads(layout['sections'][0]['visualContainers'][0]['config']), 'labels')
+    assert properties[0] == {
+        'fontSize': _literal('12D'),
+        'count': _literal('5L'),
+        'fontFamily': _literal("'''Segoe UI Light'', wf_segoe-ui_light'"),
+        'precision': _literal('0.00001D'),
+    }
+    # Entry formatting only some data points is left as it was
+    assert properties[1] == {'fontSize': _literal('8D')}
+    assert json.loads(layout['sections'][0]['visualContainers'][1]['config']) == \
+        {'name': 'group', 'singleVisualGroup': {'displayName': 'Group'}}
+
+
+def test_visual_container_objects_go_to_vc_objects():
+    visual_config = {'name': 'v1', 'singleVisual': {'visualType': 'barChart', 'objects': {}}}
+    config = json.dumps(visual_config)
+    layout = {'sections': [{'name': 'ReportSection1', 'config': '{}', 'visualContainers': [{'config': config}]}]}
+
+    apply_theme_to_layout(layout, _THEME)
+
+    applied_config = json.loads(layout['sections'][0]['visualContainers'][0]['config'])
+    assert _get_properties(applied_config, 'title', visual_container_objects=True) == [
+        {'fontSize': _literal('20D'), 'fontColor': {'solid': {'color': _literal("'#123456'")}}},
+    ]
+    assert applied_config['singleVisual']['objects'] == {}
+
+
+def test_output_can_not_replace_power_bi_file(pbi_file_path):
+    with pytest.raises(ValueError):
+        apply_theme(pbi_file_path, _THEME, pbi_file_path)
+
+
+def test_invalid_theme_is_not_applied(tmp_path, pbi_file_path):
+    output_file_path = str(tmp_path / 'applied.pbix')
+
+    with pytest.raises(ValueError):
+        apply_theme(pbi_file_path, {'name': 'Invalid', 'dataColors': ['not a color']}, output_file_path)
+    assert not os.path.exists(output_file_path)
@@ -0,0 +1,97 @@
+import pytest
+
+from ThemeEngine import DEFAULT_THEME_NAME, FIRST_REPORT_WINS, LAST_REPORT_WINS, ThemeConflict, merge_themes
+
+
+def _themes():
+    return [
+        ('Sales', {
+            'name': 'Sales',
+            'dataColors': ['#01B8AA', '#374649'],
+            'background': '#FFFFFF',
+            'visualStyles': {
+                '*': {'*': {'title': [{'fontSize': 12}], 'border': [{'show': True}]}},
+                'card': {'*': {'labels': [{'color': {'solid': {'color': '#000000'}}}]}},
+                'barChart': {'*': {'legend': [{'show': True}]}},
+            },
+        }),
+        ('Costs', {
+            'name': 'Costs',
+            'dataColors': ['#FD625E'],
+            'foreground': '#252423',
+            'visualStyles': {
+                '*': {'*': {'title': [{'fontSize': 14}]}},
+                'card': {'*': {'labels': [{'color': {'solid': {'color': '#FF0000'}}}]}},
+                'lineChart': {'*': {'legend': [{'show': False}]}},
+            },
+        }),
+        ('Budget', {
+            'name': 'Budget',
+            'background': '#F0F0F0',
+            'visualStyles': {
+                'card': {'*': {'labels': [{'fontSize': 9}]}},
+            },
+        }),
+    ]
+
+
+def test_first_report_wins():
+    theme_build_result = merge_themes(_themes(), 'Merged', FIRST_REPORT_WINS)
+    theme = theme_build_result.theme
+
+    assert theme['name'] == 'Merged'
+    assert theme['dataColors'] == ['#01B8AA', '#374649']
+    assert theme['background'] == '#FFFFFF'
+    # Property missing from themes of higher precedence is taken from the first theme having it
+    assert theme['foreground'] == '#252423'
+    assert 'tableAccent' not in theme
+    assert theme['visualStyles']['*']['*'] == {'title': [{'fontSize': 12}], 'border': [{'show': True}]}
+    assert theme['visualStyles']['card'] == _themes()[0][1]['visualStyles']['card']
+    assert theme['visualStyles']['lineChart'] == _themes()[1][1]['visualStyles']['lineChart']
+
+
+def test_last_report_wins():
+    theme = merge_themes(_themes(), 'Merged', LAST_REPORT_WINS).theme
+
+    assert theme['dataColors'] == ['#FD625E']
+    assert theme['background'] == '#F0F0F0'
+    assert theme['foreground'] == '#252423'
+    assert theme['visualStyles']['*']['*'] == {'title': [{'fontSize': 14}], 'border': [{'show': True}]}
+    assert theme['visualStyles']['card'] == {'*': {'labels': [{'fontSize': 9}]}}
+    assert theme['visualStyles']['barChart'] == _themes()[0][1]['visualStyles']['barChart']
+
+
+@pytest.mark.parametrize('precedence, card_theme_names, title_theme_names', [
+    (FIRST_REPORT_WINS, ['Sales', 'Costs', 'Budget'], ['Sales', 'Costs']),
+    (LAST_REPORT_WINS, ['Budget', 'Costs', 'Sales'], ['Costs', 'Sales']),
+])
+def test_overrides_list_themes_in_order_of_precedence(precedence, card_theme_names, title_theme_names):
+    theme_build_result = merge_themes(_themes(), None, precedence)
+
+    assert theme_build_result.conflicts == []
+    overrides = {(override.kind, override.name): override.report_pages for override in theme_build_result.overrides}
+    assert overrides == {
+        (ThemeConflict.VISUAL_TYPE, 'card'): card_theme_names,
+        (ThemeConflict.WILDCARD_OBJECT, 'title'): title_theme_names,
+    }
+
+
+def test_wildcard_style_comes_first_and_default_name_is_used():
+    theme = merge_themes(list(reversed(_themes())), '  ').theme
+
+    assert theme['name'] == DEFAULT_THEME_NAME
+    assert list(theme['visualStyles']) == ['*', 'card', 'lineChart', 'barChart']
+
+
+def test_single_theme_is_kept_as_it_is():
+    theme_name, source_theme = _themes()[0]
+
+    theme_build_result = merge_themes([(theme_name, source_theme)], 'Sales')
+
+    assert theme_build_result.theme == source_theme
+    assert theme_build_result.overrides == []
+
+
+def test_unknown_precedence_raises():
+    with pytest.raises(ValueError):
+        merge_themes(_themes(), None, 'middle')